@@ -0,0 +1,7 @@
+"""
+Offline benchmarks.
+
+Everything runs against local stand-ins (benchmarks.fake_services), so no
+real feed, Azure OpenAI, WordPress, Telegram or WeChat endpoint is touched.
+See benchmarks.run_benchmarks for usage.
+"""
@@ -0,0 +1,237 @@
+"""
+Local Redis-compatible stand-in for the extraction work queue.
+
+A threaded TCP server speaking RESP2 with the commands RedisWorkQueue
+uses (hashes with TTLs, lists and sorted sets), kept in memory. Enough to
+run the pipeline and extraction workers across processes without a
+Redis installation; not a general-purpose Redis.
+
+Usage (run from src/):
+    python -m benchmarks.fake_redis --port 6390
+    AI_NEWS_EXTRACTION_QUEUE=redis://127.0.0.1:6390/0 python -m fetchers.extract_worker --processes 4
+"""
+
+import argparse
+import bisect
+import socketserver
+import threading
+import time
+
+
+class FakeRedis:
+    """In-memory store for the supported commands; every command runs under one lock."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, kind):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        value = self.data.get(key)
+        if value is None:
+            value = self.data[key] = kind()
+        elif not isinstance(value, kind):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def cleanup(self, key):
+        if not self.data.get(key):
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+    def execute(self, name: str, args: list[bytes]):
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise ValueError(f"ERR unknown command '{name}'")
+        with self.lock:
+            return handler(*args)
+
+    def cmd_ping(self, *args):
+        return "PONG"
+
+    def cmd_auth(self, *args):
+        return "OK"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        self.expires.clear()
+        return "OK"
+
+    def cmd_del(self, *keys):
+        removed = sum(self.data.pop(key, None) is not None for key in keys)
+        for key in keys:
+            self.expires.pop(key, None)
+        return removed
+
+    def cmd_expire(self, key, seconds):
+        if key not in self.data:
+            return 0
+        self.expires[key] = time.time() + int(seconds)
+        return 1
+
+    def cmd_hsetnx(self, key, field, value):
+        hash_ = self.get(key, dict)
+        if field in hash_:
+            return 0
+        hash_[field] = value
+        return 1
+
+    def cmd_hset(self, key, *pairs):
+        hash_ = self.get(key, dict)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in hash_
+            hash_[field] = value
+        return added
+
+    def cmd_hget(self, key, field):
+        value = self.get(key, dict).get(field)
+        self.cleanup(key)
+        return value
+
+    def cmd_hmget(self, key, *fields):
+        hash_ = self.get(key, dict)
+        values = [hash_.get(field) for field in fields]
+        self.cleanup(key)
+        return values
+
+    def cmd_hincrby(self, key, field, increment):
+        hash_ = self.get(key, dict)
+        value = int(hash_.get(field, b"0")) + int(increment)
+        hash_[field] = str(value).encode()
+        return value
+
+    def cmd_rpush(self, key, *values):
+        items = self.get(key, list)
+        items.extend(values)
+        return len(items)
+
+    def cmd_lpop(self, key):
+        items = self.get(key, list)
+        value = items.pop(0) if items else None
+        self.cleanup(key)
+        return value
+
+    def cmd_llen(self, key):
+        length = len(self.get(key, list))
+        self.cleanup(key)
+        return length
+
+    def cmd_zadd(self, key, *pairs):
+        scores = self.get(key, dict)
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in scores
+            scores[member] = float(score)
+        return added
+
+    def cmd_zrem(self, key, *members):
+        scores = self.get(key, dict)
+        removed = sum(scores.pop(member, None) is not None for member in members)
+        self.cleanup(key)
+        return removed
+
+    def cmd_zcard(self, key):
+        count = len(self.get(key, dict))
+        self.cleanup(key)
+        return count
+
+    def cmd_zrangebyscore(self, key, minimum, maximum, *options):
+        scores = self.get(key, dict)
+        ordered = sorted(scores.items(), key=lambda item: (item[1], item[0]))
+        values = [score for _, score in ordered]
+        low = bisect.bisect_left(values, float(minimum))
+        high = bisect.bisect_right(values, float(maximum))
+        members = [member for member, _ in ordered[low:high]]
+        if options and options[0].upper() == b"LIMIT":
+            offset, count = int(options[1]), int(options[2])
+            members = members[offset:offset + count] if count >= 0 else members[offset:]
+        self.cleanup(key)
+        return members
+
+
+def encode_reply(value) -> bytes:
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, bytes):
+        return f"${len(value)}\r\n".encode() + value + b"\r\n"
+    return f"*{len(value)}\r\n".encode() + b"".join(encode_reply(item) for item in value)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command, e.g. from `nc` or `telnet`
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = store.execute(args[0].decode(), args[1:])
+            except Exception as e:
+                message = str(e)
+                reply = ValueError(message if message.startswith(("ERR", "WRONGTYPE")) else f"ERR {message}")
+            self.wfile.write(encode_reply(reply))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), RespHandler)
+        self.store = FakeRedis()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        threading.Thread(target=self.serve_forever, name="fake-redis", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an in-memory Redis-compatible stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Serving {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,239 @@
+"""
+Local stand-ins for every external service the pipeline talks to.
+
+One threaded HTTP server serves:
+- GET  /feeds/<feed>.xml                    synthetic RSS feeds
+- GET  /articles/<feed>/<item>.html         synthetic article pages
+- POST /openai/deployments/<name>/chat/completions
+                                            OpenAI-compatible chat endpoint (Azure path layout)
+- POST /wp-json/wp/v2/posts[/<id>]          WordPress REST sink
+- POST /bot<token>/sendMessage              Telegram Bot API sink
+- POST /wechat/send_message                 WeChat bot sink
+- POST /social/<channel>                    Twitter/Threads sink
+
+Latency (per route kind) and payload sizes are configurable, and every
+request is counted so a benchmark can report how much traffic it caused.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+FEED_PATH = re.compile(r"^/feeds/(\d+)\.xml$")
+ARTICLE_PATH = re.compile(r"^/articles/(\d+)/(\d+)\.html$")
+PROMPT_ARTICLE = re.compile(r'"url": "([^"]+)", "title": "((?:[^"\\]|\\.)*)"')
+
+# Vocabulary for generated articles; keywords make the articles score like real AI news
+WORDS = (
+    "the model team release data research company market users product new open cloud chip "
+    "training inference agents startup funding benchmark platform developers policy"
+).split()
+KEYWORDS = ["AI", "machine learning", "OpenAI", "neural network", "deep learning", "bitcoin"]
+
+ICONS = ["🤖", "🧠", "📜", "💡", "🚀"]
+
+
+class FakeServices:
+    """
+    Threaded local HTTP server standing in for feeds, articles, the LLM and output channels.
+
+    Args:
+        items_per_feed: Articles listed in each feed.
+        article_bytes: Approximate size of each article page.
+        latency: Seconds of delay per route kind, e.g. {"feed": 0.05, "article": 0.1, "llm": 2.0, "sink": 0.05}.
+        llm_items: Number of items the fake LLM returns for a rerank prompt.
+    """
+
+    def __init__(self, items_per_feed: int = 3, article_bytes: int = 8000, latency: dict | None = None,
+                 llm_items: int = 10):
+        self.items_per_feed = items_per_feed
+        self.article_bytes = article_bytes
+        self.latency = {"feed": 0.0, "article": 0.0, "llm": 0.0, "sink": 0.0, **(latency or {})}
+        self.llm_items = llm_items
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._next_post_id = 1
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_urls(self, count: int) -> list[str]:
+        return [f"{self.base_url}/feeds/{index}.xml" for index in range(count)]
+
+    def start(self) -> "FakeServices":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), FakeServiceHandler)
+        self._server.daemon_threads = True
+        self._server.services = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def count(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+    def new_post_id(self) -> int:
+        with self._lock:
+            post_id = self._next_post_id
+            self._next_post_id += 1
+        return post_id
+
+    def render_feed(self, feed: int) -> bytes:
+        pub_date = format_datetime(datetime.now(timezone.utc))
+        items = "".join(
+            f"<item><title>Feed {feed} story {item}: AI update</title>"
+            f"<link>{self.base_url}/articles/{feed}/{item}.html</link>"
+            f"<description>Short summary of story {item} from feed {feed} about AI.</description>"
+            f"<pubDate>{pub_date}</pubDate></item>"
+            for item in range(self.items_per_feed)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Benchmark feed {feed}</title><link>{self.base_url}/</link>"
+            f"<description>Synthetic feed</description>{items}</channel></rss>"
+        ).encode("utf-8")
+
+    def render_article(self, feed: int, item: int) -> bytes:
+        rng = random.Random(feed * 100003 + item)
+        paragraphs, size = [], 0
+        while size < self.article_bytes:
+            words = [rng.choice(WORDS) for _ in range(60)]
+            words[rng.randrange(len(words))] = rng.choice(KEYWORDS)
+            paragraph = " ".join(words).capitalize() + "."
+            paragraphs.append(f"<p>{paragraph}</p>")
+            size += len(paragraph) + 7
+        return (
+            f"<html><head><title>Feed {feed} story {item}</title></head><body>"
+            f"<article><h1>Feed {feed} story {item}: AI update</h1>{''.join(paragraphs)}</article>"
+            "</body></html>"
+        ).encode("utf-8")
+
+    def chat_completion(self, request: dict) -> dict:
+        """Answer like the chat completions API: social copy for JSON mode, otherwise a rerank array."""
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            link = prompt.rsplit(" ", 1)[-1]
+            content = json.dumps({
+                "tweet": f"Today's AI digest is out: {link} #AI",
+                "threads": "Today's AI digest is out #AI",
+            })
+        else:
+            items = []
+            for url, escaped_title in PROMPT_ARTICLE.findall(prompt):
+                if url.startswith("https://example.com"):
+                    continue
+                title = json.loads(f'"{escaped_title}"')
+                items.append({"icon": ICONS[len(items) % len(ICONS)], "title": title,
+                              "summary": f"One-line summary of {title}.", "url": url})
+            content = json.dumps(items[:self.llm_items], ensure_ascii=False)
+
+        prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-bench-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model") or "bench-model",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so the pooled HTTP session behaves as it does against real hosts
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def services(self) -> FakeServices:
+        return self.server.services
+
+    def respond(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def respond_json(self, payload, status: int = 200):
+        self.respond(json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", status)
+
+    def delay(self, kind: str):
+        self.services.count(kind)
+        seconds = self.services.latency.get(kind, 0.0)
+        if seconds:
+            time.sleep(seconds)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        feed_match = FEED_PATH.match(path)
+        article_match = ARTICLE_PATH.match(path)
+        if feed_match:
+            self.delay("feed")
+            self.respond(self.services.render_feed(int(feed_match.group(1))), "application/rss+xml")
+        elif article_match:
+            self.delay("article")
+            self.respond(self.services.render_article(*map(int, article_match.groups())), "text/html; charset=utf-8")
+        else:
+            self.respond_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if path.endswith("/chat/completions"):
+            self.delay("llm")
+            self.respond_json(self.services.chat_completion(json.loads(body or b"{}")))
+        elif path.startswith("/wp-json/wp/v2/posts"):
+            self.delay("sink")
+            post_id = path.rsplit("/", 1)[-1]
+            if post_id.isdigit():
+                status, post_id = 200, int(post_id)
+            else:
+                status, post_id = 201, self.services.new_post_id()
+            self.respond_json({"id": post_id, "link": f"{self.services.base_url}/blog/{post_id}"}, status)
+        elif path.endswith("/sendMessage"):
+            self.delay("sink")
+            self.respond_json({"ok": True, "result": {
+                "message_id": self.services.new_post_id(),
+                "date": int(time.time()),
+                "chat": {"id": -1001, "type": "group", "title": "bench"},
+                "text": "ok",
+            }})
+        elif path == "/wechat/send_message" or path.startswith("/social/"):
+            self.delay("sink")
+            self.respond_json({"status": "ok"})
+        else:
+            self.respond_json({"error": "not found"}, 404)
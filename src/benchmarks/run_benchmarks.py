@@ -0,0 +1,280 @@
+"""
+Offline Pipeline Benchmarks
+
+Measures fetch_rss_feeds, the LLM reranker and the full run_pipeline at
+several feed counts against local stand-ins (benchmarks.fake_services):
+synthetic RSS feeds and articles, a fake OpenAI-compatible chat endpoint,
+and fake WordPress/Telegram/WeChat/social sinks. No real service is
+touched, and all local state goes to a temporary cache directory.
+
+Usage (run from src/):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --feeds 10 100 --repeat 3 --article-latency 0.05 --llm-latency 2
+    python -m benchmarks.run_benchmarks --output bench.json --baseline previous.json
+
+With --baseline, a benchmark whose median is more than --tolerance slower
+than the baseline is reported as a regression and the exit code is 1.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_services import FakeServices
+
+BENCHMARKS = ("fetch", "rerank", "pipeline")
+DEFAULT_FEED_COUNTS = (10, 100, 1000)
+DEFAULT_TOLERANCE = 0.2
+
+
+def configure_environment(services: FakeServices, cache_dir: str):
+    """
+    Point every service setting at the local stand-ins.
+
+    Must run before the pipeline modules are imported: several of them read
+    their settings (and CACHE_DIR) at import time.
+    """
+    base_url = services.base_url
+    os.environ.update(
+        {
+            "AI_NEWS_CACHE_DIR": cache_dir,
+            "NO_PROXY": "127.0.0.1,localhost",
+            "AZURE_OPENAI_ENDPOINT": base_url,
+            "AZURE_OPENAI_API_KEY": "bench",
+            "AZURE_OPENAI_MODEL": "bench-model",
+            "WORDPRESS_SITE": base_url,
+            "WORDPRESS_USERNAME": "bench",
+            "WORDPRESS_APP_PASSWORD": "bench",
+            "TELEGRAM_BOT_TOKEN": "123456:bench",
+            "TELEGRAM_CHAT_IDS": "-1001",
+            "WECHAT_BOT_URL": f"{base_url}/wechat/send_message",
+            "WECHAT_API_KEY": "bench",
+            # No Threads token: token validation stays local
+            "THREADS_ACCESS_TOKEN": "",
+        }
+    )
+
+
+def social_sink(services: FakeServices, channel: str):
+    """Channel function that posts to the fake social sink instead of Twitter/Threads."""
+    from utils.http_session import get_session
+
+    def send(**payload):
+        response = get_session().post(f"{services.base_url}/social/{channel}", json=payload)
+        return response.status_code == 200
+
+    return send
+
+
+def redirect_telegram(services: FakeServices):
+    """
+    Give the Telegram sender a bot that talks to the fake Bot API.
+
+    The bot's HTTP client is bound to the event loop it first ran on, so a
+    new one is needed for every asyncio.run.
+    """
+    from telegram import Bot
+
+    from outputs import telegram_sender
+
+    telegram_sender.get_telegram_bot().bot = Bot(token=os.environ["TELEGRAM_BOT_TOKEN"], base_url=f"{services.base_url}/bot")
+
+
+def redirect_channels(services: FakeServices, summary_dir: str):
+    """Send the remaining hard-wired endpoints (Tranco, Telegram, Twitter, Threads, summary files) to local stand-ins."""
+    import main as pipeline
+    from fetchers import rss_fetcher
+    from outputs import delivery
+
+    # Skip the Tranco list download; it isn't used for scoring
+    rss_fetcher.latest_list = []
+    redirect_telegram(services)
+    delivery.CHANNELS["twitter"] = social_sink(services, "twitter")
+    delivery.CHANNELS["threads"] = social_sink(services, "threads")
+    pipeline.SUMMARY_DIR = summary_dir
+
+
+def reset_state(services: FakeServices, cache_dir: str):
+    """Start each pipeline run cold: no outbox, post map, social copy cache, checkpoints or article cache."""
+    from fetchers.rss_fetcher import clear_article_cache
+
+    clear_article_cache()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    redirect_telegram(services)
+
+
+def timing_stats(durations: list[float]) -> dict:
+    ordered = sorted(durations)
+    return {
+        "runs": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+def timed(fn, repeat: int, before=None) -> tuple[list[float], object]:
+    """Run `fn` `repeat` times; returns the durations and the last result."""
+    durations, result = [], None
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return durations, result
+
+
+def run_benchmarks(services: FakeServices, cache_dir: str, feed_counts, benchmarks, repeat: int) -> list[dict]:
+    """
+    Run the selected benchmarks at each feed count.
+
+    Returns:
+        One result per (benchmark, feeds): {benchmark, feeds, runs, min, median, p95, mean, throughput, requests}
+    """
+    import main as pipeline
+    from config import LLM_DEADLINE_SECONDS, LLM_HEDGE_PERCENTILE
+    from fetchers.rss_fetcher import clear_article_cache, fetch_rss_feeds
+    from processors.llm_reranker import re_rank_and_summarize_with_llm
+
+    results = []
+
+    def record(name, feeds, durations, unit_count, unit):
+        stats = timing_stats(durations)
+        results.append(
+            {
+                "benchmark": name,
+                "feeds": feeds,
+                **stats,
+                "throughput": f"{unit_count / stats['median']:.1f} {unit}/s" if stats["median"] else "-",
+                "requests": dict(services.requests),
+            }
+        )
+        logging.getLogger(__name__).info(f"{name} @ {feeds} feeds: median {stats['median']:.2f}s")
+
+    for feeds in feed_counts:
+        feed_urls = services.feed_urls(feeds)
+        articles = None
+
+        if "fetch" in benchmarks or "rerank" in benchmarks:
+            services.reset_counts()
+            durations, articles = timed(
+                lambda: fetch_rss_feeds(feed_urls, max_to_rank=20),
+                repeat if "fetch" in benchmarks else 1,
+                before=clear_article_cache,
+            )
+            if "fetch" in benchmarks:
+                record("fetch", feeds, durations, feeds, "feeds")
+
+        if "rerank" in benchmarks:
+            services.reset_counts()
+            durations, _ = timed(
+                lambda: re_rank_and_summarize_with_llm(
+                    articles, deadline=LLM_DEADLINE_SECONDS, hedge_percentile=LLM_HEDGE_PERCENTILE),
+                repeat,
+            )
+            record("rerank", feeds, durations, len(articles), "articles")
+
+        if "pipeline" in benchmarks:
+            pipeline.SITES_CONFIG = feed_urls
+            services.reset_counts()
+            durations, _ = timed(lambda: asyncio.run(pipeline.run_pipeline()), repeat, before=lambda: reset_state(services, cache_dir))
+            record("pipeline", feeds, durations, feeds, "feeds")
+
+    return results
+
+
+def print_results(results: list[dict], baseline: dict | None = None, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Print the results table; returns the names of benchmarks that regressed against the baseline."""
+    regressions = []
+    print(f"{'benchmark':<10}{'feeds':>7}{'runs':>6}{'min':>9}{'median':>9}{'p95':>9}  {'throughput':<18}{'vs baseline':>12}")
+    for result in results:
+        key = f"{result['benchmark']}@{result['feeds']}"
+        change = ""
+        if baseline and key in baseline:
+            ratio = result["median"] / baseline[key]["median"] - 1 if baseline[key]["median"] else 0.0
+            change = f"{ratio:+.0%}"
+            if ratio > tolerance:
+                change += " !"
+                regressions.append(key)
+        print(
+            f"{result['benchmark']:<10}{result['feeds']:>7}{result['runs']:>6}{result['min']:>8.2f}s"
+            f"{result['median']:>8.2f}s{result['p95']:>8.2f}s  {result['throughput']:<18}{change:>12}"
+        )
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return {f"{r['benchmark']}@{r['feeds']}": r for r in json.load(f)["results"]}
+
+
+def run_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against local stand-ins for every external service.")
+    parser.add_argument("--feeds", type=int, nargs="+", default=list(DEFAULT_FEED_COUNTS), help="Feed counts to measure")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark and feed count")
+    parser.add_argument("--items-per-feed", type=int, default=3, help="Articles per synthetic feed")
+    parser.add_argument("--article-bytes", type=int, default=8000, help="Approximate size of each article page")
+    parser.add_argument("--feed-latency", type=float, default=0.0, help="Seconds of latency per feed request")
+    parser.add_argument("--article-latency", type=float, default=0.0, help="Seconds of latency per article request")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds of latency per LLM request")
+    parser.add_argument("--sink-latency", type=float, default=0.05, help="Seconds of latency per channel request")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare medians with a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    parser.add_argument("--trace", action="store_true", help="Record tracing spans and print their summary")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own log output")
+    args = parser.parse_args(argv)
+
+    services = FakeServices(
+        items_per_feed=args.items_per_feed,
+        article_bytes=args.article_bytes,
+        latency={"feed": args.feed_latency, "article": args.article_latency, "llm": args.llm_latency,
+                 "sink": args.sink_latency},
+    ).start()
+    work_dir = tempfile.mkdtemp(prefix="ai-news-bench-")
+    cache_dir = os.path.join(work_dir, "cache")
+    try:
+        configure_environment(services, cache_dir)
+        redirect_channels(services, os.path.join(work_dir, "daily_summary"))
+        logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+        logging.getLogger(__name__).setLevel(logging.INFO)
+
+        from utils import tracing
+        if args.trace:
+            tracing.enable()
+
+        results = run_benchmarks(services, cache_dir, args.feeds, args.benchmarks, args.repeat)
+    finally:
+        services.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    regressions = print_results(results, baseline, args.tolerance)
+
+    if args.trace:
+        print()
+        tracing.print_summary()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "settings": vars(args), "results": results}, f, indent=2)
+
+    if regressions:
+        print(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli())
@@ -0,0 +1,95 @@
+"""
+Startup Benchmarks
+
+Measures cold-start cost with `python -X importtime` in fresh interpreters:
+total import time, wall time and the slowest top-level imports for each
+scenario. Credentials are stripped from the environment, so a scenario
+that needs one at import time fails instead of hiding the cost.
+
+Usage (run from src/):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --top 10
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scenario name -> code run in a fresh interpreter
+SCENARIOS = {
+    "cli": "import main",
+    "fetch-only": "import main; import fetchers.rss_fetcher",
+    "full": (
+        "import main; import fetchers.rss_fetcher; import processors.llm_reranker; "
+        "from outputs.delivery import CHANNELS, load_channel; [load_channel(name) for name in list(CHANNELS)]"
+    ),
+}
+
+# Environment variables kept for the child interpreters
+KEPT_ENV = ("PATH", "HOME", "LANG", "LC_ALL", "PYTHONPATH", "VIRTUAL_ENV", "TMPDIR")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, int, str]]:
+    """Parse `-X importtime` output into (self_us, cumulative_us, depth, module) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, module))
+    return rows
+
+
+def measure(code: str) -> dict:
+    """Run `code` in a fresh interpreter; returns wall time, import time and the top-level imports."""
+    env = {key: os.environ[key] for key in KEPT_ENV if key in os.environ}
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    rows = parse_importtime(process.stderr)
+    return {
+        "ok": process.returncode == 0,
+        "error": process.stderr.strip().splitlines()[-1] if process.returncode else None,
+        "wall": wall,
+        "imports": sum(row[0] for row in rows) / 1e6,
+        "modules": len(rows),
+        "top_level": sorted(((row[1] / 1e6, row[3]) for row in rows if row[2] == 0), reverse=True),
+    }
+
+
+def run(scenarios, repeat: int, top: int):
+    print(f"{'scenario':<12}{'wall':>9}{'imports':>10}{'modules':>9}  slowest top-level imports")
+    for name in scenarios:
+        runs = [measure(SCENARIOS[name]) for _ in range(repeat)]
+        if not all(r["ok"] for r in runs):
+            failed = next(r for r in runs if not r["ok"])
+            print(f"{name:<12} failed: {failed['error']}")
+            continue
+        # The median run by import time represents the scenario
+        median_run = sorted(runs, key=lambda r: r["imports"])[len(runs) // 2]
+        slowest = ", ".join(f"{module} {seconds:.2f}s" for seconds, module in median_run["top_level"][:top])
+        print(
+            f"{name:<12}{statistics.median(r['wall'] for r in runs):>8.2f}s"
+            f"{median_run['imports']:>9.2f}s{median_run['modules']:>9}  {slowest}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure interpreter startup and import cost per scenario.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    run(args.scenarios, args.repeat, args.top)
@@ -1,8 +1,58 @@
+import os
+
 AZURE_OPENAI_ENDPOINT = "https://<your-openai-endpoint>.openai.azure.com/"
 AZURE_OPENAI_KEY = "YOUR_AZURE_OPENAI_KEY"
 AZURE_OPENAI_DEPLOYMENT = "your-deployment-name"
 AZURE_OPENAI_API_VERSION = "2025-01-01-preview"
 
+# Local state (LLM ledger, caches) lives here; AI_NEWS_CACHE_DIR overrides it (e.g. for benchmarks)
+CACHE_DIR = os.getenv("AI_NEWS_CACHE_DIR") or os.path.join(os.path.dirname(__file__), ".cache")
+
+# Hard limit for the LLM re-rank step; on timeout a local digest is built instead
+LLM_DEADLINE_SECONDS = 120
+# Send a hedged duplicate LLM request once the first exceeds this latency percentile (None disables)
+LLM_HEDGE_PERCENTILE = 90
+
+# Run deadline (utils.run_budget): the daily run must be done RUN_BUDGET_SECONDS after it starts,
+# or by AI_NEWS_PUBLISH_BY (local "HH:MM") if set. The time is split between the stages by these shares.
+RUN_BUDGET_SECONDS = 30 * 60
+PUBLISH_BY = os.getenv("AI_NEWS_PUBLISH_BY")
+RUN_STAGE_SHARES = {"fetch": 0.3, "extract": 0.3, "rank": 0.3, "publish": 0.1}
+
+# LLM request limits for batch work (processors.backfill): requests in flight, and started per minute
+LLM_MAX_CONCURRENCY = 4
+LLM_REQUESTS_PER_MINUTE = 30
+
+# Article extraction work queue: None extracts in-process; "sqlite:///path/queue.db" or
+# "redis://host:6379/0" hands articles to worker processes (python -m fetchers.extract_worker)
+EXTRACTION_QUEUE_URL = os.getenv("AI_NEWS_EXTRACTION_QUEUE")
+# How long a run waits for queued extractions before using feed summaries instead
+EXTRACTION_WAIT_SECONDS = 600
+
+# Keep every run's candidates, scores, clusters and digests in the searchable archive (outputs.archive)
+ARCHIVE_ENABLED = True
+
+# Output channels to deliver to; channel modules are only imported when enabled
+ENABLED_CHANNELS = ["telegram", "wechat", "wordpress", "twitter", "threads"]
+
+# Scheduler daemon jobs, in cron syntax (minute hour day-of-month month day-of-week, local time)
+SCHEDULE = {
+    "digest": "0 8 * * *",  # Daily digest
+    "poll": "*/5 * * * *",  # Checks for due feeds; each feed's own interval is learned (fetchers.feed_scheduler)
+    "probe": "30 */6 * * *",  # Feed health probes; unhealthy sources are quarantined (fetchers.feed_health)
+}
+# How long the daemon waits for running jobs to finish on shutdown
+SHUTDOWN_GRACE_SECONDS = 300
+
+# Per-channel delivery timeouts in seconds
+CHANNEL_TIMEOUTS = {
+    "telegram": 60,
+    "wechat": 30,
+    "wordpress": 60,
+    "twitter": 30,
+    "threads": 120,
+}
+
 SITES_CONFIG = [
     "https://technode.com/feed/",
     # "https://36kr.com/feed",
@@ -17,6 +67,94 @@ SITES_CONFIG = [
     "https://ai-techpark.com/category/ai/feed/",
     "https://news.ycombinator.com/rss",
     "https://aibusiness.com/rss.xml",
-    "https://news.google.com/rss/search?q=blockchain&hl=en-US&gl=US&ceid=US:en",
     # Add more sites as needed
 ]
+
+CRYPTO_SITES = [
+    "https://news.google.com/rss/search?q=blockchain&hl=en-US&gl=US&ceid=US:en",
+]
+
+# Limits every source gets per run unless SOURCE_SETTINGS overrides them (fetchers.sources)
+SOURCE_DEFAULTS = {
+    "enabled": True,
+    "max_entries": 25,  # Fresh entries taken per run, newest first
+    "timeout": 60,  # Seconds for downloading the feed and its articles
+    "max_bytes": 20_000_000,  # Bytes downloaded for the feed and its articles
+    "weight": 1.0,  # Multiplies the scores of the source's articles
+    "extractor": "newspaper",  # "newspaper" (full text) or "summary" (feed summary, no article download)
+}
+
+# Per-source overrides, keyed by feed URL
+SOURCE_SETTINGS = {
+    # Search results link to Google redirect pages; the feed summary is all there is to extract
+    "https://news.google.com/rss/search?q=blockchain&hl=en-US&gl=US&ceid=US:en": {
+        "max_entries": 15,
+        "extractor": "summary",
+        "weight": 0.8,
+    },
+    "https://news.ycombinator.com/rss": {"max_entries": 20},
+    "https://feeds.bloomberg.com/technology/news.rss": {"max_entries": 15},
+}
+
+# Feed health (fetchers.feed_health): sources failing these rules are quarantined, i.e. skipped by
+# the daily run and the polls, until `release_after` healthy probes in a row.
+QUARANTINE_RULES = {
+    "max_failures": 3,  # failed fetches in a row (errors, timeouts, responses that aren't feeds)
+    "max_latency": 20,  # seconds, median of the recent successful fetches
+    "stale_days": 30,  # days without a new entry
+    "min_probes": 3,  # fetches on record before latency and staleness are judged
+    "release_after": 2,
+}
+
+# Topic profiles: each enabled profile scores the same fetched article pool and produces its own digest.
+#   title:       WordPress post title
+#   heading:     digest heading and footer name (default: title; None: the formatter's own wording)
+#   keywords:    keyword -> weight, matched case-insensitively in titles (x3) and content (x2)
+#   sources:     feeds the profile draws from (None: SITES_CONFIG); all profiles' feeds are fetched once
+#   channels:    channels the digest goes to (None: all of ENABLED_CHANNELS; others are never used)
+#   max_to_rank: candidates sent to the LLM re-rank
+DEFAULT_PROFILE = "ai"
+TOPIC_PROFILES = {
+    "ai": {
+        "title": "Daily Tech & AI News Digest",
+        "heading": None,
+        "keywords": {
+            "AI": 4,
+            "Artificial Intelligence": 4,
+            "Machine Learning": 4,
+            "Deep Learning": 4,
+            "Neural Network": 4,
+            "Natural Language Processing": 4,
+            "NLP": 4,
+            "OpenAI": 4,
+            "ChatGPT": 4,
+            "Blockchain": 1,
+            "Bitcoin": 1,
+            "Ethereum": 1,
+            "Cryptocurrency": 1,
+            "DeFi": 1,
+        },
+        "sources": None,
+        "channels": None,
+        "max_to_rank": 20,
+        "category_id": 103,  # "Daily AI News" WordPress category
+    },
+    "crypto": {
+        "enabled": False,
+        "title": "Daily Crypto & Blockchain Digest",
+        "keywords": {
+            "Blockchain": 4,
+            "Bitcoin": 4,
+            "Ethereum": 4,
+            "Cryptocurrency": 4,
+            "Crypto": 3,
+            "DeFi": 3,
+            "Stablecoin": 3,
+            "AI": 1,
+        },
+        "sources": SITES_CONFIG + CRYPTO_SITES,
+        "channels": ["telegram", "wordpress"],
+        "max_to_rank": 15,
+        "category_id": None,
+    },
+}
@@ -0,0 +1,205 @@
+"""
+Article Extraction Workers
+
+With config.EXTRACTION_QUEUE_URL set, the pipeline still reads the feeds
+itself but hands each fresh article to a work queue (fetchers.work_queue)
+instead of downloading it in-process. Worker processes, on this host or
+others pointed at the same queue, download and parse the articles and
+compute their readability; keyword scoring stays in the pipeline, as it
+differs per topic profile.
+
+The pipeline works through jobs itself while it waits, so a run with no
+workers still finishes, and it falls back to the feed summary for
+articles that aren't extracted by EXTRACTION_WAIT_SECONDS. Jobs are keyed
+by URL: an article extracted in the last two days is not extracted again.
+
+Usage (run from src/):
+    python -m fetchers.extract_worker --queue redis://queue-host:6379/0 --processes 4
+    python -m fetchers.extract_worker --queue sqlite:///srv/ai-news/work_queue.db
+    python -m fetchers.extract_worker --stats   # job counts of the configured queue
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Optional
+
+from config import EXTRACTION_QUEUE_URL, EXTRACTION_WAIT_SECONDS
+from fetchers.rss_fetcher import cache_full_text, cached_full_text, download_full_text, extracted_fields
+from fetchers.sources import SourceBudget
+from fetchers.work_queue import open_queue
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# A worker holds a job this long before another worker may take it over
+LEASE_SECONDS = 120
+# Sleep of an idle worker between claims, and of the pipeline between result checks
+IDLE_SLEEP = 1.0
+RESULT_POLL_INTERVAL = 0.5
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def extract_job(payload: dict) -> dict:
+    """
+    Extraction fields for one article; raises if the download fails, so the job is retried.
+
+    The source's time and byte budget ('timeout', 'max_bytes' in the payload) caps the article's download.
+    """
+    url = payload["url"]
+    text = cached_full_text(url)
+    if text is None:
+        text = download_full_text(url, SourceBudget(payload.get("timeout"), payload.get("max_bytes")))
+        if text:
+            cache_full_text(url, text)
+    return extracted_fields(text or payload.get("summary", ""))
+
+
+def process_one(queue, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+    """Claim and run one job; returns False if none was available."""
+    job = queue.claim(worker, lease_seconds)
+    if job is None:
+        return False
+    try:
+        result = extract_job(job["payload"])
+    except Exception as e:
+        logger.warning(f"⚠️ Extraction of {job['key']} failed (attempt {job['attempts']}): {e}")
+        queue.fail(job["key"], str(e))
+    else:
+        queue.complete(job["key"], result)
+    return True
+
+
+def extract_with_queue(articles: list[dict], queue, wait_timeout: float = EXTRACTION_WAIT_SECONDS,
+                       work: bool = True):
+    """
+    Extract articles through the work queue, filling in their content, status and readability in place.
+
+    Args:
+        articles: Articles with 'url', 'summary' and optionally their source's 'limits' (from rss_fetcher.collect_articles).
+        queue: A work queue from fetchers.work_queue.open_queue.
+        wait_timeout: Seconds to wait for results before falling back to feed summaries.
+        work: Run jobs in this process while waiting, as one more worker.
+    """
+    by_url = {article["url"]: article for article in articles}
+    queue.purge()
+    with span("extract_queue", "extract", articles=len(by_url)) as s:
+        queued = sum(
+            queue.enqueue(url, {"url": url, "summary": article["summary"], **article.get("limits", {})})
+            for url, article in by_url.items()
+        )
+        logger.info(f"📨 Queued {queued} extraction jobs ({len(by_url) - queued} already known).")
+
+        outstanding = set(by_url)
+        extracted = failed = 0
+        worker = f"{worker_id()}:pipeline"
+        deadline = time.monotonic() + wait_timeout
+        last_check = 0.0
+        while outstanding and time.monotonic() < deadline:
+            ran_job = work and process_one(queue, worker)
+            if ran_job and time.monotonic() - last_check < RESULT_POLL_INTERVAL:
+                continue
+            last_check = time.monotonic()
+            for url, outcome in queue.results(list(outstanding)).items():
+                outstanding.discard(url)
+                if outcome["status"] == "done" and outcome["result"]:
+                    by_url[url].update(outcome["result"])
+                    extracted += 1
+                else:
+                    by_url[url].update(extracted_fields(by_url[url]["summary"]))
+                    failed += 1
+            if outstanding and not ran_job:
+                time.sleep(RESULT_POLL_INTERVAL)
+
+        for url in outstanding:
+            by_url[url].update(extracted_fields(by_url[url]["summary"]))
+        s.set(extracted=extracted, failed=failed, timed_out=len(outstanding))
+
+    if outstanding:
+        logger.warning(f"⏰ {len(outstanding)} articles weren't extracted within {wait_timeout:.0f}s; using feed summaries.")
+    logger.info(f"🧩 Queue extraction: {extracted} extracted, {failed} failed, {len(outstanding)} timed out.")
+
+
+def run_worker(queue_url: Optional[str], stop_event: Optional[threading.Event] = None,
+               idle_exit: Optional[float] = None) -> int:
+    """
+    Run extraction jobs until stopped (or idle for `idle_exit` seconds).
+
+    Returns:
+        int: Number of jobs run.
+    """
+    queue = open_queue(queue_url)
+    stop_event = stop_event or threading.Event()
+    worker = worker_id()
+    jobs = 0
+    idle_since = None
+    logger.info(f"👷 Worker {worker} started.")
+    while not stop_event.is_set():
+        if process_one(queue, worker):
+            jobs += 1
+            idle_since = None
+            continue
+        idle_since = idle_since or time.monotonic()
+        if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+            break
+        stop_event.wait(IDLE_SLEEP)
+    logger.info(f"👋 Worker {worker} stopped after {jobs} jobs.")
+    return jobs
+
+
+def worker_process(queue_url: Optional[str], idle_exit: Optional[float]):
+    """Process entry point: SIGTERM/SIGINT finish the current job, then exit."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+    stop_event = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop_event.set())
+    run_worker(queue_url, stop_event, idle_exit)
+
+
+def run_workers(queue_url: Optional[str], processes: int, idle_exit: Optional[float] = None):
+    """Run `processes` worker processes until they exit; SIGTERM is passed on to them."""
+    workers = [
+        multiprocessing.Process(target=worker_process, args=(queue_url, idle_exit), name=f"extract-worker-{index}")
+        for index in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in workers])
+    # Ctrl-C reaches the workers directly (same process group); the parent just waits for them
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Run article extraction workers for a work queue.")
+    parser.add_argument("--queue", default=EXTRACTION_QUEUE_URL,
+                        help="Queue URL, sqlite:///path or redis://host:port/db (default: config.EXTRACTION_QUEUE_URL)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes on this host")
+    parser.add_argument("--idle-exit", type=float, help="Exit after this many seconds without work")
+    parser.add_argument("--stats", action="store_true", help="Print the queue's job counts and exit")
+    args = parser.parse_args()
+
+    if args.stats:
+        for status, count in open_queue(args.queue).stats().items():
+            print(f"{status:<10}{count:>8}")
+    else:
+        run_workers(args.queue, args.processes, args.idle_exit)
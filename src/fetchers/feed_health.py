@@ -0,0 +1,332 @@
+"""
+Feed Health and Quarantine
+
+Keeps a health record per source in .cache/feed_health.json: the last
+MAX_OBSERVATIONS fetches of its feed (latency, bytes, entries, errors),
+its entries per day and its last success. Records are fed by the health
+probes and by every feed download of the daily run, which records its
+downloads once the fetch stage is done.
+
+A source is quarantined when it breaks config.QUARANTINE_RULES:
+
+- dead:  its last `max_failures` fetches failed: HTTP errors, timeouts,
+         or responses that don't parse as a feed (an HTML page, say)
+- slow:  the median latency of its recent successful fetches is over
+         `max_latency`
+- stale: it has published nothing for `stale_days`
+
+Quarantined sources are skipped, and reported, by the daily run and the
+intraday polls. The probes keep checking them and release a source after
+`release_after` healthy fetches in a row. Without the scheduler daemon's
+probe job (cron deployments), the daily run probes the quarantined sources
+not fetched for REPROBE_SECONDS before it skips them.
+
+Usage (run from src/):
+    python -m fetchers.feed_health            # health report of every configured source
+    python -m fetchers.feed_health --probe    # probe every source concurrently, then report
+    python -m fetchers.feed_health --release https://example.com/feed   # lift a quarantine by hand
+"""
+
+import argparse
+import calendar
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from config import CACHE_DIR, QUARANTINE_RULES
+from fetchers.sources import SourceBudget, enabled_sources
+from processors.topic_profiles import all_sources, select_profiles
+
+logger = logging.getLogger(__name__)
+
+HEALTH_FILE = os.path.join(CACHE_DIR, "feed_health.json")
+
+# Fetches kept per source; latency and parse errors are judged over the last RECENT of them
+MAX_OBSERVATIONS = 30
+RECENT = 10
+
+PROBE_WORKERS = 8
+
+# The daily run probes a quarantined source first if it hasn't been fetched for this long (the probe job's period)
+REPROBE_SECONDS = 6 * 3600
+
+# Serializes read-modify-write of the health file between the threads of one process
+_health_lock = threading.Lock()
+
+
+def new_record() -> dict:
+    return {
+        "observations": [],
+        "consecutive_failures": 0,
+        "consecutive_healthy": 0,
+        "last_success_at": None,
+        "last_entry_at": None,
+        "entries_per_day": None,
+        "quarantined": None,
+    }
+
+
+def load_health(path: str = HEALTH_FILE) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        return records if isinstance(records, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_health(records: dict, path: str = HEALTH_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def observe(started: float, bytes_used: int = 0, feed=None, error: Optional[Exception] = None,
+            now: Optional[float] = None) -> dict:
+    """
+    One fetch of a feed, as recorded in its health record.
+
+    Args:
+        started: time.monotonic() when the download started.
+        feed: The parsed feed, if the download succeeded.
+        error: The exception the download or parsing raised, if any.
+    """
+    now = time.time() if now is None else now
+    observation = {
+        "at": now,
+        "latency": round(time.monotonic() - started, 3),
+        "bytes": bytes_used,
+        "entries": 0,
+        "newest_entry_at": None,
+        "entries_per_day": None,
+        "error": None,
+        "parse_error": False,
+    }
+    if error is not None:
+        observation["error"] = str(error) or type(error).__name__
+        return observation
+
+    if not feed.entries and (feed.get("bozo") or not feed.get("version")):
+        # feedparser takes anything; an HTML page comes back as a "feed" without entries
+        reason = feed.get("bozo_exception") or "no RSS or Atom content"
+        observation.update(error=f"not a feed: {reason}", parse_error=True)
+        return observation
+
+    timestamps = sorted(
+        calendar.timegm(parsed)
+        for parsed in (entry.get("published_parsed") or entry.get("updated_parsed") for entry in feed.entries)
+        if parsed
+    )
+    observation["entries"] = len(feed.entries)
+    if timestamps:
+        observation["newest_entry_at"] = timestamps[-1]
+        # Rate over the period the feed covers, at least a day
+        days = max((now - timestamps[0]) / 86400, 1.0)
+        observation["entries_per_day"] = round(len(timestamps) / days, 2)
+    return observation
+
+
+def quarantine_reason(record: dict, rules: dict = QUARANTINE_RULES, now: Optional[float] = None) -> Optional[str]:
+    """Why the source breaks the quarantine rules, or None if it doesn't."""
+    now = time.time() if now is None else now
+    recent = record["observations"][-RECENT:]
+    if record["consecutive_failures"] >= rules["max_failures"]:
+        return f"dead: {record['consecutive_failures']} failed fetches in a row ({recent[-1]['error']})"
+
+    successes = [observation for observation in recent if observation["error"] is None]
+    if len(successes) < rules["min_probes"]:
+        return None
+    latency = float(np.median([observation["latency"] for observation in successes]))
+    if latency > rules["max_latency"]:
+        return f"slow: median latency {latency:.1f}s"
+    last_entry_at = record["last_entry_at"]
+    if last_entry_at is not None:
+        stale = now - last_entry_at > rules["stale_days"] * 86400
+    else:
+        # Undated entries can't be judged, but a feed that never has any entries can
+        stale = not any(observation["entries"] for observation in successes)
+    if stale:
+        return f"stale: no new entry in {rules['stale_days']} days"
+    return None
+
+
+def update_record(feed_url: str, record: dict, observation: dict, rules: dict = QUARANTINE_RULES):
+    """Add a fetch to the source's record, then quarantine or release the source."""
+    record["observations"] = (record["observations"] + [observation])[-MAX_OBSERVATIONS:]
+    now = observation["at"]
+    if observation["error"] is None:
+        record["consecutive_failures"] = 0
+        record["last_success_at"] = now
+        if observation["newest_entry_at"] is not None:
+            record["last_entry_at"] = max(record["last_entry_at"] or 0, observation["newest_entry_at"])
+        if observation["entries_per_day"] is not None:
+            record["entries_per_day"] = observation["entries_per_day"]
+    else:
+        record["consecutive_failures"] += 1
+
+    healthy = observation["error"] is None and observation["latency"] <= rules["max_latency"]
+    record["consecutive_healthy"] = record["consecutive_healthy"] + 1 if healthy else 0
+
+    reason = quarantine_reason(record, rules, now)
+    if record["quarantined"] is None and reason:
+        record["quarantined"] = {"since": now, "reason": reason}
+        logger.warning(f"🚧 Quarantined {feed_url}: {reason}")
+    elif record["quarantined"] is not None and not reason and record["consecutive_healthy"] >= rules["release_after"]:
+        record["quarantined"] = None
+        logger.info(f"✅ Released {feed_url} from quarantine after {record['consecutive_healthy']} healthy fetches.")
+
+
+def record_observations(observations: dict, path: str = HEALTH_FILE):
+    """Add fetches ({feed url: observation}) to the health records and save them."""
+    if not observations:
+        return
+    with _health_lock:
+        records = load_health(path)
+        for feed_url, observation in observations.items():
+            update_record(feed_url, records.setdefault(feed_url, new_record()), observation)
+        save_health(records, path)
+
+
+def quarantined_sources(path: str = HEALTH_FILE) -> dict:
+    """{feed url: reason} of every quarantined source."""
+    return {
+        feed_url: record["quarantined"]["reason"]
+        for feed_url, record in load_health(path).items()
+        if record.get("quarantined")
+    }
+
+
+def reprobe_due(feed_urls: list[str], path: str = HEALTH_FILE, now: Optional[float] = None) -> list[str]:
+    """The quarantined feeds among `feed_urls` that haven't been fetched for REPROBE_SECONDS."""
+    now = time.time() if now is None else now
+    records = load_health(path)
+    due = []
+    for feed_url in feed_urls:
+        record = records.get(feed_url)
+        if record and record.get("quarantined"):
+            last_fetch_at = record["observations"][-1]["at"] if record["observations"] else 0
+            if now - last_fetch_at >= REPROBE_SECONDS:
+                due.append(feed_url)
+    return due
+
+
+def healthy_sources(feed_urls: list[str], path: str = HEALTH_FILE, probe: bool = True) -> list[str]:
+    """
+    The feeds that aren't quarantined; the skipped ones are logged.
+
+    With `probe`, quarantined feeds due for a probe (see reprobe_due) are
+    probed first, so they can be released without the daemon's probe job.
+    """
+    due = reprobe_due(feed_urls, path) if probe else []
+    if due:
+        logger.info(f"🩺 Probing {len(due)} quarantined sources before skipping them...")
+        probe_sources(due, path=path)
+    quarantined = quarantined_sources(path)
+    skipped = [feed_url for feed_url in feed_urls if feed_url in quarantined]
+    for feed_url in skipped:
+        logger.warning(f"🚧 Skipping quarantined source {feed_url} ({quarantined[feed_url]})")
+    return [feed_url for feed_url in feed_urls if feed_url not in quarantined]
+
+
+def release(feed_url: str, path: str = HEALTH_FILE) -> bool:
+    """Lift a source's quarantine; returns False if it wasn't quarantined."""
+    with _health_lock:
+        records = load_health(path)
+        record = records.get(feed_url)
+        if not record or not record.get("quarantined"):
+            return False
+        record["quarantined"] = None
+        record["consecutive_failures"] = 0
+        save_health(records, path)
+    logger.info(f"✅ Released {feed_url} from quarantine by hand.")
+    return True
+
+
+def probe_feed(feed_url: str) -> dict:
+    """Download and parse one feed within its source budget; returns the observation."""
+    from fetchers.rss_fetcher import download_feed, parse_feed
+
+    budget = SourceBudget.for_source(feed_url)
+    started = time.monotonic()
+    try:
+        feed = parse_feed(feed_url, download_feed(feed_url, budget=budget))
+    except Exception as e:
+        return observe(started, budget.bytes_used, error=e)
+    return observe(started, budget.bytes_used, feed=feed)
+
+
+def probe_sources(feed_urls: Optional[list[str]] = None, max_workers: int = PROBE_WORKERS,
+                  path: str = HEALTH_FILE) -> dict:
+    """
+    Probe feeds concurrently, quarantined ones included, and record the results.
+
+    Defaults to the feeds of every enabled topic profile.
+
+    Returns:
+        dict: {feed url: observation}
+    """
+    feed_urls = enabled_sources(all_sources(select_profiles()) if feed_urls is None else feed_urls)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        observations = dict(zip(feed_urls, executor.map(probe_feed, feed_urls)))
+    record_observations(observations, path)
+    failed = sum(observation["error"] is not None for observation in observations.values())
+    logger.info(f"🩺 Probed {len(feed_urls)} feeds: {failed} failed.")
+    return observations
+
+
+def print_health(feed_urls: Optional[list[str]] = None, path: str = HEALTH_FILE):
+    """Print each source's latency percentiles, size, entries per day, parse errors, last success and quarantine."""
+    feed_urls = enabled_sources(all_sources(select_profiles()) if feed_urls is None else feed_urls)
+    records = load_health(path)
+
+    print(f"{'source':<50}{'fetches':>8}{'p50':>7}{'p95':>7}{'KB':>7}{'/day':>7}{'parse err':>10}  {'last success':<17}status")
+    for feed_url in feed_urls:
+        record = records.get(feed_url)
+        if record is None:
+            print(f"{feed_url[:49]:<50}{0:>8}{'-':>7}{'-':>7}{'-':>7}{'-':>7}{'-':>10}  {'-':<17}not probed yet")
+            continue
+        recent = record["observations"][-RECENT:]
+        latencies = [observation["latency"] for observation in recent if observation["error"] is None]
+        p50, p95 = (f"{np.percentile(latencies, q):.2f}" if latencies else "-" for q in (50, 95))
+        kilobytes = f"{np.median([observation['bytes'] for observation in recent]) / 1000:.0f}" if recent else "-"
+        per_day = f"{record['entries_per_day']:.1f}" if record["entries_per_day"] is not None else "-"
+        parse_errors = sum(observation["parse_error"] for observation in recent)
+        last_success = (
+            datetime.fromtimestamp(record["last_success_at"]).strftime("%Y-%m-%d %H:%M")
+            if record["last_success_at"] else "never"
+        )
+        status = f"QUARANTINED ({record['quarantined']['reason']})" if record["quarantined"] else "ok"
+        print(
+            f"{feed_url[:49]:<50}{len(record['observations']):>8}{p50:>7}{p95:>7}{kilobytes:>7}{per_day:>7}"
+            f"{parse_errors:>10}  {last_success:<17}{status}"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Feed health probes and source quarantine.")
+    parser.add_argument("--probe", action="store_true", help="Probe every source concurrently before reporting")
+    parser.add_argument("--workers", type=int, default=PROBE_WORKERS, help="Concurrent probes")
+    parser.add_argument("--release", metavar="FEED_URL", help="Lift the quarantine of a source")
+    args = parser.parse_args()
+
+    if args.release:
+        if not release(args.release):
+            print(f"{args.release} is not quarantined.")
+    if args.probe:
+        probe_sources(max_workers=args.workers)
+    print_health()
@@ -0,0 +1,321 @@
+"""
+Adaptive Per-Feed Polling
+
+Busy feeds (Hacker News) publish every few minutes, quiet ones (research
+blogs) a few times a month, so each feed gets its own poll interval:
+
+- learned from the feed's entry inter-arrival times (half the median gap,
+  so a new entry waits on average a quarter of a gap before it is seen),
+  clamped to [MIN_POLL_INTERVAL, MAX_POLL_INTERVAL]
+- stretched when a poll brings nothing new (304 Not Modified or no new
+  entries), and backed off exponentially on errors
+- jittered, with a stable per-feed offset for feeds seen for the first
+  time, so polls spread out instead of piling up at the top of the hour
+
+Polls are conditional (ETag / Last-Modified). New entries are kept in the
+polled-entry store (fetchers.polled_entries), which the daily run merges
+into its pool, so entries a busy feed has dropped by then still make the
+digest. They are also extracted into the fetcher's in-memory article
+cache, which the daily digest reuses when it runs in the same process.
+State lives in .cache/feed_state.json.
+
+Usage (run from src/):
+    python -m fetchers.feed_scheduler           # show each feed's interval, latency and next poll
+    python -m fetchers.feed_scheduler --poll    # poll the feeds that are due now
+"""
+
+import argparse
+import calendar
+import json
+import logging
+import os
+import random
+import statistics
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from config import CACHE_DIR
+from fetchers.feed_health import quarantined_sources
+from fetchers.polled_entries import RETENTION_SECONDS, store_entries
+from fetchers.rss_fetcher import clean_text, download_feed, get_full_text, parse_feed
+from fetchers.sources import SourceBudget, enabled_sources, source_config
+from processors.topic_profiles import all_sources, select_profiles
+
+logger = logging.getLogger(__name__)
+
+FEED_STATE_FILE = os.path.join(CACHE_DIR, "feed_state.json")
+
+MIN_POLL_INTERVAL = 5 * 60
+MAX_POLL_INTERVAL = 12 * 3600
+DEFAULT_POLL_INTERVAL = 30 * 60
+
+# Poll at this fraction of the typical gap between entries
+POLL_FRACTION = 0.5
+# Interval growth after a poll with nothing new, and the base for error backoff
+IDLE_GROWTH = 1.5
+ERROR_BACKOFF = 2.0
+# Next poll time is randomized by +/- this fraction of the interval
+JITTER = 0.1
+
+# Samples kept per feed
+MAX_ARRIVALS = 30
+MAX_LATENCIES = 20
+MAX_SEEN_LINKS = 300
+
+POLL_WORKERS = 8
+
+
+def new_feed_state(feed_url: str, now: float) -> dict:
+    # A stable per-feed offset spreads the first polls of many new feeds over MIN_POLL_INTERVAL
+    offset = zlib.crc32(feed_url.encode("utf-8")) % MIN_POLL_INTERVAL
+    return {
+        "interval": DEFAULT_POLL_INTERVAL,
+        "next_poll_at": now + offset,
+        "last_polled_at": None,
+        "last_success_at": None,
+        "etag": None,
+        "last_modified": None,
+        "arrivals": [],
+        "latencies": [],
+        "seen_links": [],
+        "consecutive_errors": 0,
+        "idle_polls": 0,
+        "last_error": None,
+    }
+
+
+def load_feed_states(path: str = FEED_STATE_FILE) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            states = json.load(f)
+        return states if isinstance(states, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_feed_states(states: dict, path: str = FEED_STATE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(states, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def learned_interval(arrivals: list[float]) -> Optional[float]:
+    """Poll interval from entry publish times, or None with fewer than three entries."""
+    gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:]) if later > earlier]
+    if len(gaps) < 2:
+        return None
+    return statistics.median(gaps) * POLL_FRACTION
+
+
+def next_interval(state: dict, outcome: str) -> float:
+    """
+    Interval until the next poll after a poll with this outcome.
+
+    Args:
+        state: The feed's state (arrivals and counters already updated).
+        outcome: 'new' (new entries), 'idle' (304 or nothing new) or 'error'.
+    """
+    base = learned_interval(state["arrivals"]) or DEFAULT_POLL_INTERVAL
+    if outcome == "error":
+        interval = base * ERROR_BACKOFF ** state["consecutive_errors"]
+    elif outcome == "idle":
+        interval = max(base, state["interval"] * IDLE_GROWTH)
+    else:
+        interval = base
+    return min(max(interval, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+
+
+def schedule_next(state: dict, outcome: str, now: float):
+    interval = next_interval(state, outcome)
+    state["interval"] = interval
+    state["next_poll_at"] = now + interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def entry_timestamp(entry) -> Optional[float]:
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    # feedparser normalizes dates to UTC
+    return calendar.timegm(parsed) if parsed else None
+
+
+def record_arrivals(state: dict, feed, now: float) -> list:
+    """Remember the feed's entry publish times and links; returns the entries not seen before."""
+    seen = set(state["seen_links"])
+    new_entries = [entry for entry in feed.entries if entry.get("link") and entry.get("link") not in seen]
+    new_links = {entry.get("link") for entry in new_entries}
+
+    arrivals = set(state["arrivals"])
+    for entry in feed.entries:
+        timestamp = entry_timestamp(entry)
+        if timestamp is None and entry.get("link") in new_links:
+            # No publish date: use the time the entry was first seen
+            timestamp = now
+        if timestamp is not None:
+            arrivals.add(round(timestamp))
+    state["arrivals"] = sorted(arrivals)[-MAX_ARRIVALS:]
+
+    state["seen_links"] = (state["seen_links"] + [entry.get("link") for entry in new_entries])[-MAX_SEEN_LINKS:]
+    return new_entries
+
+
+def entry_article(feed_url: str, entry, now: float) -> dict:
+    """A polled entry as an article dict without text, as the daily run builds it."""
+    timestamp = entry_timestamp(entry)
+    return {
+        "title": entry.get("title", ""),
+        "summary": clean_text(entry.get("summary", "")),
+        "url": entry.get("link"),
+        "source": feed_url,
+        # Naive UTC like the daily run's publish dates; undated entries count from when they were first seen
+        "published": datetime.fromtimestamp(timestamp if timestamp is not None else now, timezone.utc)
+        .replace(tzinfo=None).isoformat(),
+    }
+
+
+def poll_feed(feed_url: str, state: dict, now: Optional[float] = None, extract: bool = True) -> list[dict]:
+    """
+    Poll one feed conditionally and reschedule it.
+
+    New entries from the last day are extracted into the article cache when `extract` is set,
+    within the source's settings (fetchers.sources): its extractor, entry cap and budget.
+
+    Returns:
+        list[dict]: The new entries published within the polled-entry retention, as articles without text.
+    """
+    now = time.time() if now is None else now
+    state["last_polled_at"] = now
+    source = source_config(feed_url)
+    budget = SourceBudget(source["timeout"], source["max_bytes"])
+    start = time.monotonic()
+    try:
+        response = download_feed(feed_url, etag=state["etag"], last_modified=state["last_modified"], budget=budget)
+    except Exception as e:
+        state["consecutive_errors"] += 1
+        state["last_error"] = str(e)
+        schedule_next(state, "error", now)
+        logger.warning(f"⚠️ Poll of {feed_url} failed ({state['consecutive_errors']} in a row): {e}")
+        return []
+
+    state["latencies"] = (state["latencies"] + [round(time.monotonic() - start, 3)])[-MAX_LATENCIES:]
+    state["consecutive_errors"] = 0
+    state["last_error"] = None
+    state["last_success_at"] = now
+
+    if response.status_code == 304:
+        state["idle_polls"] += 1
+        schedule_next(state, "idle", now)
+        return []
+
+    state["etag"] = response.headers.get("ETag")
+    state["last_modified"] = response.headers.get("Last-Modified")
+    try:
+        feed = parse_feed(feed_url, response)
+    except Exception as e:
+        state["consecutive_errors"] += 1
+        state["last_error"] = f"parse error: {e}"
+        schedule_next(state, "error", now)
+        return []
+
+    new_entries = record_arrivals(state, feed, now)
+    if not new_entries:
+        state["idle_polls"] += 1
+        schedule_next(state, "idle", now)
+        return []
+
+    state["idle_polls"] = 0
+    schedule_next(state, "new", now)
+
+    if extract and source["extractor"] == "newspaper":
+        cutoff = now - 86400
+        fresh = [entry for entry in new_entries if (entry_timestamp(entry) or now) >= cutoff]
+        fresh.sort(key=lambda entry: entry_timestamp(entry) or now, reverse=True)
+        for entry in fresh[:source["max_entries"]]:
+            if budget.exhausted:
+                break
+            get_full_text(entry.get("link"), budget)
+    return [
+        entry_article(feed_url, entry, now) for entry in new_entries
+        if (entry_timestamp(entry) or now) >= now - RETENTION_SECONDS
+    ]
+
+
+def due_feeds(states: dict, feed_urls: list[str], now: float) -> list[str]:
+    """Feeds whose next poll is due, most overdue first. Unknown feeds get a fresh state."""
+    for feed_url in feed_urls:
+        if feed_url not in states:
+            states[feed_url] = new_feed_state(feed_url, now)
+    due = [feed_url for feed_url in feed_urls if states[feed_url]["next_poll_at"] <= now]
+    return sorted(due, key=lambda feed_url: states[feed_url]["next_poll_at"])
+
+
+def poll_due_feeds(feed_urls: Optional[list[str]] = None, max_workers: int = POLL_WORKERS,
+                   state_file: str = FEED_STATE_FILE) -> dict:
+    """
+    Poll every feed that is due, concurrently, store the new entries and save the updated schedule.
+
+    Defaults to the feeds of every enabled topic profile; disabled and quarantined sources are not polled.
+
+    Returns:
+        dict: {'polled': n, 'new_entries': n, 'next_poll_at': earliest next poll (epoch seconds)}
+    """
+    feed_urls = enabled_sources(all_sources(select_profiles()) if feed_urls is None else feed_urls)
+    now = time.time()
+    states = load_feed_states(state_file)
+    quarantined = quarantined_sources()
+    polled_urls = [feed_url for feed_url in feed_urls if feed_url not in quarantined]
+    due = due_feeds(states, polled_urls, now)
+
+    new_entries = []
+    if due:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for articles in executor.map(lambda feed_url: poll_feed(feed_url, states[feed_url], now), due):
+                new_entries += articles
+        store_entries(new_entries, now=now)
+        logger.info(f"📡 Polled {len(due)} of {len(feed_urls)} feeds: {len(new_entries)} new entries.")
+    # Saved even when nothing was due, so first-seen feeds keep their initial slot
+    save_feed_states({url: state for url, state in states.items() if url in feed_urls}, state_file)
+
+    next_poll_at = min((states[url]["next_poll_at"] for url in polled_urls), default=None)
+    return {"polled": len(due), "new_entries": len(new_entries), "next_poll_at": next_poll_at}
+
+
+def print_feed_states(feed_urls: Optional[list[str]] = None, state_file: str = FEED_STATE_FILE):
+    """Print each feed's learned interval, latency, error count and next poll time."""
+    feed_urls = all_sources(select_profiles()) if feed_urls is None else feed_urls
+    states = load_feed_states(state_file)
+
+    def fmt_interval(seconds):
+        return str(timedelta(seconds=int(seconds)))
+
+    print(f"{'feed':<55}{'interval':>10}{'p50 latency':>13}{'errors':>8}{'idle':>6}  next poll")
+    for feed_url in feed_urls:
+        state = states.get(feed_url)
+        if state is None:
+            print(f"{feed_url[:54]:<55}{'-':>10}{'-':>13}{'-':>8}{'-':>6}  not polled yet")
+            continue
+        latency = f"{statistics.median(state['latencies']):.2f}s" if state["latencies"] else "-"
+        next_poll = datetime.fromtimestamp(state["next_poll_at"]).strftime("%Y-%m-%d %H:%M")
+        print(
+            f"{feed_url[:54]:<55}{fmt_interval(state['interval']):>10}{latency:>13}"
+            f"{state['consecutive_errors']:>8}{state['idle_polls']:>6}  {next_poll}"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Adaptive per-feed polling.")
+    parser.add_argument("--poll", action="store_true", help="Poll the feeds that are due now")
+    args = parser.parse_args()
+
+    if args.poll:
+        poll_due_feeds()
+    print_feed_states()
@@ -0,0 +1,75 @@
+"""
+Entries Found by the Intraday Polls
+
+The polls (fetchers.feed_scheduler) see entries that a busy feed may have
+dropped again by the time the daily run downloads it. Each new entry's
+feed fields (title, summary, link, source, published) are kept in
+.cache/polled_entries.json for RETENTION_SECONDS, and the daily run
+(fetchers.rss_fetcher.collect_articles) merges them into its pool, so the
+digest covers everything the polls saw, also when it runs in another
+process than the polls (cron).
+
+Usage:
+    store_entries(articles)                        # after a poll
+    stored_entries(feed_urls, since, until)        # in the daily run
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+POLLED_ENTRIES_FILE = os.path.join(CACHE_DIR, "polled_entries.json")
+
+# Entries are dropped this long after they were first seen
+RETENTION_SECONDS = 2 * 86400
+
+# Serializes read-modify-write of the store between the threads of one process
+_store_lock = threading.Lock()
+
+
+def load_entries(path: str = POLLED_ENTRIES_FILE) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        return entries if isinstance(entries, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_entries(entries: dict, path: str = POLLED_ENTRIES_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def store_entries(articles: list[dict], path: str = POLLED_ENTRIES_FILE, now: Optional[float] = None):
+    """Add polled entries (article dicts without text) to the store and drop the expired ones."""
+    now = time.time() if now is None else now
+    with _store_lock:
+        entries = load_entries(path)
+        for article in articles:
+            entries.setdefault(article["url"], {**article, "seen_at": now})
+        entries = {url: entry for url, entry in entries.items() if now - entry["seen_at"] <= RETENTION_SECONDS}
+        save_entries(entries, path)
+
+
+def stored_entries(feed_urls: list[str], since: datetime, until: Optional[datetime] = None,
+                   path: str = POLLED_ENTRIES_FILE) -> list[dict]:
+    """The stored entries of these feeds published in [`since`, `until`), newest first."""
+    sources = set(feed_urls)
+    articles = []
+    for entry in load_entries(path).values():
+        published = datetime.fromisoformat(entry["published"])
+        if entry["source"] in sources and published >= since and (until is None or published < until):
+            articles.append({key: value for key, value in entry.items() if key != "seen_at"})
+    return sorted(articles, key=lambda article: article["published"], reverse=True)
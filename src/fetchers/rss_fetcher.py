@@ -1,5 +1,8 @@
 import logging
 import re
+import threading
+import time
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
 # from urllib.parse import urlparse
 
@@ -8,12 +11,29 @@ import textstat  # Make sure you have textstat installed
 from newspaper import Article
 from tranco import Tranco
 
+from config import EXTRACTION_WAIT_SECONDS
+from fetchers.feed_health import healthy_sources, observe, record_observations
+from fetchers.polled_entries import stored_entries
+from fetchers.sources import BudgetExceeded, SourceBudget, source_config, source_weight
+from processors.topic_profiles import default_keyword_weights
+from utils.http_session import get_session
+from utils.run_budget import RunBudget, time_left
+from utils.tracing import span
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
 # Initialize Tranco list
 latest_list = None
 
+# In-memory full-text cache: article URL -> (text, fetched_at). In a long-running
+# process (the scheduler daemon) intraday polls fill it, so the daily digest
+# doesn't download and parse the same articles again.
+ARTICLE_CACHE_SIZE = 2000
+ARTICLE_CACHE_TTL = 36 * 3600
+_article_cache = OrderedDict()
+_article_cache_lock = threading.Lock()
+
 
 def initialize_tranco_list():
     """Initialize the Tranco list using the Tranco package."""
@@ -29,22 +49,123 @@ def clean_text(text):
     return re.sub(r"<.*?>", "", text)
 
 
-def get_full_text(url):
-    """Retrieve the full text of an article from its URL using newspaper3k."""
+def cached_full_text(url):
+    """Full text from the in-memory cache, or None if missing or expired."""
+    with _article_cache_lock:
+        cached = _article_cache.get(url)
+        if cached is None:
+            return None
+        text, fetched_at = cached
+        if time.time() - fetched_at > ARTICLE_CACHE_TTL:
+            del _article_cache[url]
+            return None
+        _article_cache.move_to_end(url)
+        return text
+
+
+def cache_full_text(url, text):
+    with _article_cache_lock:
+        _article_cache[url] = (text, time.time())
+        _article_cache.move_to_end(url)
+        while len(_article_cache) > ARTICLE_CACHE_SIZE:
+            _article_cache.popitem(last=False)
+
+
+def clear_article_cache():
+    with _article_cache_lock:
+        _article_cache.clear()
+
+
+def fetch_limited(url, budget=None, headers=None):
+    """
+    GET through the shared session.
+
+    With a SourceBudget the body is streamed and the download is aborted
+    (BudgetExceeded) once it overruns the source's remaining time or bytes.
+    """
+    if budget is None:
+        return get_session().get(url, headers=headers)
+
+    response = get_session().get(url, headers=headers, timeout=budget.request_timeout(), stream=True)
     try:
+        chunks = []
+        for chunk in response.iter_content(64 * 1024):
+            budget.spend(len(chunk))
+            chunks.append(chunk)
+    finally:
+        response.close()
+    response._content = b"".join(chunks)
+    return response
+
+
+def download_full_text(url, budget=None):
+    """Download an article and extract its full text with newspaper3k; raises on failure, no caching."""
+    # Download through the shared session (pooled connections, timeouts), parse with newspaper3k
+    with span("article_download", "fetch", url=url) as s:
+        response = fetch_limited(url, budget)
+        s.set(bytes=len(response.content), http_status=response.status_code)
+        response.raise_for_status()
+    with span("newspaper_parse", "extract", url=url) as s:
         article = Article(url, browser_user_agent="Mozilla/5.0")
-        article.download()
+        article.download(input_html=response.text)
         article.parse()
-        return article.text
+        s.set(chars=len(article.text))
+    return article.text
+
+
+def get_full_text(url, budget=None):
+    """Retrieve the full text of an article from its URL using newspaper3k (cached in memory)."""
+    text = cached_full_text(url)
+    if text is not None:
+        return text
+
+    try:
+        text = download_full_text(url, budget)
     except Exception as e:
         logger.warning(f"Could not retrieve full text for {url}: {e}")
         return ""
+    if text:
+        cache_full_text(url, text)
+    return text
+
+
+def download_feed(feed_url, etag=None, last_modified=None, budget=None):
+    """
+    Download a feed through the shared session, within the source's budget if one is given.
+
+    With `etag`/`last_modified` from an earlier response the request is
+    conditional, and an unchanged feed comes back as a bodiless 304.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with span("feed_download", "fetch", url=feed_url) as s:
+        response = fetch_limited(feed_url, budget, headers=headers)
+        s.set(bytes=len(response.content), http_status=response.status_code)
+        response.raise_for_status()
+    return response
+
+
+def parse_feed(feed_url, response):
+    """Parse a downloaded feed with feedparser."""
+    with span("feedparser", "extract", url=feed_url) as s:
+        feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+        s.set(entries=len(feed.entries))
+    return feed
+
+
+def fetch_feed(feed_url, budget=None):
+    """Download a feed through the shared session and parse it with feedparser."""
+    return parse_feed(feed_url, download_feed(feed_url, budget=budget))
 
 
 def get_readability_score(text):
     """Compute the readability score of the text using Flesch Reading Ease."""
     try:
-        score = textstat.flesch_reading_ease(text)
+        with span("textstat", "extract", chars=len(text)):
+            score = textstat.flesch_reading_ease(text)
         # Normalize the score to a range of 0-10
         normalized_score = max(0, min((score / 100) * 10, 10))
         return normalized_score
@@ -53,90 +174,267 @@ def get_readability_score(text):
         return 5  # Default to an average score of 5
 
 
-def fetch_rss_feeds(feed_urls: list[str], max_to_rank: int = 20) -> list[dict]:
-    """Fetch, rank, and filter the most valuable articles from RSS feeds."""
-    all_articles = []
-    now = datetime.now()
-    cutoff_date = now - timedelta(days=1)  # Get articles from the last 24 hours
+# Weights of the default topic profile (config.TOPIC_PROFILES)
+DEFAULT_KEYWORD_WEIGHTS = default_keyword_weights()
+
+
+def extracted_fields(full_text):
+    """The fields of an article dict that come from extraction."""
+    return {
+        "content": full_text,
+        "status": "success" if full_text else "failure",
+        "readability_score": get_readability_score(full_text),
+    }
+
+
+def fresh_entries(feed, cutoff_date, now, max_entries=None, until=None, per_day=False):
+    """
+    The feed's entries published after `cutoff_date` (and before `until`; undated ones count as new), newest first.
+
+    At most `max_entries` are taken, or with `per_day` at most `max_entries` per publication day.
+    """
+    dated = []
+    for entry in feed.entries:
+        published_date = (
+            datetime(*entry.published_parsed[:6])
+            if getattr(entry, "published_parsed", None)
+            else now
+        )
+        if published_date >= cutoff_date and (until is None or published_date < until) and entry.get("link"):
+            dated.append((published_date, entry))
+    dated.sort(key=lambda item: item[0], reverse=True)
+    if not per_day or max_entries is None:
+        return dated[:max_entries]
+    taken = Counter()
+    capped = []
+    for published_date, entry in dated:
+        if taken[published_date.date()] < max_entries:
+            taken[published_date.date()] += 1
+            capped.append((published_date, entry))
+    return capped
+
 
-    ai_keywords = [
-        "AI",
-        "Artificial Intelligence",
-        "Machine Learning",
-        "Deep Learning",
-        "Neural Network",
-        "Natural Language Processing",
-        "NLP",
-        "OpenAI",
-        "ChatGPT",
-    ]
+def collect_articles(feed_urls: list[str], queue=None, since=None, until=None, run_budget=None,
+                     backfill=False) -> list[dict]:
+    """
+    Fetch RSS feeds and extract every fresh article, without scoring.
 
-    crypto_keywords = ["Blockchain", "Bitcoin", "Ethereum", "Cryptocurrency", "DeFi"]
+    Articles from the last 24 hours (or published in [`since`, `until`),
+    for a backfill) are deduplicated by link, their full text
+    is downloaded (falling back to the feed summary) and their readability
+    is computed, since that part of the score doesn't depend on keywords.
 
-    keywords_with_weights = {kw.lower(): 4 for kw in ai_keywords}
-    keywords_with_weights.update({kw.lower(): 1 for kw in crypto_keywords})
+    Entries the intraday polls stored (fetchers.polled_entries) are merged
+    in, so entries a busy feed has dropped since are still collected.
+
+    Each source's settings (fetchers.sources) are enforced: disabled and
+    quarantined (fetchers.feed_health) sources are skipped, at most
+    `max_entries` articles are taken per source, and once a source's time
+    or byte budget is used up its remaining articles keep their feed
+    summaries.
+
+    The feeds are downloaded first (the 'fetch' stage of `run_budget`, a
+    utils.run_budget.RunBudget), then the articles (the 'extract' stage).
+    Feeds not reached by the fetch deadline are skipped, and articles not
+    reached by the extract deadline keep their feed summaries.
+
+    With a work queue (fetchers.work_queue) the extraction is handed to
+    worker processes (fetchers.extract_worker) instead of done in-process.
+
+    With `backfill` (the feeds' history for processors.backfill) the cap of
+    `max_entries` applies per publication day, so every day of the window
+    gets its share, and the collection leaves no trace: quarantined sources
+    are skipped without being probed, no health observations are recorded,
+    and `run_budget` is ignored (the stages are only timed).
+    """
+    run_budget = RunBudget() if backfill or run_budget is None else run_budget
+    all_articles = []
+    # Articles to download, with their source's budget
+    pending = []
+    now = datetime.now()
+    cutoff_date = since or now - timedelta(days=1)  # Get articles from the last 24 hours
 
     if latest_list is None:
         initialize_tranco_list()
 
+    def add_article(article):
+        """Queue an article for extraction within its source's settings."""
+        source = source_config(article["source"])
+        if source["extractor"] == "summary":
+            article.update(extracted_fields(article["summary"]))
+        elif queue is None:
+            pending.append((article, budgets[article["source"]]))
+        else:
+            # Extracted by the queue workers, within the same per-source limits
+            article["limits"] = {"timeout": source["timeout"], "max_bytes": source["max_bytes"]}
+        all_articles.append(article)
+        taken[cap_key(article)] += 1
+
+    def cap_key(article):
+        """What `max_entries` counts: a source's articles, or with `backfill` a source's articles of one day."""
+        return (article["source"], article["published"][:10]) if backfill else article["source"]
+
     seen_links = set()
+    # Feed downloads, for the sources' health records
+    observations = {}
+    # Articles taken (see cap_key) and budget of each source, shared with its polled entries
+    taken = Counter()
+    budgets = {}
+
+    with run_budget.stage("fetch") as fetch_deadline:
+        sources = healthy_sources(feed_urls, probe=not backfill)
+        for index, feed_url in enumerate(sources):
+            if time_left(fetch_deadline) == 0:
+                logger.warning(f"⏰ Fetch budget used up; skipping {len(sources) - index} feeds.")
+                break
+            source = source_config(feed_url)
+            if not source["enabled"]:
+                logger.info(f"⏭️ Skipping disabled source {feed_url}")
+                continue
+
+            budget = budgets[feed_url] = SourceBudget(source["timeout"], source["max_bytes"])
+            try:
+                with span("feed", "fetch", url=feed_url) as feed_span:
+                    started = time.monotonic()
+                    try:
+                        feed = fetch_feed(feed_url, budget)
+                    except Exception as e:
+                        observations[feed_url] = observe(started, budget.bytes_used, error=e)
+                        raise
+                    observations[feed_url] = observe(started, budget.bytes_used, feed=feed)
+                    fresh_articles = 0
+                    for published_date, entry in fresh_entries(
+                            feed, cutoff_date, now, source["max_entries"], until, per_day=backfill):
+                        link = entry.link
+                        if link in seen_links:
+                            continue
+
+                        seen_links.add(link)
+                        article = {
+                            "title": entry.title,
+                            "summary": clean_text(entry.get("summary", "")),
+                            "url": link,
+                            "source": feed_url,
+                            "published": published_date.isoformat(),
+                        }
+                        add_article(article)
+                        fresh_articles += 1
+                    feed_span.set(entries=len(feed.entries), articles=fresh_articles, bytes=budget.bytes_used)
+            except BudgetExceeded as e:
+                logger.error(f"Feed {feed_url} exceeded its budget: {e}")
+            except Exception as e:
+                logger.error(f"Failed to parse feed {feed_url}: {e}")
+            finally:
+                # The source's clock restarts when its articles (polled entries too, if the download failed)
+                # are extracted
+                budget.pause()
+
+        # Entries the polls saw that the feeds no longer carry (or that failed to download just now)
+        polled = 0
+        for article in stored_entries(sources, cutoff_date, until):
+            source = source_config(article["source"])
+            if article["url"] in seen_links or not source["enabled"] or taken[cap_key(article)] >= source["max_entries"]:
+                continue
+            seen_links.add(article["url"])
+            if article["source"] not in budgets:
+                # A source not downloaded this run; its clock starts when its articles are extracted
+                budgets[article["source"]] = SourceBudget(source["timeout"], source["max_bytes"])
+                budgets[article["source"]].pause()
+            add_article(article)
+            polled += 1
+        if polled:
+            logger.info(f"📥 Added {polled} entries found by the intraday polls.")
+    if not backfill:
+        record_observations(observations)
+
+    with run_budget.stage("extract") as extract_deadline:
+        if queue is not None:
+            from fetchers.extract_worker import extract_with_queue
+
+            wait_timeout = EXTRACTION_WAIT_SECONDS
+            if extract_deadline is not None:
+                wait_timeout = min(wait_timeout, time_left(extract_deadline))
+            extract_with_queue([article for article in all_articles if "content" not in article], queue, wait_timeout)
+            for article in all_articles:
+                article.pop("limits", None)
+        else:
+            extract_pending(pending, extract_deadline)
+
+    logger.info(f"Collected {len(all_articles)} fresh articles from {len(feed_urls)} feeds.")
+    return all_articles
 
-    for feed_url in feed_urls:
-        try:
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries:
-                published_date = (
-                    datetime(*entry.published_parsed[:6])
-                    if hasattr(entry, "published_parsed")
-                    else now
-                )
-
-                if published_date < cutoff_date:
-                    continue
-
-                link = entry.link
-                if link in seen_links:
-                    continue
-
-                seen_links.add(link)
-                full_text = get_full_text(link) or clean_text(entry.get("summary", ""))
-
-                title_lower = entry.title.lower()
-                content_lower = full_text.lower()
-
-                # Calculate scores using different criteria
-                title_score = sum(
-                    title_lower.count(kw) * weight
-                    for kw, weight in keywords_with_weights.items()
-                )
-                content_score = sum(
-                    content_lower.count(kw) * weight
-                    for kw, weight in keywords_with_weights.items()
-                )
-                readability_score = get_readability_score(full_text)
-
-                total_score = (
-                    title_score * 3 + content_score * 2 + readability_score * 1
-                )
-
-                article = {
-                    "title": entry.title,
-                    "content": full_text,
-                    "url": link,
-                    "published": published_date.isoformat(),
-                    "status": "success" if full_text else "failure",
-                    "total_score": total_score,
-                }
-
-                if total_score > 0:
-                    all_articles.append(article)
-        except Exception as e:
-            logger.error(f"Failed to parse feed {feed_url}: {e}")
+
+def extract_pending(pending: list[tuple[dict, SourceBudget]], deadline=None):
+    """
+    Download the full text of fetched articles in place, each within its source's budget.
+
+    Articles left when their source's budget or the `deadline` (time.monotonic()) runs out
+    get their cached full text or their feed summary.
+    """
+    over_budget = Counter()
+    out_of_time = 0
+    for article, budget in pending:
+        budget.resume()
+        if time_left(deadline) == 0:
+            out_of_time += 1
+            article.update(extracted_fields(cached_full_text(article["url"]) or article["summary"]))
+        elif budget.exhausted:
+            over_budget[article["source"]] += 1
+            article.update(extracted_fields(cached_full_text(article["url"]) or article["summary"]))
+        else:
+            article.update(extracted_fields(get_full_text(article["url"], budget) or article["summary"]))
+
+    for feed_url, count in over_budget.items():
+        logger.warning(f"⏳ {feed_url} used up its budget; {count} articles keep their feed summaries.")
+    if out_of_time:
+        logger.warning(f"⏰ Extract budget used up; {out_of_time} articles keep their feed summaries.")
+
+
+def score_article(article: dict, keywords_with_weights: dict[str, float]) -> float:
+    """Score an article by weighted keyword counts in its title and content plus readability."""
+    title_lower = article["title"].lower()
+    content_lower = article["content"].lower()
+
+    # Calculate scores using different criteria
+    title_score = sum(
+        title_lower.count(kw) * weight
+        for kw, weight in keywords_with_weights.items()
+    )
+    content_score = sum(
+        content_lower.count(kw) * weight
+        for kw, weight in keywords_with_weights.items()
+    )
+    readability_score = article.get("readability_score")
+    if readability_score is None:
+        readability_score = get_readability_score(article["content"])
+
+    return title_score * 3 + content_score * 2 + readability_score * 1
+
+
+def rank_articles(articles: list[dict], keywords_with_weights: dict[str, float] | None = None, max_to_rank: int = 20) -> list[dict]:
+    """
+    Score collected articles and keep the best `max_to_rank`.
+
+    Returns copies of the articles with a 'total_score' field (scaled by
+    their source's weight); articles scoring zero are dropped.
+    """
+    keywords_with_weights = keywords_with_weights or DEFAULT_KEYWORD_WEIGHTS
+
+    scored = []
+    for article in articles:
+        total_score = score_article(article, keywords_with_weights) * source_weight(article["source"])
+        if total_score > 0:
+            scored.append({**article, "total_score": total_score})
 
     sorted_articles = sorted(
-        all_articles, key=lambda x: x.get("total_score", 0), reverse=True
+        scored, key=lambda x: x.get("total_score", 0), reverse=True
     )
     top_articles = sorted_articles[:max_to_rank]
 
     logger.info(f"Total articles prepared for re-ranking: {len(top_articles)}")
     return top_articles
+
+
+def fetch_rss_feeds(feed_urls: list[str], max_to_rank: int = 20, queue=None) -> list[dict]:
+    """Fetch, rank, and filter the most valuable articles from RSS feeds (extracting through `queue` if given)."""
+    return rank_articles(collect_articles(feed_urls, queue=queue), max_to_rank=max_to_rank)
@@ -0,0 +1,113 @@
+"""
+Per-Source Settings and Budgets
+
+Every feed gets the limits in config.SOURCE_DEFAULTS, overridden per feed
+URL by config.SOURCE_SETTINGS:
+
+- enabled:     disabled sources are neither fetched nor polled
+- max_entries: fresh entries taken per run, newest first
+- timeout:     seconds for downloading the feed and its articles
+- max_bytes:   bytes downloaded for the feed and its articles
+- weight:      multiplies the scores of the source's articles
+- extractor:   "newspaper" downloads the full text, "summary" keeps the feed summary
+
+A SourceBudget tracks one source's time and bytes during a run; the fetcher
+stops a download once it would overrun either, and the remaining articles
+of that source fall back to their feed summaries.
+
+Usage (run from src/):
+    python -m fetchers.sources   # show the effective settings of every configured source
+"""
+
+import time
+from typing import Optional
+
+from config import CRYPTO_SITES, SITES_CONFIG, SOURCE_DEFAULTS, SOURCE_SETTINGS
+from utils.http_session import DEFAULT_TIMEOUT
+
+EXTRACTORS = ("newspaper", "summary")
+
+
+class BudgetExceeded(Exception):
+    """A source used up its time or byte budget."""
+
+
+def source_config(feed_url: str) -> dict:
+    """Effective settings of a source: SOURCE_DEFAULTS updated with its SOURCE_SETTINGS entry."""
+    config = {**SOURCE_DEFAULTS, **SOURCE_SETTINGS.get(feed_url, {})}
+    if config["extractor"] not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{config['extractor']}' for {feed_url} (known: {', '.join(EXTRACTORS)})")
+    return config
+
+
+def source_enabled(feed_url: str) -> bool:
+    return source_config(feed_url)["enabled"]
+
+
+def source_weight(feed_url: str) -> float:
+    return source_config(feed_url)["weight"]
+
+
+def enabled_sources(feed_urls: list[str]) -> list[str]:
+    return [feed_url for feed_url in feed_urls if source_enabled(feed_url)]
+
+
+class SourceBudget:
+    """Time and byte allowance of one source; downloads draw from it as they go."""
+
+    def __init__(self, timeout: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.bytes_left = max_bytes
+        self.bytes_used = 0
+        self._time_left = None
+
+    @classmethod
+    def for_source(cls, feed_url: str) -> "SourceBudget":
+        config = source_config(feed_url)
+        return cls(config["timeout"], config["max_bytes"])
+
+    @property
+    def exhausted(self) -> bool:
+        out_of_time = self.deadline is not None and time.monotonic() >= self.deadline
+        return out_of_time or (self.bytes_left is not None and self.bytes_left <= 0)
+
+    def pause(self):
+        """Stop the clock while other sources are worked on; resume() restarts it with the time that was left."""
+        if self.deadline is not None:
+            self._time_left = max(0.0, self.deadline - time.monotonic())
+
+    def resume(self):
+        if self._time_left is not None:
+            self.deadline = time.monotonic() + self._time_left
+            self._time_left = None
+
+    def request_timeout(self):
+        """(connect, read) timeout for the next request, capped by the time left."""
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise BudgetExceeded(f"time budget of {self.timeout:.0f}s used up")
+        connect, read = DEFAULT_TIMEOUT
+        return min(connect, remaining), min(read, remaining)
+
+    def spend(self, size: int):
+        """Charge downloaded bytes; raises BudgetExceeded once the bytes or the time run out."""
+        self.bytes_used += size
+        if self.bytes_left is not None:
+            self.bytes_left -= size
+            if self.bytes_left < 0:
+                raise BudgetExceeded(f"byte budget exceeded after {self.bytes_used} bytes")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded(f"time budget of {self.timeout:.0f}s used up")
+
+
+if __name__ == "__main__":
+    print(f"{'source':<60}{'on':>4}{'entries':>9}{'timeout':>9}{'MB':>7}{'weight':>8}  extractor")
+    for feed_url in dict.fromkeys(SITES_CONFIG + CRYPTO_SITES + list(SOURCE_SETTINGS)):
+        config = source_config(feed_url)
+        print(
+            f"{feed_url[:59]:<60}{'yes' if config['enabled'] else 'no':>4}{config['max_entries']:>9}"
+            f"{config['timeout']:>8}s{config['max_bytes'] / 1e6:>7.1f}{config['weight']:>8.2f}  {config['extractor']}"
+        )
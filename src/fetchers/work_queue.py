@@ -0,0 +1,407 @@
+"""
+Work Queue for Article Extraction
+
+Extraction jobs (download an article, parse its full text, compute its
+readability) are spread over worker processes on one or more hosts. Two
+interchangeable backends implement the same methods:
+
+- SQLiteWorkQueue: a table in a local SQLite file, for worker processes
+  on the same host (or a shared disk)
+- RedisWorkQueue: any Redis-compatible server, for workers on several
+  hosts; it talks plain RESP, so no client library is required
+
+Jobs are keyed (by article URL), so enqueueing a known job is a no-op and
+its earlier result is reused. A worker claims a job with a lease; if it
+dies, the lease expires and another worker takes the job over. Failed
+jobs are retried with backoff and marked dead after MAX_ATTEMPTS.
+
+    queue.enqueue(key, payload) -> bool      False if the job is already known
+    queue.claim(worker, lease_seconds)       -> {'key', 'payload', 'attempts'} or None
+    queue.complete(key, result)
+    queue.fail(key, error)
+    queue.results(keys)                      -> {key: {'status', 'result', 'error'}} for done and dead jobs
+    queue.stats()                            -> job counts by status
+
+Queues are opened from a URL (config.EXTRACTION_QUEUE_URL):
+    sqlite:///absolute/path/queue.db   sqlite://relative/path.db   redis://[:password@]host[:port][/db]
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+from config import CACHE_DIR
+
+QUEUE_DB = os.path.join(CACHE_DIR, "work_queue.db")
+
+# Retry schedule: 10s, 20s, 40s ... at most MAX_ATTEMPTS claims per job
+RETRY_BASE_DELAY = 10
+RETRY_MAX_DELAY = 600
+MAX_ATTEMPTS = 3
+
+# Finished jobs are kept (and their results reused) this long
+RESULT_TTL = 2 * 86400
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    queue TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_expires_at REAL,
+    worker TEXT,
+    result TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (queue, job_key)
+);
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (queue, status, available_at);
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt after `attempts` failures."""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+class SQLiteWorkQueue:
+    """Work queue in a local SQLite table; safe across threads and processes on one host."""
+
+    def __init__(self, db_path: str = QUEUE_DB, queue: str = "extract"):
+        self.db_path = db_path
+        self.queue = queue
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # A connection per operation, like the outbox: usable from threads and forked workers
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, key: str, payload: dict) -> bool:
+        """Add a job unless it is known; a dead job is revived for a new round of attempts."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (queue, job_key, payload, status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.queue, key, json.dumps(payload, ensure_ascii=False), PENDING, now, now, now),
+            )
+            if cursor.rowcount == 1:
+                return True
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, available_at = ?, last_error = NULL, updated_at = ? "
+                "WHERE queue = ? AND job_key = ? AND status = ?",
+                (PENDING, now, now, self.queue, key, DEAD),
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[dict]:
+        """
+        Lease the oldest due job: a pending one, or one whose previous lease expired.
+
+        A job that has used up its attempts when its lease expires is marked dead instead.
+        """
+        while True:
+            now = time.time()
+            with self._connect() as conn:
+                # Take the write lock before reading, so two workers can't claim the same row
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT job_key, payload, attempts FROM jobs WHERE queue = ? AND "
+                    "((status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at <= ?)) "
+                    "ORDER BY available_at LIMIT 1",
+                    (self.queue, PENDING, now, LEASED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["attempts"] >= MAX_ATTEMPTS:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                        "WHERE queue = ? AND job_key = ?",
+                        (DEAD, now, self.queue, row["job_key"]),
+                    )
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires_at = ?, worker = ?, "
+                    "updated_at = ? WHERE queue = ? AND job_key = ?",
+                    (LEASED, now + lease_seconds, worker, now, self.queue, row["job_key"]),
+                )
+            return {"key": row["job_key"], "payload": json.loads(row["payload"]), "attempts": row["attempts"] + 1}
+
+    def complete(self, key: str, result):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, last_error = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE queue = ? AND job_key = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), time.time(), self.queue, key),
+            )
+
+    def fail(self, key: str, error: str):
+        """Record a failed attempt; the job is retried after a backoff, or marked dead after MAX_ATTEMPTS."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE queue = ? AND job_key = ?", (self.queue, key)).fetchone()
+            if row is None:
+                return
+            status = DEAD if row["attempts"] >= MAX_ATTEMPTS else PENDING
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_expires_at = NULL, last_error = ?, updated_at = ? "
+                "WHERE queue = ? AND job_key = ?",
+                (status, now + retry_delay(row["attempts"]), error, now, self.queue, key),
+            )
+
+    def results(self, keys: list[str]) -> dict:
+        """Outcome of the finished (done or dead) jobs among `keys`."""
+        finished = {}
+        with self._connect() as conn:
+            # Stay below SQLite's limit on bound parameters
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT job_key, status, result, last_error FROM jobs WHERE queue = ? AND status IN (?, ?) "
+                    f"AND job_key IN ({', '.join('?' * len(chunk))})",
+                    (self.queue, DONE, DEAD, *chunk),
+                ).fetchall()
+                for row in rows:
+                    finished[row["job_key"]] = {
+                        "status": row["status"],
+                        "result": json.loads(row["result"]) if row["result"] else None,
+                        "error": row["last_error"],
+                    }
+        return finished
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE queue = ? GROUP BY status", (self.queue,)).fetchall()
+        return {status: count for status, count in rows}
+
+    def purge(self, older_than: float = RESULT_TTL):
+        """Drop finished jobs not touched for `older_than` seconds."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE queue = ? AND status IN (?, ?) AND updated_at < ?",
+                (self.queue, DONE, DEAD, time.time() - older_than),
+            )
+
+
+class RespError(Exception):
+    """Error reply from a Redis-compatible server."""
+
+
+class RespClient:
+    """
+    Minimal Redis protocol (RESP2) client with redis-py's `execute_command` signature.
+
+    Replies come back as redis-py returns them without decoding: bulk strings as bytes.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 10):
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError(f"Connection to {self.host}:{self.port} closed")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise RespError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            return None if length < 0 else self._reader.read(length + 2)[:-2]
+        if prefix == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute_command(self, *args):
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                return self._call(*args)
+            except (OSError, ConnectionError):
+                # Reconnect on the next command; this one is not replayed, as it may have been applied
+                self.close()
+                raise
+
+
+def _text(value) -> Optional[str]:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class RedisWorkQueue:
+    """
+    Work queue on a Redis-compatible server, shared by workers on any number of hosts.
+
+    Each job is a hash with a TTL; the ready list, the retry schedule and
+    the leases hold job keys. Only basic commands are used (no scripts),
+    and every step that could race is guarded by an atomic LPOP, HSETNX or ZREM.
+    """
+
+    def __init__(self, client, queue: str = "extract", prefix: str = "ainews"):
+        self.client = client
+        self.queue = queue
+        self.namespace = f"{prefix}:{queue}"
+        self.ready = f"{self.namespace}:ready"
+        self.delayed = f"{self.namespace}:delayed"
+        self.leases = f"{self.namespace}:leases"
+
+    def job(self, key: str) -> str:
+        return f"{self.namespace}:job:{key}"
+
+    def command(self, *args):
+        return self.client.execute_command(*args)
+
+    def enqueue(self, key: str, payload: dict) -> bool:
+        """Add a job unless it is known; a dead job is revived for a new round of attempts."""
+        job = self.job(key)
+        created = self.command("HSETNX", job, "payload", json.dumps(payload, ensure_ascii=False))
+        if not created and _text(self.command("HGET", job, "status")) != DEAD:
+            return False
+        self.command("HSET", job, "status", PENDING, "attempts", 0)
+        self.command("EXPIRE", job, RESULT_TTL)
+        self.command("RPUSH", self.ready, key)
+        return True
+
+    def _release_due(self, now: float):
+        """Move retries whose backoff is over, and jobs whose lease expired, back to the ready list."""
+        for schedule in (self.delayed, self.leases):
+            for key in self.command("ZRANGEBYSCORE", schedule, "-inf", now, "LIMIT", 0, 100) or []:
+                # Whoever removes the entry moves it, so a job is never requeued twice
+                if self.command("ZREM", schedule, key):
+                    self.command("RPUSH", self.ready, key)
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[dict]:
+        now = time.time()
+        self._release_due(now)
+        while True:
+            key = _text(self.command("LPOP", self.ready))
+            if key is None:
+                return None
+            job = self.job(key)
+            status, payload, attempts = (_text(value) for value in self.command(
+                "HMGET", job, "status", "payload", "attempts"))
+            if payload is None or status in (DONE, DEAD):
+                # Expired, or a stale duplicate of a finished job
+                continue
+            if int(attempts or 0) >= MAX_ATTEMPTS:
+                self.command("HSET", job, "status", DEAD, "error", "lease expired")
+                continue
+            attempts = self.command("HINCRBY", job, "attempts", 1)
+            self.command("HSET", job, "status", LEASED, "worker", worker)
+            self.command("ZADD", self.leases, now + lease_seconds, key)
+            return {"key": key, "payload": json.loads(payload), "attempts": attempts}
+
+    def complete(self, key: str, result):
+        job = self.job(key)
+        self.command("ZREM", self.leases, key)
+        self.command("HSET", job, "status", DONE, "result", json.dumps(result, ensure_ascii=False), "error", "")
+        self.command("EXPIRE", job, RESULT_TTL)
+
+    def fail(self, key: str, error: str):
+        job = self.job(key)
+        self.command("ZREM", self.leases, key)
+        attempts = int(_text(self.command("HGET", job, "attempts")) or 0)
+        if attempts >= MAX_ATTEMPTS:
+            self.command("HSET", job, "status", DEAD, "error", error)
+        else:
+            self.command("HSET", job, "status", PENDING, "error", error)
+            self.command("ZADD", self.delayed, time.time() + retry_delay(attempts), key)
+
+    def results(self, keys: list[str]) -> dict:
+        finished = {}
+        for key in keys:
+            status, result, error = (_text(value) for value in self.command(
+                "HMGET", self.job(key), "status", "result", "error"))
+            if status in (DONE, DEAD):
+                finished[key] = {"status": status, "result": json.loads(result) if result else None,
+                                 "error": error or None}
+        return finished
+
+    def stats(self) -> dict:
+        """Queued, retrying and leased job counts (finished jobs are only kept as expiring hashes)."""
+        return {
+            PENDING: self.command("LLEN", self.ready),
+            "retrying": self.command("ZCARD", self.delayed),
+            LEASED: self.command("ZCARD", self.leases),
+        }
+
+    def purge(self, older_than: float = RESULT_TTL):
+        """Finished jobs expire on their own (RESULT_TTL)."""
+
+
+def open_queue(url: Optional[str] = None, queue: str = "extract"):
+    """Open the work queue at `url` (see the module docstring); default the local SQLite queue."""
+    if not url:
+        return SQLiteWorkQueue(QUEUE_DB, queue)
+
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        # sqlite:///abs/path has an empty netloc; sqlite://rel/path puts the first segment there
+        path = unquote(parsed.netloc + parsed.path)
+        return SQLiteWorkQueue(path or QUEUE_DB, queue)
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        password = unquote(parsed.password) if parsed.password else None
+        client = RespClient(parsed.hostname or "localhost", parsed.port or 6379, db, password)
+        return RedisWorkQueue(client, queue)
+    raise ValueError(f"Unsupported work queue URL: {url} (use sqlite:// or redis://)")
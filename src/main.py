@@ -1,19 +1,20 @@
-from processors.llm_reranker import re_rank_and_summarize_with_llm
-from processors.formatter import format_summary
-from outputs.telegram_sender import send_to_telegram
-from outputs.wechat_sender import send_to_wechat
-from outputs.wordpress_publisher import publish_daily_news_to_wordpress
-from outputs.twitter_publisher import publish_tweet_for_blog_post, generate_tweet_content
-from outputs.threads_publisher import publish_thread_for_blog_post
-from utils.threads_token_manager import validate_and_refresh_token
+# Heavy dependencies (feed parsing, the LLM client, channel SDKs) are imported inside
+# run_pipeline by the stage that needs them, so the CLI and fetch-only runs start fast.
+from processors.formatter import render_digest
 # from outputs.local_storage import save_summary_to_file
-from fetchers.rss_fetcher import fetch_rss_feeds
-from config import SITES_CONFIG
+from utils.checkpoints import STAGES, last_completed_stage, load_checkpoint, prune_checkpoints, save_checkpoint
+from utils import tracing
+from utils.run_budget import RunBudget, time_left
+from processors.topic_profiles import all_sources, profile_articles, profile_channels, select_profiles
+from config import (
+    SITES_CONFIG, LLM_DEADLINE_SECONDS, LLM_HEDGE_PERCENTILE, DEFAULT_PROFILE, EXTRACTION_QUEUE_URL, ARCHIVE_ENABLED,
+)
+import argparse
 import asyncio
 import logging
 import os
 import sys
-from datetime import datetime
+from datetime import date, datetime
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,96 +31,303 @@ logging.basicConfig(
 # Set up logger
 logger = logging.getLogger(__name__)
 
-# Category ID for the "Daily AI News" category in WordPress
-DAILY_AI_NEWS_CATEGORY_ID = 103  # Replace with the actual category ID
+# Where the daily summary files are written
+SUMMARY_DIR = os.path.join(os.path.dirname(__file__), "daily_summary")
 
+# With less of the rank budget left than this, the digest is built without the LLM
+MIN_LLM_SECONDS = 10
+
+
+def run_stage(stage, resume_from, compute, profile=None):
+    """
+    Return a stage's output, from its checkpoint when resuming past it, otherwise by computing and checkpointing it.
+    """
+    attrs = {"profile": profile} if profile else {}
+    with tracing.span(stage, "stage", **attrs) as s:
+        if resume_from and STAGES.index(stage) <= STAGES.index(resume_from):
+            data = load_checkpoint(stage, profile=profile)
+            if data is not None:
+                logger.info(f"⏩ Resuming: reusing the '{stage}' checkpoint.")
+                s.set(resumed=True, items=len(data))
+                return data
+
+        data = compute()
+        save_checkpoint(stage, data, profile=profile)
+        s.set(resumed=False, items=len(data))
+        return data
+
+
+def archive_step(action, write):
+    """Write to the archive (outputs.archive); a failing archive write never stops the pipeline."""
+    if not ARCHIVE_ENABLED:
+        return
+    with tracing.span("archive", "stage", action=action):
+        try:
+            from outputs.archive import Archive
+
+            write(Archive())
+        except Exception as e:
+            logger.warning(f"⚠️ Archiving ({action}) failed: {e}")
 
-async def run_pipeline():
-    try:
-        # Pre-validate Threads token at startup (auto-refreshes if expiring soon)
-        logger.info("🔐 Validating API tokens...")
-        threads_ok, threads_msg, _ = validate_and_refresh_token(auto_update_env=True)
-        logger.info(f"   Threads: {threads_msg}")
 
-        logger.info("📡 Fetching articles from RSS feeds...")
-        rss_feed_urls = SITES_CONFIG
+def summary_file_path(profile_name, run_date):
+    """Summary file of a profile's digest; the default profile keeps the original file name."""
+    prefix = run_date if profile_name == DEFAULT_PROFILE else f"{run_date}_{profile_name}"
+    return os.path.join(SUMMARY_DIR, f"{prefix}_daily_summary.txt")
 
-        # Call fetch_rss_feeds to get the articles
-        articles = fetch_rss_feeds(rss_feed_urls, max_to_rank=20)
+
+def summarize(articles, deadline):
+    """LLM re-rank within the LLM deadline and the rank budget's `deadline`; the local digest when too little is left."""
+    from processors.llm_reranker import build_fallback_digest, re_rank_and_summarize_with_llm
+
+    seconds = LLM_DEADLINE_SECONDS
+    if deadline is not None:
+        seconds = min(seconds, time_left(deadline))
+        if seconds < MIN_LLM_SECONDS:
+            logger.warning(f"⏰ Rank budget used up ({seconds:.0f}s left); building the digest without the LLM.")
+            return build_fallback_digest(articles)
+    return re_rank_and_summarize_with_llm(articles, deadline=seconds, hedge_percentile=LLM_HEDGE_PERCENTILE)
+
+
+async def run_profile(profile, pool, resume_from=None, fetch_only=False, dry_run=False, run_budget=None, share=1.0):
+    """
+    Score the shared article pool for one topic profile, then summarize, save and deliver its digest.
+
+    Args:
+        profile (dict): Resolved topic profile (processors.topic_profiles.select_profiles).
+        pool (list): Articles collected from the feeds of all profiles.
+        resume_from (str, optional): The profile's last completed stage to resume after.
+        fetch_only (bool): Stop after scoring.
+        dry_run (bool): Save the local files but deliver to no channel.
+        run_budget (RunBudget, optional): The run's stage budgets (utils.run_budget).
+        share (float): Fraction of the remaining rank and publish budgets this profile may use.
+    """
+    from fetchers.rss_fetcher import rank_articles
+
+    run_budget = run_budget or RunBudget()
+    name = profile["name"]
+    logger.info(f"🗂️ Topic profile '{name}': {profile['title']}")
+
+    with run_budget.stage("rank", f"rank:{name}", share) as rank_deadline:
+        # 2. Score the profile's share of the pool and keep the best candidates
+        articles = await asyncio.to_thread(
+            run_stage,
+            "scored",
+            resume_from,
+            lambda: rank_articles(
+                profile_articles(pool, profile, SITES_CONFIG), profile["keywords"], max_to_rank=profile["max_to_rank"]),
+            profile=name,
+        )
 
         if not articles:
-            logger.warning("❌ No articles were fetched. Exiting pipeline.")
+            logger.warning(f"❌ No articles matched topic profile '{name}'.")
+            return
+
+        from processors.clustering import group_articles
+
+        run_date = date.today().isoformat()
+        await asyncio.to_thread(
+            archive_step, "scores", lambda archive: archive.add_scores(run_date, name, articles, group_articles(articles)))
+
+        if fetch_only:
+            for rank, article in enumerate(articles, start=1):
+                logger.info(f"{rank:>2}. [{article['total_score']:.1f}] {article['title']} - {article['url']}")
             return
 
         # 3. Sending articles to LLM for re-ranking and summarization
         print("🔍 Sending articles to LLM for re-ranking and summarization...")
-        re_ranked_and_summarized_articles = re_rank_and_summarize_with_llm(
-            articles)
-
-        # 4. Formating output
-        logger.info("🎉 Formatting the summarized articles for display...")
-        formatted_summary = format_summary(re_ranked_and_summarized_articles)
-
-        # 4. Save the formatted summary to a local file
-        logger.info("💾 Saving the summary to a local file...")
-        summary_dir = os.path.join(os.path.dirname(__file__), "daily_summary")
-        os.makedirs(summary_dir, exist_ok=True)
-        file_name = f"{datetime.now().strftime('%Y-%m-%d')}_daily_summary.txt"
-        file_path = os.path.join(summary_dir, file_name)
-
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(formatted_summary)
-
-        logger.info(f"Summary saved successfully to {file_path}")
-
-        # 5. Send the formatted summary to Telegram
-        logger.info("📲 Sending the summary to Telegram...")
-        await send_to_telegram(formatted_summary)
-        logger.info("Summary sent to Telegram successfully.")
-
-        # 6. Send the formatted summary to WeChat
-        logger.info("📲 Sending the summary to WeChat...")
-        send_to_wechat(formatted_summary)  # Call send_to_wechat function from wechat_sender.py
-        logger.info("Summary sent to WeChat successfully.")
-
-        # 7. Publish the daily news summary to WordPress
-        logger.info("🌐 Publishing the daily news summary to WordPress...")
-        wordpress_response = publish_daily_news_to_wordpress(
-            news_content=formatted_summary,
-            post_title="Daily Tech & AI News Digest",
-            category_id=DAILY_AI_NEWS_CATEGORY_ID,
+        re_ranked_and_summarized_articles = await asyncio.to_thread(
+            run_stage, "llm", resume_from, lambda: summarize(articles, rank_deadline), profile=name)
+
+    with run_budget.stage("publish", f"publish:{name}", share) as publish_deadline:
+        await publish(profile, re_ranked_and_summarized_articles, resume_from, run_date, dry_run, publish_deadline)
+
+
+async def publish(profile, re_ranked_and_summarized_articles, resume_from, run_date, dry_run, deadline):
+    """Render a profile's digest, save it locally and deliver it, with deliveries ending by `deadline`."""
+    name = profile["name"]
+
+    # 4. Formating output: every channel variant is rendered once
+    logger.info("🎉 Formatting the summarized articles for display...")
+    digest = run_stage(
+        "formatted", resume_from, lambda: render_digest(re_ranked_and_summarized_articles, profile["heading"]),
+        profile=name)
+    await asyncio.to_thread(archive_step, "digest", lambda archive: archive.add_digest(
+        run_date, name, re_ranked_and_summarized_articles, digest["markdown"], profile["title"]))
+
+    # 4. Save the formatted summary (and the archival JSON) to local files
+    logger.info("💾 Saving the summary to a local file...")
+    os.makedirs(SUMMARY_DIR, exist_ok=True)
+    file_path = summary_file_path(name, datetime.now().strftime('%Y-%m-%d'))
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(digest["markdown"])
+    with open(os.path.splitext(file_path)[0] + ".json", "w", encoding="utf-8") as file:
+        file.write(digest["json"])
+
+    logger.info(f"Summary saved successfully to {file_path}")
+
+    channels = profile_channels(profile)
+    if dry_run or not channels:
+        return
+
+    from outputs.delivery import deliver_digest, SUCCESS_STATUSES
+
+    # 5. Deliver to Telegram, WeChat and WordPress concurrently; Twitter and Threads follow WordPress
+    logger.info(f"📲 Delivering the summary to {', '.join(channels)}...")
+    with tracing.span("delivery", "stage", profile=name) as s:
+        delivery_report = await deliver_digest(
+            digest=digest,
+            post_title=profile["title"],
+            category_id=profile["category_id"],
+            channels=channels,
+            deadline=deadline,
+            profile=name,
         )
+        s.set(items=len(delivery_report))
 
-        if wordpress_response:
-            blog_post_url = wordpress_response.get("link")
-            logger.info(f"✅ Blog post published successfully. URL: {blog_post_url}")
-
-            # 8. Generate content for Twitter and Threads
-            logger.info("🐦 Generating content for Twitter and Threads...")
-            tweet_content = generate_tweet_content(blog_post_url)
-
-            # Publish tweet
-            logger.info("🐦 Publishing a tweet for the daily news digest...")
-            tweet_success = publish_tweet_for_blog_post(tweet_content)
-            if tweet_success:
-                logger.info("✅ Tweet published successfully.")
-            else:
-                logger.warning("⚠️ Tweet publishing failed. Check Twitter API credentials.")
-
-            # Publish Threads post
-            logger.info("📤 Publishing a Threads post for the daily news digest...")
-            threads_success = publish_thread_for_blog_post(blog_post_url, tweet_content)
-            if threads_success:
-                logger.info("✅ Threads post published successfully.")
-            else:
-                logger.warning("⚠️ Threads publishing failed. Check Threads API access token.")
-        else:
-            logger.error("❌ Failed to publish the daily news summary to WordPress. Skipping tweet.")
+    save_checkpoint("delivery", delivery_report, profile=name)
+
+    # Report keys are channel names, or "telegram:<chat id>" for per-chat deliveries
+    failed = [
+        channel for channel, report in delivery_report.items()
+        if report["status"] not in SUCCESS_STATUSES and channel.split(":")[0] in channels
+    ]
+    if failed:
+        logger.warning(
+            f"⚠️ Delivery of '{name}' incomplete for: {', '.join(failed)}. "
+            "Failed deliveries stay in the outbox; retry them with `python -m outputs.delivery --watch`."
+        )
+
+
+async def run_pipeline(resume=False, fetch_only=False, dry_run=False, profile_names=None, run_budget=None):
+    """
+    Run the daily pipeline.
+
+    The feeds of every topic profile are fetched and extracted once; each
+    profile then scores that shared pool and gets its own digest.
+
+    The run has a deadline, split into fetch, extract, rank and publish
+    budgets (utils.run_budget); a stage whose time is up degrades rather
+    than delaying the digest.
+
+    Args:
+        resume (bool): Reuse today's checkpoints up to the last completed stage.
+        fetch_only (bool): Stop after fetching and scoring; no LLM call or delivery.
+        dry_run (bool): Summarize and write the local files, but deliver to no channel.
+        profile_names (list, optional): Topic profiles to run; default every enabled profile.
+        run_budget (RunBudget, optional): The run's deadline; default from config (RunBudget.from_config).
+    """
+    run_budget = run_budget or RunBudget.from_config()
+    try:
+        profiles = select_profiles(profile_names)
+        if not profiles:
+            logger.warning("❌ No topic profile is enabled. Exiting pipeline.")
+            return
+
+        resume_from = {name: last_completed_stage(profile=name) for name in profiles} if resume else {}
+        if resume:
+            for name, stage in resume_from.items():
+                logger.info(f"⏩ Resume requested; last completed stage of '{name}': {stage or 'none'}")
+        prune_checkpoints()
+
+        delivering = not (fetch_only or dry_run)
+        if delivering and any("threads" in profile_channels(profile) for profile in profiles.values()):
+            from utils.threads_token_manager import validate_and_refresh_token
+
+            # Pre-validate Threads token at startup (auto-refreshes if expiring soon)
+            logger.info("🔐 Validating API tokens...")
+            threads_ok, threads_msg, _ = await asyncio.to_thread(validate_and_refresh_token, auto_update_env=True)
+            logger.info(f"   Threads: {threads_msg}")
 
-        logger.info("🎉 Pipeline complete.")
+        from fetchers.rss_fetcher import collect_articles
+
+        # Article extraction runs on worker processes when a work queue is configured
+        queue = None
+        if EXTRACTION_QUEUE_URL:
+            from fetchers.work_queue import open_queue
+            queue = open_queue(EXTRACTION_QUEUE_URL)
+
+        rss_feed_urls = all_sources(profiles, SITES_CONFIG)
+        logger.info(f"📡 Fetching articles from {len(rss_feed_urls)} RSS feeds for {len(profiles)} topic profile(s)...")
+
+        # 1. Fetch feeds and extract full text once, for every profile. The blocking stages run in worker
+        # threads, so the scheduler daemon's event loop (polls, outbox retries, signals) stays responsive.
+        fetched = await asyncio.to_thread(
+            run_stage,
+            "fetched",
+            last_completed_stage() if resume else None,
+            lambda: collect_articles(rss_feed_urls, queue=queue, run_budget=run_budget),
+        )
+
+        if not fetched:
+            logger.warning("❌ No articles were fetched. Exiting pipeline.")
+            return
+        await asyncio.to_thread(
+            archive_step, "articles", lambda archive: archive.add_articles(fetched, date.today().isoformat()))
+
+        # A failing profile doesn't stop the others; each gets an equal share of the time left to rank and publish
+        for index, (name, profile) in enumerate(profiles.items()):
+            try:
+                await run_profile(profile, fetched, resume_from.get(name), fetch_only=fetch_only, dry_run=dry_run,
+                                  run_budget=run_budget, share=1 / (len(profiles) - index))
+            except Exception as e:
+                logger.error(f"❌ Topic profile '{name}' failed: {e}")
+
+        if fetch_only:
+            logger.info("🎉 Fetch-only run complete.")
+        elif dry_run:
+            logger.info("🎉 Dry run complete; nothing was delivered.")
+        else:
+            logger.info("🎉 Pipeline complete.")
 
     except Exception as e:
         logger.error(f"❌ Error occurred while running the pipeline: {str(e)}")
+    finally:
+        run_budget.report()
 
 if __name__ == "__main__":
-    asyncio.run(run_pipeline())
+    parser = argparse.ArgumentParser(description="Fetch, summarize and publish the daily AI news digest.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse today's checkpoints and start from the last completed stage",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--fetch-only", action="store_true", help="Only fetch and score articles, then list them")
+    mode.add_argument("--dry-run", action="store_true", help="Summarize and save locally, but deliver nowhere")
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record stage, feed, LLM and channel spans and export a Chrome trace (also PIPELINE_TRACE=1)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        dest="profiles",
+        metavar="NAME",
+        help="Run only this topic profile (repeatable; default: every enabled profile in config.TOPIC_PROFILES)",
+    )
+    deadline = parser.add_mutually_exclusive_group()
+    deadline.add_argument("--deadline", metavar="HH:MM", help="Finish the run by this local time (default: config)")
+    deadline.add_argument("--budget", type=float, metavar="SECONDS", help="Finish the run within this many seconds")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable()
+
+    if args.deadline:
+        run_budget = RunBudget.until(args.deadline)
+    elif args.budget is not None:
+        run_budget = RunBudget(args.budget)
+    else:
+        run_budget = RunBudget.from_config()
+
+    asyncio.run(run_pipeline(
+        resume=args.resume, fetch_only=args.fetch_only, dry_run=args.dry_run, profile_names=args.profiles,
+        run_budget=run_budget))
+
+    if tracing.is_enabled():
+        trace_path = tracing.export_chrome_trace()
+        tracing.print_summary()
+        logger.info(f"🧭 Trace written to {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
@@ -0,0 +1,449 @@
+"""
+Article and Digest Archive
+
+Every run's candidate articles, their per-profile scores and topic
+clusters, and the digests they made it into are kept in one SQLite file
+(<CACHE_DIR>/archive.db):
+
+- articles:      one row per URL, the fullest copy seen (extracted, then longest
+                 content); content is zstd-compressed (zlib when the zstandard
+                 package isn't installed; each row records its codec)
+- sightings:     every run date an article was a candidate on
+- articles_fts:  contentless FTS5 index over title, summary and content
+- scores:        score, rank and cluster of an article per run date and profile
+- digests:       each profile's rendered digest per run date (compressed)
+- digest_items:  the digest entries, linked to the archived article they cite
+
+Writes are batched: one transaction and executemany per pipeline stage.
+
+Usage (run from src/):
+    python -m outputs.archive search "openai agents" --since 2026-10-01 --source techcrunch
+    python -m outputs.archive search --date 2026-10-17 --profile ai --in-digest
+    python -m outputs.archive show https://example.com/article
+    python -m outputs.archive digest 2026-10-17 --profile ai
+    python -m outputs.archive stats
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # zlib is used instead; rows record their codec, so both stay readable
+    zstandard = None
+
+from config import CACHE_DIR, DEFAULT_PROFILE
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DB = os.path.join(CACHE_DIR, "archive.db")
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+# Stay below SQLite's limit on bound parameters
+CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    source TEXT,
+    published TEXT,
+    run_date TEXT NOT NULL,
+    summary TEXT,
+    content BLOB,
+    codec TEXT NOT NULL,
+    status TEXT,
+    readability_score REAL
+);
+CREATE INDEX IF NOT EXISTS articles_run_date ON articles (run_date);
+CREATE INDEX IF NOT EXISTS articles_source ON articles (source);
+CREATE TABLE IF NOT EXISTS sightings (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    run_date TEXT NOT NULL,
+    PRIMARY KEY (run_date, article_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content, content='', tokenize='porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS scores (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    run_date TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    total_score REAL,
+    rank INTEGER,
+    cluster INTEGER,
+    PRIMARY KEY (article_id, run_date, profile)
+);
+CREATE INDEX IF NOT EXISTS scores_run ON scores (run_date, profile);
+CREATE TABLE IF NOT EXISTS digests (
+    run_date TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    title TEXT,
+    markdown BLOB,
+    codec TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_date, profile)
+);
+CREATE TABLE IF NOT EXISTS digest_items (
+    run_date TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    article_id INTEGER REFERENCES articles (id),
+    url TEXT,
+    title TEXT,
+    summary TEXT,
+    icon TEXT,
+    PRIMARY KEY (run_date, profile, position)
+);
+CREATE INDEX IF NOT EXISTS digest_items_article ON digest_items (article_id);
+"""
+
+
+def compress(text: str) -> tuple[bytes, str]:
+    """Compress text with zstd if available, else zlib; returns (data, codec)."""
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), "zstd"
+    return zlib.compress(data, ZLIB_LEVEL), "zlib"
+
+
+def decompress(data: Optional[bytes], codec: str) -> str:
+    if data is None:
+        return ""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This archive entry is zstd-compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def extraction_rank(article: dict) -> tuple:
+    """Orders copies of an article: an extracted one over a failed extraction, then longer content."""
+    return article.get("status") == "success", len(article.get("content") or "")
+
+
+def chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Archive:
+    """SQLite archive of candidate articles, their scores and clusters, and the digests built from them."""
+
+    def __init__(self, db_path: str = ARCHIVE_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            had_sightings = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sightings'").fetchone()
+            conn.executescript(SCHEMA)
+            if not had_sightings:
+                # Archives from before sightings were recorded: every date an article was archived or scored on
+                conn.execute("INSERT OR IGNORE INTO sightings (article_id, run_date) SELECT id, run_date FROM articles")
+                conn.execute(
+                    "INSERT OR IGNORE INTO sightings (article_id, run_date) SELECT article_id, run_date FROM scores")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _article_ids(conn, urls: list[str]) -> dict[str, int]:
+        ids = {}
+        for chunk in chunks(urls):
+            rows = conn.execute(
+                f"SELECT id, url FROM articles WHERE url IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+            ids.update({row["url"]: row["id"] for row in rows})
+        return ids
+
+    def add_articles(self, articles: list[dict], run_date: str) -> dict[str, int]:
+        """
+        Archive candidate articles seen on `run_date`; an URL already in the archive is replaced
+        only by a fuller copy (extraction_rank), and the sighting is recorded either way.
+
+        Returns:
+            dict: Archive ID of every given article, by URL.
+        """
+        articles = list({article["url"]: article for article in articles}.values())
+        with self._connect() as conn:
+            known = self._article_ids(conn, [article["url"] for article in articles])
+            new = [article for article in articles if article["url"] not in known]
+            self._upgrade_articles(conn, [article for article in articles if article["url"] in known], known)
+            rows = []
+            for article in new:
+                content, codec = compress(article.get("content") or "")
+                rows.append((
+                    article["url"], article.get("title", ""), article.get("source"), article.get("published"),
+                    run_date, article.get("summary"), content, codec, article.get("status"),
+                    article.get("readability_score"),
+                ))
+            conn.executemany(
+                "INSERT OR IGNORE INTO articles (url, title, source, published, run_date, summary, content, codec, "
+                "status, readability_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            ids = self._article_ids(conn, [article["url"] for article in new])
+            conn.executemany(
+                "INSERT INTO articles_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                [(ids[article["url"]], article.get("title", ""), article.get("summary") or "",
+                  article.get("content") or "") for article in new if article["url"] in ids],
+            )
+            known.update(ids)
+            conn.executemany(
+                "INSERT OR IGNORE INTO sightings (article_id, run_date) VALUES (?, ?)",
+                [(article_id, run_date) for article_id in known.values()],
+            )
+        return known
+
+    @staticmethod
+    def _upgrade_articles(conn, articles: list[dict], ids: dict[str, int]):
+        """Replace the stored copies that `articles` improve on (e.g. extracted text over a feed summary)."""
+        stored = {}
+        for chunk in chunks([ids[article["url"]] for article in articles]):
+            rows = conn.execute(
+                f"SELECT id, title, summary, content, codec, status FROM articles "
+                f"WHERE id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+            stored.update({row["id"]: {**dict(row), "content": decompress(row["content"], row["codec"])} for row in rows})
+
+        for article in articles:
+            old = stored[ids[article["url"]]]
+            if extraction_rank(article) <= extraction_rank(old):
+                continue
+            content, codec = compress(article.get("content") or "")
+            conn.execute(
+                "UPDATE articles SET title = ?, summary = ?, content = ?, codec = ?, status = ?, readability_score = ? "
+                "WHERE id = ?",
+                (article.get("title", ""), article.get("summary"), content, codec, article.get("status"),
+                 article.get("readability_score"), old["id"]),
+            )
+            # A contentless FTS5 row is removed by repeating the values it was indexed with
+            conn.execute(
+                "INSERT INTO articles_fts (articles_fts, rowid, title, summary, content) VALUES ('delete', ?, ?, ?, ?)",
+                (old["id"], old["title"], old["summary"] or "", old["content"]),
+            )
+            conn.execute(
+                "INSERT INTO articles_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                (old["id"], article.get("title", ""), article.get("summary") or "", article.get("content") or ""),
+            )
+
+    def add_scores(self, run_date: str, profile: str, scored: list[dict], groups: Optional[list[list[dict]]] = None):
+        """
+        Archive a profile's ranked candidates with their score, rank and topic cluster.
+
+        Args:
+            scored: Ranked articles with 'total_score' (rss_fetcher.rank_articles).
+            groups: Topic clusters of those articles (processors.clustering.group_articles);
+                the cluster number is the group's position, starting at 1.
+        """
+        cluster_of = {}
+        for number, group in enumerate(groups or [], start=1):
+            for article in group:
+                cluster_of[article["url"]] = number
+
+        ids = self.add_articles(scored, run_date)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scores (article_id, run_date, profile, total_score, rank, cluster) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(ids[article["url"]], run_date, profile, article.get("total_score"), rank,
+                  cluster_of.get(article["url"])) for rank, article in enumerate(scored, start=1)],
+            )
+
+    def add_digest(self, run_date: str, profile: str, items: list[dict], markdown: str = "", title: str = ""):
+        """Archive a profile's digest and its entries, linking each entry to the article it cites."""
+        data, codec = compress(markdown)
+        with self._connect() as conn:
+            ids = self._article_ids(conn, [item.get("url") for item in items if item.get("url")])
+            conn.execute("DELETE FROM digest_items WHERE run_date = ? AND profile = ?", (run_date, profile))
+            conn.executemany(
+                "INSERT INTO digest_items (run_date, profile, position, article_id, url, title, summary, icon) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_date, profile, position, ids.get(item.get("url")), item.get("url"), item.get("title"),
+                  item.get("summary"), item.get("icon")) for position, item in enumerate(items, start=1)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO digests (run_date, profile, title, markdown, codec, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_date, profile, title, data, codec, time.time()),
+            )
+
+    def search(self, query: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+               source: Optional[str] = None, profile: Optional[str] = None, in_digest: bool = False,
+               limit: int = 20) -> list[dict]:
+        """
+        Find archived articles, best match first for a query, otherwise newest first.
+
+        Args:
+            query: FTS5 query over title, summary and content (e.g. 'openai AND agent*', '"open source"').
+            since, until: Run date range (YYYY-MM-DD), inclusive; matches articles seen on any date in it.
+            source: Substring of the feed URL.
+            profile: Only articles scored for this topic profile.
+            in_digest: Only articles cited in a digest.
+        """
+        joins, where, params = [], [], []
+        order = "a.run_date DESC, a.id DESC"
+        if query:
+            joins.append("JOIN articles_fts f ON f.rowid = a.id")
+            where.append("articles_fts MATCH ?")
+            params.append(query)
+            order = "f.rank"
+        if since or until:
+            where.append(
+                "EXISTS (SELECT 1 FROM sightings g WHERE g.article_id = a.id AND g.run_date >= ? AND g.run_date <= ?)")
+            params += [since or "", until or "9999-12-31"]
+        if source:
+            where.append("a.source LIKE ?")
+            params.append(f"%{source}%")
+        if profile:
+            where.append("EXISTS (SELECT 1 FROM scores s WHERE s.article_id = a.id AND s.profile = ?)")
+            params.append(profile)
+        if in_digest and profile:
+            where.append("EXISTS (SELECT 1 FROM digest_items d WHERE d.article_id = a.id AND d.profile = ?)")
+            params.append(profile)
+        elif in_digest:
+            where.append("EXISTS (SELECT 1 FROM digest_items d WHERE d.article_id = a.id)")
+
+        where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+        sql = (
+            "SELECT a.id, a.url, a.title, a.source, a.published, a.run_date, a.summary, a.readability_score, "
+            "(SELECT MAX(s.total_score) FROM scores s WHERE s.article_id = a.id) AS best_score, "
+            "(SELECT GROUP_CONCAT(d.run_date || ':' || d.profile) FROM digest_items d WHERE d.article_id = a.id) "
+            f"AS digests FROM articles a {' '.join(joins)} {where_clause} ORDER BY {order} LIMIT ?"
+        )
+        with self._connect() as conn:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_article(self, url: str) -> Optional[dict]:
+        """An archived article with its decompressed content, scores and digest appearances."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM articles WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            article = dict(row)
+            article["content"] = decompress(article["content"], article.pop("codec"))
+            article["scores"] = [dict(score) for score in conn.execute(
+                "SELECT run_date, profile, total_score, rank, cluster FROM scores WHERE article_id = ? "
+                "ORDER BY run_date", (article["id"],))]
+            article["digests"] = [dict(item) for item in conn.execute(
+                "SELECT run_date, profile, position FROM digest_items WHERE article_id = ? ORDER BY run_date",
+                (article["id"],))]
+        return article
+
+    def articles_for_date(self, run_date: str) -> list[dict]:
+        """
+        The candidate pool of one run date, in the shape rss_fetcher.collect_articles returns.
+
+        Includes articles first archived on an earlier date and seen again on this one.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT a.url, a.title, a.source, a.published, a.summary, a.content, a.codec, a.status, "
+                "a.readability_score FROM sightings g JOIN articles a ON a.id = g.article_id "
+                "WHERE g.run_date = ? ORDER BY a.id", (run_date,)).fetchall()
+        return [
+            {
+                "title": row["title"],
+                "summary": row["summary"] or "",
+                "url": row["url"],
+                "source": row["source"],
+                "published": row["published"],
+                "content": decompress(row["content"], row["codec"]),
+                "status": row["status"],
+                "readability_score": row["readability_score"],
+            }
+            for row in rows
+        ]
+
+    def get_digest(self, run_date: str, profile: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM digests WHERE run_date = ? AND profile = ?", (run_date, profile)).fetchone()
+            if row is None:
+                return None
+            items = [dict(item) for item in conn.execute(
+                "SELECT position, url, title, summary, icon, article_id FROM digest_items "
+                "WHERE run_date = ? AND profile = ? ORDER BY position", (run_date, profile))]
+        return {"run_date": run_date, "profile": profile, "title": row["title"],
+                "markdown": decompress(row["markdown"], row["codec"]), "items": items}
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("articles", "sightings", "scores", "digests", "digest_items")}
+            first, last = conn.execute("SELECT MIN(run_date), MAX(run_date) FROM sightings").fetchone()
+            codecs = dict(conn.execute("SELECT codec, COUNT(*) FROM articles GROUP BY codec").fetchall())
+            compressed = conn.execute("SELECT COALESCE(SUM(LENGTH(content)), 0) FROM articles").fetchone()[0]
+        return {**counts, "first_date": first, "last_date": last, "codecs": codecs, "compressed_bytes": compressed,
+                "file_bytes": os.path.getsize(self.db_path)}
+
+
+def print_articles(rows: list[dict]):
+    for row in rows:
+        score = f"{row['best_score']:.1f}" if row["best_score"] is not None else "-"
+        digests = f"  [digest {row['digests']}]" if row["digests"] else ""
+        print(f"{row['run_date']}  {score:>6}  {row['title'][:80]}{digests}")
+        print(f"{'':>20}{row['url']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the article and digest archive.")
+    parser.add_argument("--db", default=ARCHIVE_DB, help="Archive database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Search archived articles")
+    search.add_argument("query", nargs="?", help="FTS5 query, e.g. 'openai AND agent*'")
+    search.add_argument("--since", help="First run date (YYYY-MM-DD)")
+    search.add_argument("--until", help="Last run date (YYYY-MM-DD)")
+    search.add_argument("--date", help="Single run date (YYYY-MM-DD)")
+    search.add_argument("--source", help="Substring of the feed URL")
+    search.add_argument("--profile", help="Only articles scored for this topic profile")
+    search.add_argument("--in-digest", action="store_true", help="Only articles cited in a digest")
+    search.add_argument("--limit", type=int, default=20)
+
+    show = commands.add_parser("show", help="Show one archived article")
+    show.add_argument("url")
+
+    digest = commands.add_parser("digest", help="Print an archived digest")
+    digest.add_argument("run_date")
+    digest.add_argument("--profile", default=DEFAULT_PROFILE)
+
+    commands.add_parser("stats", help="Archive size and coverage")
+    args = parser.parse_args()
+
+    archive = Archive(args.db)
+    if args.command == "search":
+        print_articles(archive.search(
+            args.query, since=args.since or args.date, until=args.until or args.date, source=args.source,
+            profile=args.profile, in_digest=args.in_digest, limit=args.limit))
+    elif args.command == "show":
+        article = archive.get_article(args.url)
+        if article is None:
+            raise SystemExit(f"Not archived: {args.url}")
+        content = article.pop("content")
+        print(json.dumps(article, ensure_ascii=False, indent=2))
+        print(content)
+    elif args.command == "digest":
+        archived = archive.get_digest(args.run_date, args.profile)
+        if archived is None:
+            raise SystemExit(f"No '{args.profile}' digest archived for {args.run_date}")
+        print(archived["markdown"])
+    else:
+        print(json.dumps(archive.stats(), indent=2))
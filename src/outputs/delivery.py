@@ -0,0 +1,414 @@
+# outputs/delivery.py
+"""
+Concurrent fan-out of the daily digest to every output channel.
+
+Channels are plugins: each one's module is imported the first time it is
+used, and only channels listed in config.ENABLED_CHANNELS are delivered
+to, so a disabled channel's dependencies and credentials are never needed.
+A digest can be restricted further to a subset of channels (a topic
+profile's channels).
+
+Telegram, WeChat and WordPress start at the same time. The social posts
+(Twitter, Threads) need the WordPress URL, so they wait for WordPress and
+then run concurrently with each other. Every channel has its own timeout
+and failures are isolated: one channel failing never stops the others.
+A delivery deadline (the run's publish budget, utils.run_budget) caps the
+channel timeouts; channels not started by then are left to the retry
+worker.
+
+Blocking channel functions run in worker threads so they don't stall the
+event loop. A timed-out thread can't be killed; it finishes in the
+background while the report records the timeout, and if it then succeeds
+its outbox entry is marked delivered so the retry worker doesn't send it
+again.
+
+Every delivery goes through the outbox (outputs.outbox). Failed channels
+are retried later without rerunning the pipeline. A channel whose sender
+takes `progress` and `on_progress` keywords (Telegram, which sends long
+digests in chunks) saves its progress in the outbox entry, and a retry
+resumes where the failed attempt stopped:
+
+    python -m outputs.delivery           # one retry pass over due deliveries
+    python -m outputs.delivery --watch   # keep retrying until the outbox is empty
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import logging
+import threading
+import time
+
+from config import CHANNEL_TIMEOUTS, ENABLED_CHANNELS
+from outputs.outbox import DELIVERED, Outbox
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL_TIMEOUT = 60
+
+# Extra time an outbox claim is held beyond the channel timeout
+LEASE_MARGIN = 30
+
+# How often the retry worker checks for due deliveries
+RETRY_POLL_INTERVAL = 30
+
+# Channel senders as "module:function", imported on first use. Outbox payloads are the
+# keyword arguments for these functions. An entry may also be the function itself.
+CHANNELS = {
+    "telegram": "outputs.telegram_sender:send_to_telegram",
+    "wechat": "outputs.wechat_sender:send_to_wechat",
+    "wordpress": "outputs.wordpress_publisher:publish_daily_news_to_wordpress",
+    "twitter": "outputs.twitter_publisher:publish_tweet_for_blog_post",
+    "threads": "outputs.threads_publisher:publish_thread_for_blog_post_async",
+}
+
+SUCCESS_STATUSES = ("success", "already_delivered")
+
+
+def load_channel(name: str):
+    """Resolve a channel's sender function, importing its module on first use."""
+    sender = CHANNELS[name]
+    if callable(sender):
+        return sender
+    module_name, function_name = sender.split(":")
+    func = getattr(importlib.import_module(module_name), function_name)
+    CHANNELS[name] = func
+    return func
+
+
+def accepts_progress(sender) -> bool:
+    """Whether a channel sender can resume from saved progress (see the module docstring)."""
+    return "progress" in inspect.signature(sender).parameters
+
+
+def channel_enabled(name: str, channels: list[str] | None = None) -> bool:
+    """Whether a channel is enabled in config and, if `channels` is given, among them."""
+    return name in ENABLED_CHANNELS and (channels is None or name in channels)
+
+
+async def run_channel(name: str, func, *args, timeout: float | None = None, on_late_result=None, **kwargs) -> dict:
+    """
+    Run one channel delivery with a timeout and capture the outcome.
+
+    A channel counts as failed if it raises, times out, or returns a falsy
+    value (the output modules return False/None on failure). A blocking
+    channel that times out keeps running in its thread; if it succeeds after
+    all, `on_late_result(result)` is called from that thread.
+
+    Returns:
+        dict: {'channel', 'status' ('success', 'failed' or 'timeout'), 'duration', 'error', 'result'}
+    """
+    if timeout is None:
+        timeout = CHANNEL_TIMEOUTS.get(name, DEFAULT_CHANNEL_TIMEOUT)
+
+    # Whether the thread finished, and whether the caller gave up on it first
+    outcome = {"done": False, "abandoned": False, "result": None}
+    lock = threading.Lock()
+
+    def call_in_thread():
+        result = func(*args, **kwargs)
+        with lock:
+            outcome.update(done=True, result=result)
+            abandoned = outcome["abandoned"]
+        if abandoned and result and on_late_result is not None:
+            logger.warning(f"⌛ {name}: delivered after timing out")
+            on_late_result(result)
+        return result
+
+    start = time.monotonic()
+    report = {"channel": name, "status": "success", "duration": 0.0, "error": None, "result": None}
+    with span(name, "channel", timeout=timeout) as s:
+        try:
+            if inspect.iscoroutinefunction(func):
+                call = func(*args, **kwargs)
+            else:
+                call = asyncio.to_thread(call_in_thread)
+            try:
+                result = await asyncio.wait_for(call, timeout=timeout)
+            except asyncio.TimeoutError:
+                with lock:
+                    outcome["abandoned"] = not outcome["done"]
+                if outcome["abandoned"]:
+                    raise
+                # The thread finished just as the timeout fired
+                result = outcome["result"]
+            report["result"] = result
+            if not result:
+                report["status"] = "failed"
+                report["error"] = "channel reported failure"
+        except asyncio.TimeoutError:
+            report["status"] = "timeout"
+            report["error"] = f"timed out after {timeout:.0f}s"
+        except Exception as e:
+            report["status"] = "failed"
+            report["error"] = str(e)
+        s.set(status=report["status"], error=report["error"])
+
+    report["duration"] = round(time.monotonic() - start, 2)
+    if report["status"] == "success":
+        logger.info(f"✅ {name}: delivered in {report['duration']:.1f}s")
+    else:
+        logger.error(f"❌ {name}: {report['status']} after {report['duration']:.1f}s ({report['error']})")
+    return report
+
+
+def skipped(name: str, reason: str) -> dict:
+    """Report entry for a channel that was not attempted."""
+    logger.warning(f"⏭️ {name}: skipped ({reason})")
+    return {"channel": name, "status": "skipped", "duration": 0.0, "error": reason, "result": None}
+
+
+def report_label(name: str, payload: dict) -> str:
+    """Report name for a delivery; per-chat deliveries are labelled with their chat ID."""
+    chat_ids = payload.get("chat_ids")
+    return f"{name}:{chat_ids[0]}" if chat_ids and len(chat_ids) == 1 else name
+
+
+async def attempt_delivery(name: str, key: str, payload: dict, outbox: Outbox, deadline: float | None = None) -> dict:
+    """
+    Attempt one outbox delivery, unless it already succeeded or is claimed elsewhere.
+
+    The outcome is written back to the outbox: success marks the delivery
+    done, failure schedules a retry with backoff. With a `deadline`
+    (time.monotonic()) the channel timeout ends there at the latest, and
+    past it the delivery stays pending in the outbox.
+    """
+    label = report_label(name, payload)
+    timeout = CHANNEL_TIMEOUTS.get(name, DEFAULT_CHANNEL_TIMEOUT)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return {**skipped(label, "publish budget used up; left in the outbox for retry"), "idempotency_key": key}
+        timeout = min(timeout, remaining)
+    if not outbox.claim(key, lease_seconds=timeout + LEASE_MARGIN):
+        entry = outbox.get(key)
+        if entry and entry["status"] == DELIVERED:
+            logger.info(f"♻️ {label}: already delivered, not sending again")
+            return {"channel": label, "status": "already_delivered", "duration": 0.0, "error": None,
+                    "result": entry["result"], "idempotency_key": key}
+        status = entry["status"] if entry else "unknown"
+        return {**skipped(label, f"outbox entry is {status} and not due"), "idempotency_key": key}
+
+    try:
+        sender = load_channel(name)
+    except Exception as e:
+        # A missing dependency is a failed attempt like any other; the outbox retries it later
+        logger.error(f"❌ {label}: could not load channel: {e}")
+        outbox.mark_failed(key, f"could not load channel: {e}")
+        return {"channel": label, "status": "failed", "duration": 0.0, "error": f"could not load channel: {e}",
+                "result": None, "idempotency_key": key}
+
+    def record_late_delivery(result):
+        outbox.mark_delivered(key, result)
+
+    kwargs = dict(payload)
+    if accepts_progress(sender):
+        entry = outbox.get(key)
+        kwargs["progress"] = entry["progress"] if entry else None
+        kwargs["on_progress"] = lambda progress: outbox.save_progress(key, progress)
+
+    report = await run_channel(label, sender, timeout=timeout, on_late_result=record_late_delivery, **kwargs)
+    report["idempotency_key"] = key
+    if report["status"] == "success":
+        outbox.mark_delivered(key, report["result"])
+    else:
+        outbox.mark_failed(key, report["error"])
+    return report
+
+
+async def deliver(name: str, payload: dict, outbox: Outbox, channels: list[str] | None = None,
+                  deadline: float | None = None, profile: str | None = None) -> dict:
+    """Record a delivery in the outbox and attempt it right away, unless the channel is disabled."""
+    if not channel_enabled(name, channels):
+        return skipped(name, "disabled in config")
+    key = outbox.enqueue(name, payload, channels=channels, profile=profile)
+    return await attempt_delivery(name, key, payload, outbox, deadline)
+
+
+async def deliver_telegram(text: str, outbox: Outbox, channels: list[str] | None = None,
+                           deadline: float | None = None, profile: str | None = None) -> list[dict]:
+    """Send the digest to every Telegram chat, with one outbox entry per chat so retries skip chats that got it."""
+    if not channel_enabled("telegram", channels):
+        return [skipped("telegram", "disabled in config")]
+
+    from outputs.telegram_sender import TELEGRAM_CHAT_IDS
+    if not TELEGRAM_CHAT_IDS:
+        return [skipped("telegram", "no chat IDs configured")]
+    return list(
+        await asyncio.gather(
+            *(
+                deliver("telegram", {"text": text, "chat_ids": [chat_id], "parse_mode": "MarkdownV2"}, outbox,
+                        channels, deadline, profile)
+                for chat_id in TELEGRAM_CHAT_IDS
+            )
+        )
+    )
+
+
+async def deliver_social(blog_post_url: str, outbox: Outbox, channels: list[str] | None = None,
+                         deadline: float | None = None, profile: str | None = None) -> list[dict]:
+    """Post the blog link to Twitter and Threads concurrently."""
+    if not (channel_enabled("twitter", channels) or channel_enabled("threads", channels)):
+        return [skipped("twitter", "disabled in config"), skipped("threads", "disabled in config")]
+
+    from processors.social_copy import generate_social_copy
+    social_copy = await asyncio.to_thread(generate_social_copy, blog_post_url)
+    return list(
+        await asyncio.gather(
+            deliver("twitter", {"tweet_content": social_copy["tweet"]}, outbox, channels, deadline, profile),
+            deliver("threads", {"blog_post_url": blog_post_url, "tweet_content": social_copy["threads"]}, outbox,
+                    channels, deadline, profile),
+        )
+    )
+
+
+async def deliver_blog_and_social(news_content: str, post_title: str, category_id: int | None, outbox: Outbox,
+                                  channels: list[str] | None = None, deadline: float | None = None,
+                                  profile: str | None = None) -> list[dict]:
+    """Publish to WordPress, then post the blog link to Twitter and Threads concurrently."""
+    wordpress = await deliver(
+        "wordpress",
+        {"news_content": news_content, "post_title": post_title, "category_id": category_id},
+        outbox,
+        channels,
+        deadline,
+        profile,
+    )
+    if wordpress["status"] == "skipped":
+        reason = f"WordPress {wordpress['error']}"
+        return [wordpress, skipped("twitter", reason), skipped("threads", reason)]
+
+    if wordpress["status"] not in SUCCESS_STATUSES:
+        return [wordpress, skipped("twitter", "WordPress post failed"), skipped("threads", "WordPress post failed")]
+
+    if wordpress["result"].get("unchanged"):
+        reason = "WordPress post unchanged"
+        return [wordpress, skipped("twitter", reason), skipped("threads", reason)]
+
+    return [wordpress, *await deliver_social(wordpress["result"].get("link"), outbox, channels, deadline, profile)]
+
+
+def collect_reports(results) -> dict:
+    """Flatten gathered report lists into a dict keyed by channel name."""
+    reports = {}
+    for result in results:
+        for report in result if isinstance(result, list) else [result]:
+            reports[report["channel"]] = report
+    return reports
+
+
+async def deliver_digest(digest: dict, post_title: str, category_id: int | None = None, outbox: Outbox | None = None,
+                         channels: list[str] | None = None, deadline: float | None = None,
+                         profile: str | None = None) -> dict:
+    """
+    Deliver the formatted digest to all channels concurrently.
+
+    Args:
+        digest (dict): Rendered digest variants from processors.formatter.render_digest.
+            Telegram gets the MarkdownV2 variant, WeChat the plain text and WordPress the HTML.
+        post_title (str): Title of the WordPress post.
+        category_id (int, optional): WordPress category for the post.
+        outbox (Outbox, optional): Outbox to record deliveries in. Defaults to the local outbox.
+        channels (list, optional): Deliver only to these channels (still subject to ENABLED_CHANNELS).
+        deadline (float, optional): time.monotonic() by which deliveries must end; see attempt_delivery.
+        profile (str, optional): Topic profile of the digest; its new deliveries supersede the
+            profile's pending ones of the day (see outputs.outbox).
+
+    Returns:
+        dict: Per-channel reports keyed by channel name (see run_channel).
+    """
+    outbox = outbox or Outbox()
+    results = await asyncio.gather(
+        deliver_telegram(digest["telegram"], outbox, channels, deadline, profile),
+        deliver("wechat", {"message": digest["text"]}, outbox, channels, deadline, profile),
+        deliver_blog_and_social(digest["html"], post_title, category_id, outbox, channels, deadline, profile),
+    )
+
+    reports = collect_reports(results)
+    log_delivery_report(reports)
+    return reports
+
+
+async def retry_entry(entry: dict, outbox: Outbox) -> list[dict]:
+    """
+    Retry one outbox entry; a successful WordPress retry also triggers the social posts,
+    on the channels the digest was delivered to.
+    """
+    report = await attempt_delivery(entry["channel"], entry["idempotency_key"], entry["payload"], outbox)
+    if entry["channel"] == "wordpress" and report["status"] == "success" and not report["result"].get("unchanged"):
+        return [report, *await deliver_social(report["result"].get("link"), outbox, entry["channels"],
+                                              profile=entry["profile"])]
+    return [report]
+
+
+async def retry_pending_deliveries(outbox: Outbox | None = None) -> dict:
+    """
+    Retry every due delivery in the outbox concurrently.
+
+    Returns:
+        dict: Per-channel reports keyed by channel name; empty if nothing was due.
+    """
+    outbox = outbox or Outbox()
+    due = outbox.due()
+    if not due:
+        return {}
+
+    logger.info(f"🔁 Retrying {len(due)} pending deliveries...")
+    results = await asyncio.gather(*(retry_entry(entry, outbox) for entry in due))
+    reports = collect_reports(results)
+    log_delivery_report(reports)
+    return reports
+
+
+async def run_retry_worker(outbox: Outbox | None = None, poll_interval: float = RETRY_POLL_INTERVAL,
+                           stop_event: asyncio.Event | None = None, until_empty: bool = False):
+    """
+    Keep draining the outbox, sleeping until the next retry is due.
+
+    Args:
+        outbox (Outbox, optional): Outbox to drain. Defaults to the local outbox.
+        poll_interval (float): Maximum sleep between passes, in seconds.
+        stop_event (asyncio.Event, optional): Stop once this event is set.
+        until_empty (bool): Stop once no deliveries are pending.
+    """
+    outbox = outbox or Outbox()
+    stop_event = stop_event or asyncio.Event()
+
+    while not stop_event.is_set():
+        await retry_pending_deliveries(outbox)
+        if until_empty and outbox.pending_count() == 0:
+            logger.info("📭 Outbox is empty.")
+            return
+
+        next_attempt_at = outbox.next_attempt_at()
+        sleep_for = poll_interval if next_attempt_at is None else min(poll_interval, max(next_attempt_at - time.time(), 1))
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=sleep_for)
+        except asyncio.TimeoutError:
+            pass
+
+
+def log_delivery_report(reports: dict):
+    """Log a one-line-per-channel summary of a delivery run."""
+    logger.info("📬 Delivery report:")
+    for name, report in reports.items():
+        detail = f" - {report['error']}" if report["error"] else ""
+        logger.info(f"   {name:<20} {report['status']:<18} {report['duration']:>6.1f}s{detail}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Retry failed channel deliveries from the outbox.")
+    parser.add_argument("--watch", action="store_true", help="Keep retrying until no deliveries are pending")
+    args = parser.parse_args()
+
+    if args.watch:
+        asyncio.run(run_retry_worker(until_empty=True))
+    else:
+        asyncio.run(retry_pending_deliveries())
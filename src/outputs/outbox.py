@@ -0,0 +1,250 @@
+# outputs/outbox.py
+"""
+Durable outbox for channel deliveries.
+
+Every delivery is recorded in a local SQLite table before it is attempted,
+keyed by an idempotency key derived from the channel, the run date and the
+payload. Failed deliveries stay pending with an exponential backoff so a
+retry worker (see outputs.delivery) can resend them without repeating any
+upstream work, and deliveries that already succeeded are never sent twice.
+
+A delivery also has a slot: its channel (and Telegram chat), run date and
+topic profile. A second run on the same day produces a new payload for the
+same slot, and the older pending delivery there is superseded rather than
+retried, so the retry worker never sends an outdated digest.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DB = os.path.join(CACHE_DIR, "outbox.db")
+
+# Retry schedule: 30s, 60s, 120s, ... capped at one hour, at most 8 attempts
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+MAX_ATTEMPTS = 8
+
+PENDING = "pending"
+DELIVERED = "delivered"
+DEAD = "dead"
+SUPERSEDED = "superseded"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    idempotency_key TEXT PRIMARY KEY,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    channels TEXT,
+    slot TEXT,
+    profile TEXT,
+    progress TEXT
+);
+CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (status, next_attempt_at);
+"""
+
+SLOT_INDEX = "CREATE INDEX IF NOT EXISTS deliveries_slot ON deliveries (slot, status)"
+
+# Columns added after the first release, created on outboxes that predate them
+ADDED_COLUMNS = {
+    # JSON list of the channels the digest went to (a topic profile's), so retries fan out to the same ones
+    "channels": "TEXT",
+    # Channel (and chat), run date and profile; a newer payload for the slot supersedes pending older ones
+    "slot": "TEXT",
+    "profile": "TEXT",
+    # JSON state a channel saves as it goes (Telegram: chunks sent per chat), so a retry resumes
+    "progress": "TEXT",
+}
+
+
+def make_idempotency_key(channel: str, payload: dict, run_date: str | None = None) -> str:
+    """Stable key for one delivery of one payload to one channel on one day."""
+    run_date = run_date or date.today().isoformat()
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{channel}:{run_date}:{digest[:16]}"
+
+
+def delivery_slot(channel: str, payload: dict, run_date: str | None = None, profile: str | None = None) -> str:
+    """What a delivery replaces: the channel (per Telegram chat) on one day for one topic profile."""
+    run_date = run_date or date.today().isoformat()
+    chat_ids = payload.get("chat_ids")
+    target = f"{channel}:{','.join(str(chat_id) for chat_id in chat_ids)}" if chat_ids else channel
+    return f"{target}:{run_date}:{profile or ''}"
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt after `attempts` failures."""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+class Outbox:
+    """SQLite-backed store of pending and completed channel deliveries."""
+
+    def __init__(self, db_path: str = OUTBOX_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(deliveries)")}
+            for column, declaration in ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE deliveries ADD COLUMN {column} {declaration}")
+            conn.execute(SLOT_INDEX)
+
+    @contextmanager
+    def _connect(self):
+        # A connection per operation keeps the outbox safe to use from worker threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_entry(row) -> dict | None:
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["payload"] = json.loads(entry["payload"])
+        entry["result"] = json.loads(entry["result"]) if entry["result"] else None
+        entry["channels"] = json.loads(entry["channels"]) if entry["channels"] else None
+        entry["progress"] = json.loads(entry["progress"]) if entry["progress"] else None
+        return entry
+
+    def enqueue(self, channel: str, payload: dict, run_date: str | None = None,
+                channels: list[str] | None = None, profile: str | None = None) -> str:
+        """
+        Record a delivery as pending unless the same delivery is already known.
+
+        A new delivery supersedes the pending ones in its slot (see delivery_slot).
+        `channels` (the digest's channel subset) and `profile` are kept with the
+        entry, so a retried WordPress post is followed by the same social channels.
+
+        Returns:
+            str: The idempotency key of the delivery.
+        """
+        key = make_idempotency_key(channel, payload, run_date)
+        slot = delivery_slot(channel, payload, run_date, profile)
+        now = time.time()
+        with self._connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO deliveries "
+                "(idempotency_key, channel, payload, status, next_attempt_at, created_at, updated_at, channels, "
+                "slot, profile) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, channel, json.dumps(payload, ensure_ascii=False), PENDING, now, now, now,
+                 None if channels is None else json.dumps(channels), slot, profile),
+            ).rowcount
+            superseded = 0
+            if inserted:
+                superseded = conn.execute(
+                    "UPDATE deliveries SET status = ?, updated_at = ? "
+                    "WHERE slot = ? AND status = ? AND idempotency_key != ?",
+                    (SUPERSEDED, now, slot, PENDING, key),
+                ).rowcount
+        if superseded:
+            logger.info(f"🗑️ {superseded} older pending delivery(ies) in {slot} superseded by {key}.")
+        return key
+
+    def get(self, key: str) -> dict | None:
+        """Return the outbox entry for an idempotency key, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM deliveries WHERE idempotency_key = ?", (key,)).fetchone()
+        return self._to_entry(row)
+
+    def claim(self, key: str, lease_seconds: float) -> bool:
+        """
+        Take a due, pending delivery for one attempt.
+
+        The next attempt time is pushed out by `lease_seconds`, so no other
+        process picks the same delivery while this attempt is in flight.
+
+        Returns:
+            bool: True if the delivery was claimed, False if it is delivered, dead or not yet due.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE deliveries SET next_attempt_at = ?, updated_at = ? "
+                "WHERE idempotency_key = ? AND status = ? AND next_attempt_at <= ?",
+                (now + lease_seconds, now, key, PENDING, now),
+            )
+        return cursor.rowcount == 1
+
+    def mark_delivered(self, key: str, result=None):
+        """Mark a delivery as done, keeping a JSON-serializable copy of its result."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE deliveries SET status = ?, attempts = attempts + 1, result = ?, last_error = NULL, "
+                "updated_at = ? WHERE idempotency_key = ?",
+                (DELIVERED, json.dumps(result, ensure_ascii=False, default=str), time.time(), key),
+            )
+
+    def save_progress(self, key: str, progress):
+        """Keep a delivery's partial progress (JSON-serializable) for the next attempt."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE deliveries SET progress = ?, updated_at = ? WHERE idempotency_key = ?",
+                (json.dumps(progress, ensure_ascii=False), time.time(), key),
+            )
+
+    def mark_failed(self, key: str, error: str | None):
+        """
+        Record a failed attempt and schedule the next one, or give up after MAX_ATTEMPTS.
+
+        A delivery that is no longer pending (a timed-out send that completed
+        late, or a superseded one) is left as it is.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT attempts, status FROM deliveries WHERE idempotency_key = ?", (key,)).fetchone()
+            if row is None or row["status"] != PENDING:
+                return
+            attempts = row["attempts"] + 1
+            status = DEAD if attempts >= MAX_ATTEMPTS else PENDING
+            conn.execute(
+                "UPDATE deliveries SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ? "
+                "WHERE idempotency_key = ?",
+                (status, attempts, now + retry_delay(attempts), error, now, key),
+            )
+        if status == DEAD:
+            logger.error(f"💀 Giving up on delivery {key} after {attempts} attempts: {error}")
+        else:
+            logger.info(f"🔁 Delivery {key} will be retried in {retry_delay(attempts):.0f}s.")
+
+    def due(self, now: float | None = None) -> list[dict]:
+        """Pending deliveries whose next attempt is due, oldest first."""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM deliveries WHERE status = ? AND next_attempt_at <= ? ORDER BY created_at",
+                (PENDING, now),
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def pending_count(self) -> int:
+        """Number of deliveries still waiting to be sent."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM deliveries WHERE status = ?", (PENDING,)).fetchone()[0]
+
+    def next_attempt_at(self) -> float | None:
+        """Time of the earliest scheduled retry, or None if nothing is pending."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM deliveries WHERE status = ?", (PENDING,)).fetchone()
+        return row[0]
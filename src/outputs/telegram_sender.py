@@ -1,37 +1,259 @@
 # outputs/telegram_sender.py
+import asyncio
 import os
+import time
 
 from dotenv import load_dotenv
 from telegram import Bot
+from telegram.error import RetryAfter
 
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Comma-separated list of target chats; falls back to TELEGRAM_CHAT_ID
+TELEGRAM_CHAT_IDS = [
+    chat_id.strip()
+    for chat_id in os.getenv("TELEGRAM_CHAT_IDS", TELEGRAM_CHAT_ID or "").split(",")
+    if chat_id.strip()
+]
+
+# Telegram rejects messages longer than this
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Flood limits: about 30 messages per second across all chats, and no more
+# than 20 messages per minute into one group (one per 3 seconds)
+GLOBAL_MESSAGES_PER_SECOND = 30
+PER_CHAT_INTERVAL = 3.0
+
+# How many times a chunk is resent after a FloodWait (RetryAfter) error
+MAX_FLOOD_RETRIES = 3
+
+
+def split_points(line: str) -> list[bool]:
+    """
+    For each offset of a MarkdownV2 line, whether the line can be cut there: not right
+    after an escaping backslash and not inside a bold, italic, underline, strikethrough,
+    spoiler, code or link entity.
+    """
+    safe = [False] * (len(line) + 1)
+    toggled = set()  # open emphasis markers
+    code = pre = False
+    link = None  # None, "text" (inside [...]) or "url" (inside (...))
+    i = 0
+    while i < len(line):
+        safe[i] = not (toggled or code or pre or link)
+        if line[i] == "\\":
+            i += 2
+            continue
+        if line.startswith("```", i):
+            pre = not pre
+            i += 3
+        elif pre:
+            i += 1
+        elif line[i] == "`":
+            code = not code
+            i += 1
+        elif code:
+            i += 1
+        elif link == "url":
+            link = None if line[i] == ")" else link
+            i += 1
+        elif line[i] == "[":
+            link = "text"
+            i += 1
+        elif line[i] == "]" and link == "text":
+            link = "url" if line.startswith("(", i + 1) else None
+            i += 2 if link else 1
+        else:
+            marker = line[i:i + 2] if line[i:i + 2] in ("__", "||") else line[i]
+            if marker in ("*", "_", "~", "__", "||"):
+                toggled ^= {marker}
+            i += len(marker)
+    safe[len(line)] = not (toggled or code or pre or link)
+    return safe
+
+
+def hard_split(line: str, limit: int) -> list[str]:
+    """
+    Split an over-long MarkdownV2 line into pieces of at most `limit` characters.
+
+    Each cut is moved back to the last point outside entities (see split_points),
+    preferring a space in the second half of the piece. Only an entity longer
+    than the limit is cut through, and never right after an escaping backslash.
+    """
+    pieces = []
+    while len(line) > limit:
+        safe = split_points(line)
+        cuts = [cut for cut in range(1, limit + 1) if safe[cut]]
+        spaced = [cut for cut in cuts if cut >= limit // 2 and line[cut - 1] == " "]
+        if spaced or cuts:
+            cut = (spaced or cuts)[-1]
+        else:
+            cut = limit
+            # An odd run of backslashes before the cut would escape the next piece's first character
+            while cut > 1 and (len(line[:cut]) - len(line[:cut].rstrip("\\"))) % 2:
+                cut -= 1
+        pieces.append(line[:cut])
+        line = line[cut:]
+    pieces.append(line)
+    return pieces
+
+
+def split_message(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """
+    Split a digest into chunks of at most `limit` characters.
+
+    Splits on blank lines, so each news item stays whole within a chunk.
+    An item longer than the limit is split on line breaks, and a single
+    over-long line is hard-split (hard_split) as a last resort, outside
+    MarkdownV2 entities and escapes.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    pieces = []
+    for block in text.split("\n\n"):
+        if len(block) <= limit:
+            pieces.append(block)
+            continue
+        for line in block.split("\n"):
+            pieces.extend(hard_split(line, limit))
+
+    chunks, current = [], ""
+    for piece in pieces:
+        separator = "\n\n" if current else ""
+        if len(current) + len(separator) + len(piece) <= limit:
+            current += separator + piece
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """Seconds Telegram asked us to wait (int or timedelta depending on the library version)."""
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+
+
+class RateLimiter:
+    """Async limiter that spaces calls at least `interval` seconds apart."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+
+    async def wait(self):
+        # No await between reading and reserving the slot, so no lock is needed
+        now = time.monotonic()
+        delay = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Push the next slot back, e.g. after a FloodWait."""
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
 
 
 class TelegramBot:
     """Telegram bot for sending messages asynchronously."""
 
-    def __init__(self, token: str, chat_id: str):
+    def __init__(self, token: str, chat_ids: list[str] | str):
         self.bot = Bot(token=token)
-        self.chat_id = chat_id
+        self.chat_ids = [chat_ids] if isinstance(chat_ids, str) else list(chat_ids)
+        self.global_limiter = RateLimiter(1 / GLOBAL_MESSAGES_PER_SECOND)
+
+    async def send_chunk(self, chat_id: str, chunk: str, chat_limiter: RateLimiter, parse_mode: str = "Markdown"):
+        """Send one chunk, waiting for both rate limits and honouring FloodWait."""
+        for attempt in range(MAX_FLOOD_RETRIES + 1):
+            await chat_limiter.wait()
+            await self.global_limiter.wait()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=chunk, parse_mode=parse_mode)
+                return
+            except RetryAfter as e:
+                if attempt == MAX_FLOOD_RETRIES:
+                    raise
+                wait_for = retry_after_seconds(e)
+                print(f"Telegram flood limit hit for chat {chat_id}, retrying in {wait_for:.0f}s...")
+                # The flood wait applies to the whole bot, not just this chat
+                chat_limiter.pause(wait_for)
+                self.global_limiter.pause(wait_for)
 
-    async def send_message(self, message: str):
-        """Sends a message to the configured chat ID asynchronously."""
+    async def send_to_chat(self, chat_id: str, chunks: list[str], parse_mode: str = "Markdown", start: int = 0,
+                           on_chunk_sent=None) -> bool:
+        """
+        Send the chunks from `start` on to one chat, in order. Returns True on success.
+
+        `on_chunk_sent(chat_id, sent)` is called after each chunk with the number of chunks sent so far.
+        """
+        chat_limiter = RateLimiter(PER_CHAT_INTERVAL)
+        if start:
+            print(f"Resuming Telegram chat {chat_id} at part {start + 1} of {len(chunks)}.")
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id, text=message, parse_mode="Markdown"
-            )
-            print(f"Message sent to Telegram successfully: {message[:50]}...")
+            for index in range(start, len(chunks)):
+                await self.send_chunk(chat_id, chunks[index], chat_limiter, parse_mode)
+                if on_chunk_sent is not None:
+                    on_chunk_sent(chat_id, index + 1)
+            print(f"Message sent to Telegram chat {chat_id} successfully ({len(chunks)} part(s)).")
+            return True
         except Exception as e:
-            print(f"Failed to send message to Telegram: {e}")
+            print(f"Failed to send message to Telegram chat {chat_id}: {e}")
+            return False
+
+    async def send_message(self, message: str, chat_ids: list[str] | None = None, parse_mode: str = "Markdown",
+                           progress: dict | None = None, on_progress=None) -> bool:
+        """
+        Sends a message to every configured chat (or to `chat_ids`) asynchronously.
+
+        Long messages are split into chunks; chats are served in parallel
+        within the flood limits. Returns True if every chat received the
+        whole message.
+
+        `progress` ({chat id: chunks sent}, from an earlier attempt) skips the
+        chunks a chat already has; `on_progress(progress)` is called after every
+        chunk sent, so a failed send can be resumed.
+        """
+        chat_ids = self.chat_ids if chat_ids is None else chat_ids
+        if not chat_ids:
+            print("Failed to send message to Telegram: no chat IDs configured.")
+            return False
+
+        chunks = split_message(message)
+        progress = dict(progress or {})
+
+        def chunk_sent(chat_id, sent):
+            progress[str(chat_id)] = sent
+            if on_progress is not None:
+                on_progress(dict(progress))
+
+        results = await asyncio.gather(*(
+            self.send_to_chat(chat_id, chunks, parse_mode, progress.get(str(chat_id), 0), chunk_sent)
+            for chat_id in chat_ids
+        ))
+        return all(results)
+
+
+# Global instance for ease of use, created on first send so importing this module needs no token
+telegram_bot = None
 
 
-# Global instance for ease of use
-telegram_bot = TelegramBot(token=TELEGRAM_BOT_TOKEN, chat_id=TELEGRAM_CHAT_ID)
+def get_telegram_bot() -> TelegramBot:
+    """Return the shared bot, creating it from the environment on first use."""
+    global telegram_bot
+    if telegram_bot is None:
+        if not TELEGRAM_BOT_TOKEN:
+            raise ValueError("TELEGRAM_BOT_TOKEN is not set.")
+        telegram_bot = TelegramBot(token=TELEGRAM_BOT_TOKEN, chat_ids=TELEGRAM_CHAT_IDS)
+    return telegram_bot
 
 
-async def send_to_telegram(text: str):
-    """Wrapper function for sending messages via the Telegram bot."""
-    await telegram_bot.send_message(text)
+async def send_to_telegram(text: str, chat_ids: list[str] | None = None, parse_mode: str = "Markdown",
+                           progress: dict | None = None, on_progress=None) -> bool:
+    """Wrapper function for sending messages via the Telegram bot; see TelegramBot.send_message for `progress`."""
+    return await get_telegram_bot().send_message(
+        text, chat_ids=chat_ids, parse_mode=parse_mode, progress=progress, on_progress=on_progress)
@@ -1,9 +1,12 @@
+import asyncio
 import os
 import logging
-import requests
 import time
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+
+from processors.social_copy import generate_social_copy
+from utils.http_session import get_session
+from utils.tracing import span
 
 # Load environment variables
 load_dotenv()
@@ -16,15 +19,16 @@ logging.basicConfig(level=logging.INFO)
 THREADS_USER_ID = os.getenv("THREADS_USER_ID")  # Replace with your Threads user ID
 THREADS_ACCESS_TOKEN = os.getenv("THREADS_ACCESS_TOKEN")  # Access token for Threads Graph API
 
-# Token validation state (cached to avoid repeated API calls)
+# Container status polling: exponential backoff from the initial delay up to the
+# max delay, giving up once the total wait reaches the timeout
+CONTAINER_POLL_INITIAL_DELAY = 1
+CONTAINER_POLL_MAX_DELAY = 10
+CONTAINER_POLL_TIMEOUT = 90
+
+# Token validation state for this process (the token manager also caches the expiry on disk)
 _token_validated = False
 _current_valid_token = None
 
-# Azure OpenAI API Credentials
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-
 
 def get_valid_token():
     """
@@ -59,47 +63,37 @@ def get_valid_token():
         return THREADS_ACCESS_TOKEN
 
 
-def create_openai_client():
-    """Initialize and return the Azure OpenAI client."""
+def is_auth_error(response):
+    """True if a Graph API response reports an invalid or expired access token (HTTP 401 or OAuth error 190)."""
+    if response.status_code == 401:
+        return True
     try:
-        return AzureOpenAI(
-            api_key=AZURE_OPENAI_API_KEY,
-            api_version=AZURE_OPENAI_API_VERSION,
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        )
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize Azure OpenAI client: {e}")
-        raise
+        return response.json().get("error", {}).get("code") == 190
+    except ValueError:
+        return False
 
-def generate_thread_content(blog_post_url):
-    """Generate a Threads post content using Azure OpenAI."""
-    client = create_openai_client()
-
-    # System and user prompts
-    system_prompt = (
-        "You are an expert at crafting concise and engaging posts for social media. Generate a post "
-        "to announce the release of a daily AI news digest, including a provided blog link. "
-        "Ensure the content is compelling, under 500 characters, and ends with #DailyAINews."
-    )
-    user_prompt = f"Blog post link: {blog_post_url}"
 
+def handle_auth_error(response):
+    """Drop every cached validation when the API rejects the token, so the next attempt validates remotely."""
+    global _token_validated, _current_valid_token
+
+    if not is_auth_error(response):
+        return
+
+    logger.warning("⚠️ Threads API rejected the access token; clearing cached validation.")
+    _token_validated = False
+    _current_valid_token = None
     try:
-        logger.info("🧠 Generating Threads post content using Azure OpenAI...")
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            model="gpt-4o",  # Replace with the correct model
-            temperature=1,
-            max_completion_tokens=500,
-        )
-        thread_content = response.choices[0].message.content.strip()
-        logger.info(f"Azure OpenAI response: {thread_content}")
-        return thread_content
-    except Exception as e:
-        logger.error(f"❌ Failed to generate Threads post content: {e}")
-        raise
+        from utils.threads_token_manager import invalidate_token_cache
+
+        invalidate_token_cache()
+    except ImportError:
+        pass
+
+
+def generate_thread_content(blog_post_url):
+    """Get the Threads variant of the shared social copy (one LLM call for all channels)."""
+    return generate_social_copy(blog_post_url)["threads"]
 
 def create_threads_media_container(post_content, blog_post_url):
     """
@@ -135,13 +129,14 @@ def create_threads_media_container(post_content, blog_post_url):
 
         # Send the request to create the media container
         logger.info("📤 Creating Threads media container...")
-        response = requests.post(threads_endpoint, params=payload)
+        response = get_session().post(threads_endpoint, params=payload)
 
         if response.status_code == 200:
             creation_id = response.json().get("id")
             logger.info(f"✅ Media container created successfully. Creation ID: {creation_id}")
             return creation_id
         else:
+            handle_auth_error(response)
             logger.error(f"❌ Failed to create media container. Status: {response.status_code}, Response: {response.text}")
             raise Exception(f"Failed to create media container. {response.text}")
 
@@ -181,12 +176,13 @@ def publish_threads_media_container(creation_id):
 
         # Send the request to publish the media container
         logger.info("📤 Publishing Threads media container...")
-        response = requests.post(threads_publish_endpoint, params=payload)
+        response = get_session().post(threads_publish_endpoint, params=payload)
 
         if response.status_code == 200:
             logger.info(f"✅ Post successfully published to Threads. Response: {response.json()}")
             return response.json()
         else:
+            handle_auth_error(response)
             logger.error(f"❌ Failed to publish Threads media container. Status: {response.status_code}, Response: {response.text}")
             raise Exception(f"Failed to publish Threads media container. {response.text}")
 
@@ -194,6 +190,85 @@ def publish_threads_media_container(creation_id):
         logger.error(f"❌ Error while publishing Threads media container: {e}")
         raise
 
+def get_threads_container_status(creation_id):
+    """
+    Get the processing status of a Threads media container.
+
+    Args:
+        creation_id (str): The ID of the media container.
+
+    Returns:
+        tuple: (status, error_message). Status is one of IN_PROGRESS, FINISHED,
+        PUBLISHED, ERROR or EXPIRED.
+    """
+    access_token = get_valid_token()
+    if not access_token:
+        raise ValueError("Threads access token is invalid or expired.")
+
+    response = get_session().get(
+        f"https://graph.threads.net/v1.0/{creation_id}",
+        params={"access_token": access_token, "fields": "status,error_message"},
+        timeout=10,
+    )
+    if response.status_code != 200:
+        handle_auth_error(response)
+        raise Exception(f"Failed to get media container status. {response.text}")
+
+    data = response.json()
+    return data.get("status"), data.get("error_message")
+
+
+def container_poll_delays():
+    """Yield the waits between status checks: exponential backoff capped at the max delay, up to the timeout."""
+    delay, waited = CONTAINER_POLL_INITIAL_DELAY, 0
+    while waited < CONTAINER_POLL_TIMEOUT:
+        delay = min(delay, CONTAINER_POLL_TIMEOUT - waited)
+        yield delay
+        waited += delay
+        delay = min(delay * 2, CONTAINER_POLL_MAX_DELAY)
+
+
+def check_container_ready(creation_id):
+    """
+    Check a media container once.
+
+    Returns:
+        bool: True if the container can be published, False if it is still processing.
+    """
+    status, error_message = get_threads_container_status(creation_id)
+    if status in ("FINISHED", "PUBLISHED"):
+        return True
+    if status in ("ERROR", "EXPIRED"):
+        raise Exception(f"Media container {creation_id} is {status}: {error_message}")
+    return False
+
+
+def wait_for_container_ready(creation_id):
+    """Block until the media container is ready, polling its status with exponential backoff."""
+    start = time.monotonic()
+    with span("threads_container_wait", "channel", creation_id=creation_id) as s:
+        for polls, delay in enumerate(container_poll_delays(), start=1):
+            time.sleep(delay)
+            if check_container_ready(creation_id):
+                s.set(polls=polls)
+                logger.info(f"✅ Media container ready after {time.monotonic() - start:.1f}s.")
+                return
+    raise TimeoutError(f"Media container {creation_id} not ready after {CONTAINER_POLL_TIMEOUT}s")
+
+
+async def wait_for_container_ready_async(creation_id):
+    """Async version of wait_for_container_ready that doesn't block the event loop."""
+    start = time.monotonic()
+    with span("threads_container_wait", "channel", creation_id=creation_id) as s:
+        for polls, delay in enumerate(container_poll_delays(), start=1):
+            await asyncio.sleep(delay)
+            if await asyncio.to_thread(check_container_ready, creation_id):
+                s.set(polls=polls)
+                logger.info(f"✅ Media container ready after {time.monotonic() - start:.1f}s.")
+                return
+    raise TimeoutError(f"Media container {creation_id} not ready after {CONTAINER_POLL_TIMEOUT}s")
+
+
 def publish_thread_for_blog_post(blog_post_url, tweet_content):
     """
     Main function to send a Threads post for the blog post.
@@ -209,9 +284,9 @@ def publish_thread_for_blog_post(blog_post_url, tweet_content):
         # Step 1: Create the media container
         creation_id = create_threads_media_container(tweet_content, blog_post_url)
 
-        # Wait for a short period to ensure media container is ready
+        # Poll until the media container has been processed
         logger.info("⏳ Waiting for media container to be processed...")
-        time.sleep(30)  # Wait for 30 seconds as recommended
+        wait_for_container_ready(creation_id)
 
         # Step 2: Publish the media container
         publish_threads_media_container(creation_id)
@@ -219,3 +294,26 @@ def publish_thread_for_blog_post(blog_post_url, tweet_content):
     except Exception as e:
         logger.error(f"❌ Failed to publish Threads post for blog post: {e}")
         return False
+
+
+async def publish_thread_for_blog_post_async(blog_post_url, tweet_content):
+    """
+    Async version of publish_thread_for_blog_post for use inside the pipeline's event loop.
+
+    The HTTP calls run in worker threads and the wait between status checks
+    uses asyncio.sleep, so other channels keep running meanwhile.
+
+    Returns:
+        bool: True if Threads post was published successfully, False otherwise.
+    """
+    try:
+        creation_id = await asyncio.to_thread(create_threads_media_container, tweet_content, blog_post_url)
+
+        logger.info("⏳ Waiting for media container to be processed...")
+        await wait_for_container_ready_async(creation_id)
+
+        await asyncio.to_thread(publish_threads_media_container, creation_id)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to publish Threads post for blog post: {e}")
+        return False
@@ -1,8 +1,9 @@
 import os
 import logging
-import requests
 from dotenv import load_dotenv
 
+from utils.http_session import get_session
+
 # 🛠️ Load environment variables from .env file
 load_dotenv()
 
@@ -11,7 +12,7 @@ logger = logging.getLogger(__name__)
 
 
 def send_to_wechat(message):
-    """Send a message to a WeChat group via the /send_message API endpoint"""
+    """Send a message to a WeChat group via the /send_message API endpoint. Returns True on success."""
     try:
         wechat_api_url = os.getenv("WECHAT_BOT_URL", "http://localhost:5000/send_message")  # Get API URL from .env
         wechat_api_key = os.getenv("WECHAT_API_KEY", "default_secure_key")  # Get API key from .env
@@ -19,7 +20,7 @@ def send_to_wechat(message):
 
         if not wechat_api_url or not wechat_api_key or not group_name:
             logger.error("❌ Missing required environment variables: WECHAT_API_URL, WECHAT_API_KEY, or WECHAT_GROUP_NAME.")
-            return
+            return False
 
         logger.info(f"🌐 Sending message to WeChat group '{group_name}' via API...")
 
@@ -32,10 +33,13 @@ def send_to_wechat(message):
             "message": message
         }
 
-        response = requests.post(wechat_api_url, headers=headers, json=data)
+        response = get_session().post(wechat_api_url, headers=headers, json=data)
         if response.status_code == 200:
             logger.info(f"✅ Successfully sent message to WeChat group '{group_name}'")
+            return True
         else:
             logger.error(f"❌ Failed to send message to WeChat. Status code: {response.status_code}, Response: {response.text}")
+            return False
     except Exception as e:
         logger.error(f"❌ Error occurred while sending message to WeChat: {str(e)}")
+        return False
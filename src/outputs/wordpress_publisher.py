@@ -1,9 +1,14 @@
+import hashlib
+import json
 import logging
-import requests
+from datetime import date
 from requests.auth import HTTPBasicAuth
 import os
 from dotenv import load_dotenv
 
+from config import CACHE_DIR
+from utils.http_session import get_session
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -12,13 +17,58 @@ WORDPRESS_SITE = os.getenv("WORDPRESS_SITE")
 WORDPRESS_USERNAME = os.getenv("WORDPRESS_USERNAME")
 WORDPRESS_APP_PASSWORD = os.getenv("WORDPRESS_APP_PASSWORD")
 
-# Validate the required environment variables
-if not all([WORDPRESS_SITE, WORDPRESS_USERNAME, WORDPRESS_APP_PASSWORD]):
-    raise ValueError("One or more required environment variables are missing. Ensure WORDPRESS_SITE, WORDPRESS_USERNAME, and WORDPRESS_APP_PASSWORD are set.")
-
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Local map of (date, title) -> published post ID, link and content hash
+POST_MAP_FILE = os.path.join(CACHE_DIR, "wordpress_posts.json")
+POST_MAP_MAX_ENTRIES = 90
+
+# Update responses meaning the mapped post no longer exists (deleted or trashed for good)
+POST_GONE_STATUSES = (404, 410)
+
+
+class PostGone(Exception):
+    """The post to update no longer exists on the site."""
+
+
+def require_credentials():
+    """Validate the required environment variables; checked on use so importing this module needs no credentials."""
+    if not all([WORDPRESS_SITE, WORDPRESS_USERNAME, WORDPRESS_APP_PASSWORD]):
+        raise ValueError("One or more required environment variables are missing. Ensure WORDPRESS_SITE, WORDPRESS_USERNAME, and WORDPRESS_APP_PASSWORD are set.")
+
+
+def content_hash(title, content, categories=None):
+    """Hash of everything that ends up in the post, used to detect unchanged reruns."""
+    payload = json.dumps({"title": title, "content": content, "categories": categories}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def post_date_key(title, post_date=None):
+    """Key identifying the one post per title and day."""
+    return f"{(post_date or date.today()).isoformat()}:{title}"
+
+
+def load_post_map():
+    """Load the date key -> post record map."""
+    try:
+        with open(POST_MAP_FILE, "r", encoding="utf-8") as f:
+            post_map = json.load(f)
+        return post_map if isinstance(post_map, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_post_map(post_map):
+    """Persist the post map, keeping only the most recent entries."""
+    recent = dict(sorted(post_map.items())[-POST_MAP_MAX_ENTRIES:])
+    try:
+        os.makedirs(os.path.dirname(POST_MAP_FILE), exist_ok=True)
+        with open(POST_MAP_FILE, "w", encoding="utf-8") as f:
+            json.dump(recent, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not save WordPress post map: {e}")
+
 
 def create_blog_post(title, content, categories=None, tags=None, status="publish"):
     """
@@ -51,7 +101,7 @@ def create_blog_post(title, content, categories=None, tags=None, status="publish
             post_data["tags"] = tags
 
         # Send the request to create the post
-        response = requests.post(
+        response = get_session().post(
             post_url,
             json=post_data,
             auth=HTTPBasicAuth(WORDPRESS_USERNAME, WORDPRESS_APP_PASSWORD)
@@ -65,7 +115,7 @@ def create_blog_post(title, content, categories=None, tags=None, status="publish
 
         try:
             post_data = response.json()
-            logger.info("🎉 Blog post created successfully:", post_data)
+            logger.info(f"🎉 Blog post created successfully: {post_data.get('link')}")
             return post_data
         except ValueError as e:
             logger.exception(f"Failed to parse JSON response for blog post: {e}")
@@ -76,25 +126,108 @@ def create_blog_post(title, content, categories=None, tags=None, status="publish
         return None
 
 
+def update_blog_post(post_id, title, content, categories=None, status="publish"):
+    """
+    Update an existing blog post on WordPress in place.
+
+    Args:
+        post_id (int): The ID of the post to update.
+        title (str): The title of the blog post.
+        content (str): The HTML content of the blog post.
+        categories (list, optional): List of category IDs to assign to the post.
+        status (str, optional): The status of the post. Default is 'publish'.
+
+    Returns:
+        dict: The response data from the WordPress API, or None if the update failed.
+
+    Raises:
+        PostGone: If the post no longer exists (HTTP 404 or 410).
+    """
+    try:
+        post_url = f"{WORDPRESS_SITE}/wp-json/wp/v2/posts/{post_id}"
+
+        post_data = {"title": title, "content": content, "status": status}
+        if categories:
+            post_data["categories"] = categories
+
+        response = get_session().post(
+            post_url,
+            json=post_data,
+            auth=HTTPBasicAuth(WORDPRESS_USERNAME, WORDPRESS_APP_PASSWORD)
+        )
+
+        logger.debug(f"Update post response status code: {response.status_code}")
+        if response.status_code in POST_GONE_STATUSES:
+            raise PostGone(f"post {post_id} returned HTTP {response.status_code}")
+        if response.status_code != 200:
+            logger.error(f"Failed to update blog post {post_id}. Response content: {response.text}")
+            return None
+
+        return response.json()
+    except PostGone:
+        raise
+    except Exception as e:
+        logger.exception(f"❌ Error in update_blog_post: {e}")
+        return None
+
+
 def publish_daily_news_to_wordpress(news_content, post_title="Daily Tech & AI News Digest", category_id=None):
     """
     Publishes the daily news content to WordPress.
 
+    Publishing is idempotent per title and day: if today's post already
+    exists (according to the local post map) with the same content, nothing
+    is sent; if the content changed, the post is updated in place. A new
+    post is only created when the mapped one is gone; a failed update
+    returns None, so the outbox retries the update rather than posting twice.
+
     Args:
         news_content (str): The formatted news content to be published as the blog post body.
         post_title (str, optional): The title of the blog post. Defaults to 'Daily Tech & AI News Digest'.
 
     Returns:
-        dict: The response data from the WordPress API.
+        dict: The response data from the WordPress API. For an unchanged post,
+        the cached {'id', 'link'} with 'unchanged': True.
+
+    Raises:
+        ValueError: If the WordPress credentials are not configured.
     """
+    require_credentials()
     try:
-        logger.info(f"📡 Publishing '{post_title}' to WordPress...")
-
-        # Create the blog post with the specified title and content
-        response_data = create_blog_post(title=post_title, content=news_content, categories=[category_id] if category_id else None)
+        categories = [category_id] if category_id else None
+        key = post_date_key(post_title)
+        digest_hash = content_hash(post_title, news_content, categories)
+
+        post_map = load_post_map()
+        existing = post_map.get(key)
+
+        if existing and existing.get("content_hash") == digest_hash:
+            logger.info(f"♻️ '{post_title}' is already published with the same content: {existing.get('link')}")
+            return {"id": existing.get("post_id"), "link": existing.get("link"), "unchanged": True}
+
+        if existing:
+            logger.info(f"📝 Updating today's '{post_title}' (post {existing.get('post_id')}) in place...")
+            try:
+                response_data = update_blog_post(existing.get("post_id"), title=post_title, content=news_content, categories=categories)
+            except PostGone as e:
+                logger.warning(f"⚠️ Today's '{post_title}' is gone ({e}); publishing it again.")
+                del post_map[key]
+                save_post_map(post_map)
+                existing = None
+            if existing and not response_data:
+                logger.error(f"❌ Failed to update today's '{post_title}'; leaving it for a retry.")
+                return None
+
+        if not existing:
+            logger.info(f"📡 Publishing '{post_title}' to WordPress...")
+
+            # Create the blog post with the specified title and content
+            response_data = create_blog_post(title=post_title, content=news_content, categories=categories)
 
         if response_data:
             post_url = response_data.get("link")
+            post_map[key] = {"post_id": response_data.get("id"), "link": post_url, "content_hash": digest_hash}
+            save_post_map(post_map)
             logger.info(f"🎉 Successfully published blog post! View it at {post_url}")
         else:
             logger.error("❌ Failed to publish the blog post to WordPress.")
@@ -0,0 +1,232 @@
+"""
+Historical Backfill
+
+Regenerates the digests of past days, e.g. to compare them after adding a
+source or profile or changing the scoring. Each day's candidate pool is
+built from what is still around for it:
+
+- the archive (outputs.archive): the pool the pipeline collected that day
+- the day's 'fetched' checkpoint, if it hasn't been pruned yet
+- with --fetch, the feeds' own history: the sources are fetched once for
+  the whole range and entries are assigned to the day they were published
+  (most feeds only carry the last few days), up to each source's
+  `max_entries` per day
+
+Every (day, topic profile) pair is then scored and sent to the LLM for
+re-ranking. Pairs run concurrently, but at most LLM_MAX_CONCURRENCY
+requests are in flight and at most LLM_REQUESTS_PER_MINUTE start per
+minute. Digests are written to daily_summary/backfill/ only: a backfill
+delivers to no channel and writes no checkpoint, archive entry or feed
+health record.
+
+Usage (run from src/):
+    python -m processors.backfill --from 2026-10-01 --to 2026-10-07
+    python -m processors.backfill --from 2026-10-01 --to 2026-10-07 --profile ai --fetch
+    python -m processors.backfill --from 2026-10-01 --to 2026-10-07 --no-llm   # local fallback digests only
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from config import LLM_DEADLINE_SECONDS, LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, SITES_CONFIG
+from outputs.archive import extraction_rank
+from processors.formatter import render_digest
+from processors.topic_profiles import all_sources, profile_articles, select_profiles
+from utils.checkpoints import load_checkpoint
+
+logger = logging.getLogger(__name__)
+
+# Backfilled digests, kept apart from the daily summaries
+BACKFILL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "daily_summary", "backfill")
+
+
+class RateGate:
+    """
+    Admits LLM requests from many threads: at most `concurrency` at a time,
+    with starts spaced so no more than `per_minute` begin in any minute.
+    """
+
+    def __init__(self, concurrency: int = LLM_MAX_CONCURRENCY, per_minute: Optional[float] = LLM_REQUESTS_PER_MINUTE):
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._interval = 60.0 / per_minute if per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            start = max(time.monotonic(), self._next_start)
+            self._next_start = start + self._interval
+        time.sleep(max(0.0, start - time.monotonic()))
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+
+
+def date_range(start: date, end: date) -> list[str]:
+    """ISO dates from `start` to `end`, both included."""
+    return [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+
+
+def feed_history(feed_urls: list[str], days: list[str]) -> dict[str, list[dict]]:
+    """
+    Articles the feeds still carry for `days`, fetched once and grouped by publication date.
+
+    Each source's entry cap applies per day, and nothing is written: no feed health observations
+    and no quarantine probes.
+    """
+    from fetchers.rss_fetcher import collect_articles
+
+    since = datetime.fromisoformat(days[0])
+    until = datetime.fromisoformat(days[-1]) + timedelta(days=1)
+    by_day = {day: [] for day in days}
+    for article in collect_articles(feed_urls, since=since, until=until, backfill=True):
+        day = article["published"][:10]
+        if day in by_day:
+            by_day[day].append(article)
+    return by_day
+
+
+def day_pools(days: list[str], history: Optional[dict[str, list[dict]]] = None) -> dict[str, list[dict]]:
+    """
+    Candidate pool of each day: archived articles, the 'fetched' checkpoint and feed history.
+
+    An article found in several places is taken from the fullest copy (extracted text over a
+    feed summary, then the longest), the first of those in the order above on a tie.
+    """
+    archive = None
+    try:
+        from outputs.archive import Archive
+
+        archive = Archive()
+    except Exception as e:
+        logger.warning(f"⚠️ Archive unavailable, using checkpoints and feeds only: {e}")
+
+    pools = {}
+    for day in days:
+        candidates = []
+        if archive is not None:
+            candidates += archive.articles_for_date(day)
+        candidates += load_checkpoint("fetched", run_date=day) or []
+        candidates += (history or {}).get(day, [])
+        by_url = {}
+        for article in candidates:
+            known = by_url.get(article["url"])
+            if known is None or extraction_rank(article) > extraction_rank(known):
+                by_url[article["url"]] = article
+        pools[day] = list(by_url.values())
+    return pools
+
+
+def backfill_digest(pool: list[dict], profile: dict, gate: RateGate, use_llm: bool = True) -> list[dict]:
+    """Score one day's pool for a profile and re-rank it (inside the gate) or build the local fallback digest."""
+    from fetchers.rss_fetcher import rank_articles
+    from processors.llm_reranker import build_fallback_digest, re_rank_and_summarize_with_llm
+
+    articles = rank_articles(
+        profile_articles(pool, profile, SITES_CONFIG), profile["keywords"], max_to_rank=profile["max_to_rank"])
+    if not articles:
+        return []
+    if not use_llm:
+        return build_fallback_digest(articles)
+    with gate:
+        # No hedging: a duplicate request would count against the rate limit
+        return re_rank_and_summarize_with_llm(articles, deadline=LLM_DEADLINE_SECONDS)
+
+
+def write_digest(out_dir: str, day: str, profile_name: str, items: list[dict], title: str | None = None) -> str:
+    digest = render_digest(items, title)
+    os.makedirs(out_dir, exist_ok=True)
+    file_path = os.path.join(out_dir, f"{day}_{profile_name}_daily_summary.txt")
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(digest["markdown"])
+    with open(os.path.splitext(file_path)[0] + ".json", "w", encoding="utf-8") as file:
+        file.write(digest["json"])
+    return file_path
+
+
+def run_backfill(start: date, end: date, profile_names: Optional[list[str]] = None, fetch: bool = False,
+                 use_llm: bool = True, concurrency: int = LLM_MAX_CONCURRENCY,
+                 per_minute: Optional[float] = LLM_REQUESTS_PER_MINUTE, out_dir: str = BACKFILL_DIR) -> list[dict]:
+    """
+    Regenerate the digests of every day from `start` to `end` for the selected profiles.
+
+    Returns:
+        list[dict]: One row per (day, profile): 'day', 'profile', 'candidates', 'items', 'path' and 'error'.
+    """
+    if end < start:
+        raise ValueError(f"Backfill range ends ({end}) before it starts ({start})")
+    profiles = select_profiles(profile_names)
+    days = date_range(start, end)
+
+    history = None
+    if fetch:
+        logger.info(f"📡 Fetching feed history for {days[0]} to {days[-1]}...")
+        history = feed_history(all_sources(profiles, SITES_CONFIG), days)
+    pools = day_pools(days, history)
+
+    gate = RateGate(concurrency, per_minute)
+    rows = []
+    logger.info(f"⏪ Backfilling {len(days)} day(s) x {len(profiles)} profile(s), up to {concurrency} LLM requests at a time...")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="backfill") as executor:
+        futures = {}
+        for day in days:
+            if not pools[day]:
+                logger.warning(f"❌ No articles found for {day}.")
+                rows += [{"day": day, "profile": name, "candidates": 0, "items": 0, "path": None, "error": None}
+                         for name in profiles]
+                continue
+            for name, profile in profiles.items():
+                futures[executor.submit(backfill_digest, pools[day], profile, gate, use_llm)] = (day, name)
+
+        for future in as_completed(futures):
+            day, name = futures[future]
+            row = {"day": day, "profile": name, "candidates": len(pools[day]), "items": 0, "path": None, "error": None}
+            try:
+                items = future.result()
+                if items:
+                    # Rendered here rather than on the worker threads: the formatter's cache isn't thread-safe
+                    row.update(items=len(items), path=write_digest(out_dir, day, name, items, profiles[name]["heading"]))
+                    logger.info(f"💾 {day} '{name}': {len(items)} items saved to {row['path']}")
+            except Exception as e:
+                row["error"] = str(e)
+                logger.error(f"❌ Backfill of {day} '{name}' failed: {e}")
+            rows.append(row)
+
+    return sorted(rows, key=lambda row: (row["day"], row["profile"]))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Regenerate the digests of past days into local files.")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Last day, YYYY-MM-DD (default: --from)")
+    parser.add_argument("--profile", action="append", dest="profiles", metavar="NAME",
+                        help="Backfill only this topic profile (repeatable; default: every enabled profile)")
+    parser.add_argument("--fetch", action="store_true", help="Also take the days' entries from the live feeds")
+    parser.add_argument("--no-llm", action="store_true", help="Build the local fallback digests instead of calling the LLM")
+    parser.add_argument("--concurrency", type=int, default=LLM_MAX_CONCURRENCY, help="LLM requests in flight")
+    parser.add_argument("--per-minute", type=float, default=LLM_REQUESTS_PER_MINUTE, help="LLM requests started per minute")
+    parser.add_argument("--out", default=BACKFILL_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    results = run_backfill(args.start, args.end or args.start, args.profiles, fetch=args.fetch, use_llm=not args.no_llm,
+                           concurrency=args.concurrency, per_minute=args.per_minute, out_dir=args.out)
+
+    print(f"\n{'day':<12}{'profile':<12}{'pool':>6}{'items':>7}  output")
+    for row in results:
+        print(f"{row['day']:<12}{row['profile']:<12}{row['candidates']:>6}{row['items']:>7}  {row['error'] or row['path'] or '-'}")
+    print(f"\n{len(results)} digest(s) in {time.monotonic() - started:.1f}s")
@@ -0,0 +1,162 @@
+# processors/clustering.py
+"""
+Local topic clustering for candidate articles.
+
+Related stories are grouped here, before the LLM call, using hashed TF-IDF
+vectors, cosine similarity and average-linkage agglomerative clustering.
+The reranker then only has to pick and summarize each pre-formed group.
+"""
+import logging
+import re
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Number of hashed feature buckets. Digests rank tens of articles, so a
+# small space keeps the dense matrix tiny while collisions stay rare.
+DEFAULT_N_FEATURES = 2 ** 13
+
+# Average cosine similarity required to merge two clusters
+DEFAULT_SIMILARITY_THRESHOLD = 0.3
+
+# Titles carry most of the topical signal, so they are counted several times
+TITLE_WEIGHT = 3
+
+# Only the start of each article is vectorized
+CONTENT_CHARS = 1500
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOPWORDS = frozenset(
+    """
+    a about after all also an and any are as at be been but by can could did do does for from had has
+    have he her his how i if in into is it its just more most new not now of on one or our out over said
+    she so some than that the their them then there these they this to up was we were what when which
+    who will with would you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase the text and split it into tokens, dropping stopwords and single characters."""
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def hashing_vectorize(texts: list[str], n_features: int = DEFAULT_N_FEATURES) -> np.ndarray:
+    """
+    Turn texts into term-count vectors using the hashing trick.
+
+    crc32 is used instead of the built-in hash() so bucket assignment is
+    stable across processes and runs.
+    """
+    counts = np.zeros((len(texts), n_features), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            counts[row, zlib.crc32(token.encode("utf-8")) % n_features] += 1
+    return counts
+
+
+def tfidf_transform(counts: np.ndarray) -> np.ndarray:
+    """Apply sublinear TF, smoothed IDF and L2 row normalization to a count matrix."""
+    n_docs = counts.shape[0]
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+
+    tf = np.zeros_like(counts)
+    np.log1p(counts, out=tf, where=counts > 0)
+    weighted = tf * idf.astype(np.float32)
+
+    norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return weighted / norms
+
+
+def cosine_similarity_matrix(vectors: np.ndarray) -> np.ndarray:
+    """Pairwise cosine similarity of L2-normalized row vectors."""
+    return vectors @ vectors.T
+
+
+def agglomerative_clusters(similarity: np.ndarray, threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> list[list[int]]:
+    """
+    Average-linkage agglomerative clustering over a similarity matrix.
+
+    Repeatedly merges the two most similar clusters until no pair has an
+    average similarity of at least `threshold`.
+
+    :return: Clusters as lists of row indices, each list in ascending order.
+    """
+    n = similarity.shape[0]
+    if n == 0:
+        return []
+
+    linkage = similarity.astype(np.float64, copy=True)
+    np.fill_diagonal(linkage, -np.inf)
+    sizes = np.ones(n)
+    members = {i: [i] for i in range(n)}
+
+    while len(members) > 1:
+        flat_index = int(np.argmax(linkage))
+        i, j = divmod(flat_index, n)
+        if linkage[i, j] < threshold:
+            break
+        if j < i:
+            i, j = j, i
+
+        # UPGMA update: similarity to the merged cluster is the size-weighted mean
+        merged = (linkage[i] * sizes[i] + linkage[j] * sizes[j]) / (sizes[i] + sizes[j])
+        linkage[i, :] = merged
+        linkage[:, i] = merged
+        linkage[i, i] = -np.inf
+        linkage[j, :] = -np.inf
+        linkage[:, j] = -np.inf
+
+        sizes[i] += sizes[j]
+        members[i].extend(members.pop(j))
+
+    return [sorted(indices) for indices in members.values()]
+
+
+def article_text(article: dict) -> str:
+    """Text used to vectorize an article: the title repeated, then the head of the content."""
+    title = article.get("title", "")
+    content = article.get("content", "")[:CONTENT_CHARS]
+    return " ".join([title] * TITLE_WEIGHT + [content])
+
+
+def group_articles(
+    articles: list[dict],
+    threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    n_features: int = DEFAULT_N_FEATURES,
+) -> list[list[dict]]:
+    """
+    Group related articles into topic clusters.
+
+    Groups are ordered by their best `total_score`, and articles within a
+    group by `total_score`, so the first article of each group is its lead.
+    Ties keep the input order, making the result fully deterministic.
+
+    :param articles: Articles with 'title', 'content' and optionally 'total_score'.
+    :param threshold: Minimum average cosine similarity for two clusters to merge.
+    :return: List of groups, each a non-empty list of the original article dicts.
+    """
+    if not articles:
+        return []
+
+    vectors = tfidf_transform(hashing_vectorize([article_text(a) for a in articles], n_features))
+    clusters = agglomerative_clusters(cosine_similarity_matrix(vectors), threshold)
+
+    def score(index):
+        return articles[index].get("total_score", 0)
+
+    ordered = [sorted(cluster, key=lambda idx: (-score(idx), idx)) for cluster in clusters]
+    ordered.sort(key=lambda cluster: (-score(cluster[0]), cluster[0]))
+
+    groups = [[articles[idx] for idx in cluster] for cluster in ordered]
+    logger.info(f"🧩 Grouped {len(articles)} articles into {len(groups)} topic clusters.")
+    return groups
@@ -1,36 +1,198 @@
 # processors/formatter.py
+import hashlib
+import html
+import json
+import re
+from collections import OrderedDict
+from datetime import date
 
 
-def format_summary(news_items: list[dict]) -> str:
+def format_summary(news_items: list[dict], title: str | None = None) -> str:
     """
     Format a list of news items into the desired three-line format for each item:
     1. Icon and Title
     2. One-liner summary
     3. Link
 
-    All items preceded by a main heading '**AI News Digest**'.
+    All items preceded by a main heading, the digest `title` (default: Today's Tech & AI News Digest).
     """
     if not news_items:
-        return "**Today's Tech & AI News Digest**\n\nNo new content to summarize."
+        return f"**{title or DEFAULT_TITLE}**\n\nNo new content to summarize."
 
-    formatted_lines = ["**🎉 Today's Tech & AI News Digest 🎉**\n"]
+    formatted_lines = [f"**{digest_heading(title)}**\n"]
 
-    for item in news_items:
-        icon = item.get("icon", "📰")  # Default icon if none provided
-        title = item.get("title", "No Title")
-        summary = item.get("summary", "No summary provided.")
-        url = item.get("url", "#")
+    for item in normalize_items(news_items):
+        icon = item["icon"]
+        item_title = item["title"]
+        summary = item["summary"]
+        url = item["url"]
 
-        formatted_lines.append(f"{icon} {title}")
+        formatted_lines.append(f"{icon} {item_title}")
         formatted_lines.append(summary)
         formatted_lines.append(url)
         formatted_lines.append("")  # Blank line after each entry
 
     # Add footer section
     footer_separator = "-----"  # 5 dash separator
-    footer_text = "The Daily AI News Digest is brought to you by **#JackHui.com.au**! To know more: [JackHui.com.au](https://jackhui.com.au)"
+    footer_text = (
+        f"The {title or FOOTER_DIGEST_NAME} is brought to you by **#JackHui.com.au**! "
+        "To know more: [JackHui.com.au](https://jackhui.com.au)"
+    )
 
     formatted_lines.append(footer_separator)
     formatted_lines.append(footer_text)
 
     return "\n".join(formatted_lines).strip()
+
+
+# Heading and footer name of a digest rendered without a title (a topic profile's "title")
+DEFAULT_TITLE = "Today's Tech & AI News Digest"
+FOOTER_DIGEST_NAME = "Daily AI News Digest"
+EMPTY_DIGEST_TEXT = "No new content to summarize."
+FOOTER_SITE_NAME = "JackHui.com.au"
+FOOTER_URL = "https://jackhui.com.au"
+
+# Characters that must be escaped everywhere in Telegram MarkdownV2 text
+MARKDOWN_V2_SPECIAL_CHARS = re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])")
+
+# Rendered variants of recent digests, keyed by digest hash
+RENDER_CACHE_SIZE = 16
+_render_cache = OrderedDict()
+
+
+def escape_markdown_v2(text: str) -> str:
+    """Escape text for Telegram MarkdownV2."""
+    return MARKDOWN_V2_SPECIAL_CHARS.sub(r"\\\1", text)
+
+
+def escape_markdown_v2_url(url: str) -> str:
+    """Escape a URL for the (...) part of a MarkdownV2 link, where only ')' and '\\' are special."""
+    return url.replace("\\", "\\\\").replace(")", "\\)")
+
+
+def digest_heading(title: str | None = None) -> str:
+    return f"🎉 {title or DEFAULT_TITLE} 🎉"
+
+
+def normalize_items(news_items: list[dict]) -> list[dict]:
+    """Fill in the defaults every renderer uses for missing or null fields."""
+    return [
+        {
+            "icon": item.get("icon") or "📰",
+            "title": item.get("title") or "No Title",
+            "summary": item.get("summary") or "No summary provided.",
+            "url": item.get("url") or "#",
+        }
+        for item in news_items
+    ]
+
+
+def render_telegram(items: list[dict], title: str | None = None) -> str:
+    """Telegram MarkdownV2 variant: bold heading, bold titles, escaped text and links."""
+    lines = [f"*{escape_markdown_v2(digest_heading(title))}*", ""]
+    if not items:
+        lines.append(escape_markdown_v2(EMPTY_DIGEST_TEXT))
+        return "\n".join(lines)
+
+    for item in items:
+        lines.append(f"{escape_markdown_v2(item['icon'])} *{escape_markdown_v2(item['title'])}*")
+        lines.append(escape_markdown_v2(item["summary"]))
+        lines.append(f"[{escape_markdown_v2(item['url'])}]({escape_markdown_v2_url(item['url'])})")
+        lines.append("")
+
+    lines.append(escape_markdown_v2("-----"))
+    lines.append(
+        f"{escape_markdown_v2(f'The {title or FOOTER_DIGEST_NAME} is brought to you by')} "
+        f"*{escape_markdown_v2('#' + FOOTER_SITE_NAME)}*\\! "
+        f"To know more: [{escape_markdown_v2(FOOTER_SITE_NAME)}]({escape_markdown_v2_url(FOOTER_URL)})"
+    )
+    return "\n".join(lines)
+
+
+def render_html(items: list[dict], title: str | None = None) -> str:
+    """HTML variant for WordPress."""
+    if not items:
+        return f"<p>{html.escape(EMPTY_DIGEST_TEXT)}</p>"
+
+    parts = []
+    for item in items:
+        url = html.escape(item["url"], quote=True)
+        parts.append(
+            f"<h3>{html.escape(item['icon'])} {html.escape(item['title'])}</h3>\n"
+            f"<p>{html.escape(item['summary'])}</p>\n"
+            f'<p><a href="{url}">{html.escape(item["url"])}</a></p>'
+        )
+
+    parts.append("<hr />")
+    parts.append(
+        f"<p>The {html.escape(title or FOOTER_DIGEST_NAME)} is brought to you by "
+        f"<strong>#{html.escape(FOOTER_SITE_NAME)}</strong>! "
+        f'To know more: <a href="{html.escape(FOOTER_URL, quote=True)}">{html.escape(FOOTER_SITE_NAME)}</a></p>'
+    )
+    return "\n".join(parts)
+
+
+def render_text(items: list[dict], title: str | None = None) -> str:
+    """Plain-text variant for WeChat: no markup, links spelled out."""
+    lines = [digest_heading(title), ""]
+    if not items:
+        lines.append(EMPTY_DIGEST_TEXT)
+        return "\n".join(lines)
+
+    for item in items:
+        lines.append(f"{item['icon']} {item['title']}")
+        lines.append(item["summary"])
+        lines.append(item["url"])
+        lines.append("")
+
+    lines.append("-----")
+    lines.append(f"The {title or FOOTER_DIGEST_NAME} is brought to you by #{FOOTER_SITE_NAME}! To know more: {FOOTER_URL}")
+    return "\n".join(lines)
+
+
+def render_json(items: list[dict], digest_hash: str, title: str | None = None) -> str:
+    """Archival JSON variant with the structured items."""
+    return json.dumps(
+        {"heading": digest_heading(title), "date": date.today().isoformat(), "digest_hash": digest_hash, "items": items},
+        ensure_ascii=False,
+        indent=2,
+    )
+
+
+def digest_hash(news_items: list[dict]) -> str:
+    """Stable hash of the digest items."""
+    return hashlib.sha256(json.dumps(news_items, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def render_digest(news_items: list[dict], title: str | None = None) -> dict:
+    """
+    Render every channel variant of a digest in one pass.
+
+    Results are memoized per digest hash and title, so rendering the same items
+    again (another channel, a retry) returns the cached variants.
+
+    :param title: Digest title for the heading and footer, e.g. the topic profile's "title".
+
+    :return: dict with keys 'hash', 'markdown' (format_summary output), 'telegram'
+             (MarkdownV2), 'html' (WordPress), 'text' (WeChat) and 'json' (archive).
+    """
+    key = digest_hash(news_items)
+    cache_key = (key, title)
+    if cache_key in _render_cache:
+        _render_cache.move_to_end(cache_key)
+        return _render_cache[cache_key]
+
+    items = normalize_items(news_items)
+    variants = {
+        "hash": key,
+        "markdown": format_summary(news_items, title),
+        "telegram": render_telegram(items, title),
+        "html": render_html(items, title),
+        "text": render_text(items, title),
+        "json": render_json(items, key, title),
+    }
+
+    _render_cache[cache_key] = variants
+    if len(_render_cache) > RENDER_CACHE_SIZE:
+        _render_cache.popitem(last=False)
+    return variants
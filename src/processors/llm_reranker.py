@@ -1,9 +1,16 @@
 import json
 import logging
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+import numpy as np
 import re
+
+from processors.clustering import group_articles
+from utils.llm_client import get_llm_client
+from utils.llm_telemetry import LLMCall, recent_latencies
+
 # Load environment variables
 load_dotenv()
 
@@ -15,6 +22,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Ledger call site for the rerank request
+CALL_SITE = "rerank"
+
+# Number of recent ledger latencies used to pick the hedge delay
+LATENCY_HISTORY_SIZE = 50
+MIN_HEDGE_SAMPLES = 5
+
+# Maximum number of items in a digest built without the LLM
+FALLBACK_MAX_ITEMS = 10
+
 def repair_json(response_text):
     """
     Attempt to repair incomplete or malformed JSON from LLM responses.
@@ -49,20 +66,61 @@ def repair_json(response_text):
 
     return response_text
 
-def re_rank_and_summarize_with_llm(articles: list[dict]) -> list[dict]:
+def build_grouped_prompt(articles: list[dict]) -> str:
     """
-    Combine LLM Re-Rank and Summarize into a single function.
-    This function groups similar articles, ranks them, and summarizes them into one concise summary.
-    :param articles: List of articles to process.
-                     Each article is a dictionary containing 'title', 'content', and 'url'.
-    :return: List of re-ranked and summarized articles.
+    Build the user prompt from locally pre-grouped articles.
+
+    Only the lead article of each group carries a content snippet; the other
+    members are listed by title and URL, which keeps the prompt short.
     """
-    if not articles:
-        logger.warning("No articles provided for re-ranking and summarization.")
-        return []
+    groups = group_articles(articles)
+    groups_json_str = json.dumps(
+        [
+            {
+                "group": index,
+                "articles": [
+                    {
+                        "url": a.get("url", ""),
+                        "title": a.get("title", "Untitled")[:100],
+                        **({"content": a.get("content", "")[:500]} if position == 0 else {}),
+                    }
+                    for position, a in enumerate(group)
+                ],
+            }
+            for index, group in enumerate(groups, start=1)
+        ],
+        ensure_ascii=False,
+    )
 
-    logger.info(f"Re-ranking and summarizing {len(articles)} articles using LLM...")
+    return (
+        "Below is a list of AI news topics in JSON format. Related articles have already been grouped "
+        "together; each group lists its articles with 'title' and 'url', and the first article also has "
+        "a 'content' snippet.\n\n"
+        "1️⃣ **Select the most important article in each group** to represent the group.\n"
+        "2️⃣ **Summarize the group**. Write a concise one-liner summary of the group's topic.\n"
+        "3️⃣ **Rank the groups** by importance and drop groups that are not worth reporting.\n"
+        "4️⃣ **Return a JSON array** with one entry per kept group, using the following structure:\n"
+        "- icon: Use an appropriate emoji related to AI (like 🤖, 📜, 🔍, 🚀, etc.).\n"
+        "- title: The title of the grouped topic.\n"
+        "- summary: A one-liner summary of the grouped content.\n"
+        "- url: The URL of the most relevant article in the group.\n\n"
+        "Return only valid JSON. Here is an example of the expected format:\n"
+        "[\n"
+        "  {\n"
+        '    "icon": "🤖",\n'
+        '    "title": "Title of the grouped topic",\n'
+        '    "summary": "A one-liner summary of the grouped content.",\n'
+        '    "url": "https://example.com/most-relevant-article"\n'
+        "  },\n"
+        "  ...\n"
+        "]\n\n"
+        "Groups:\n"
+        f"{groups_json_str}"
+    )
 
+
+def build_ungrouped_prompt(articles: list[dict]) -> str:
+    """Build the user prompt that asks the LLM to do the grouping itself."""
     article_json_str = json.dumps(
         [
             {
@@ -77,12 +135,7 @@ def re_rank_and_summarize_with_llm(articles: list[dict]) -> list[dict]:
         ensure_ascii=False,
     )
 
-    system_prompt = (
-        "You are a helpful assistant that outputs ONLY valid JSON. "
-        "Do NOT include any explanation, headers, or text outside of the JSON array."
-    )
-
-    user_prompt = (
+    return (
         "Below is a list of AI news articles in JSON format. Each article includes fields like "
         "'title', 'url', and 'content'.\n\n"
         "1️⃣ **Group related articles together** based on similar topics or subject matter (similar titles, themes, or main points).\n"
@@ -107,14 +160,118 @@ def re_rank_and_summarize_with_llm(articles: list[dict]) -> list[dict]:
         f"{article_json_str}"
     )
 
-    client = AzureOpenAI(
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    )
+
+def hedge_delay(deadline: float, percentile: float | None) -> float | None:
+    """
+    Seconds to wait before sending a hedged duplicate request.
+
+    Uses the given percentile of recent latencies; until enough history has
+    been collected, hedges at half of the deadline. Returns None if hedging
+    is disabled or the delay would not leave time for the hedge to finish.
+    """
+    if percentile is None:
+        return None
+
+    history = recent_latencies(CALL_SITE, limit=LATENCY_HISTORY_SIZE)
+    if len(history) >= MIN_HEDGE_SAMPLES:
+        delay = float(np.percentile(history, percentile))
+    else:
+        delay = deadline / 2
+
+    return delay if delay < deadline else None
+
+
+def call_with_deadline(fn, deadline: float, hedge_after: float | None = None):
+    """
+    Run `fn` in a worker thread and return its result within `deadline` seconds.
+
+    If `hedge_after` is set and the first call has not finished by then (or
+    has already failed), a second identical call is started and whichever
+    succeeds first wins.
+
+    :raises TimeoutError: If no call succeeds before the deadline.
+    :raises Exception: The last error, if every call failed before the deadline.
+    """
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-call")
+    pending = {executor.submit(fn)}
+    hedged = hedge_after is None
+    last_error = None
 
     try:
-        chat_completion = client.chat.completions.create(
+        while True:
+            elapsed = time.monotonic() - start
+            remaining = deadline - elapsed
+            if remaining <= 0:
+                raise TimeoutError(f"LLM call exceeded deadline of {deadline:.0f}s")
+
+            timeout = remaining if hedged else min(remaining, max(0.0, hedge_after - elapsed))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"⚠️ LLM call attempt failed: {e}")
+
+            if not hedged and (time.monotonic() - start >= hedge_after or not pending):
+                logger.info(f"🏇 Sending hedged LLM request after {time.monotonic() - start:.1f}s...")
+                pending.add(executor.submit(fn))
+                hedged = True
+            elif not pending:
+                raise last_error
+    finally:
+        # Running calls are bounded by the client timeout; don't wait for them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def first_sentence(text: str, max_chars: int = 200) -> str:
+    """Return the first sentence of `text`, truncated to `max_chars`."""
+    text = " ".join(text.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    if len(sentence) > max_chars:
+        sentence = sentence[: max_chars - 1].rstrip() + "…"
+    return sentence
+
+
+def build_fallback_digest(articles: list[dict], max_items: int = FALLBACK_MAX_ITEMS) -> list[dict]:
+    """
+    Build digest items locally, without the LLM.
+
+    Takes the lead article of each topic cluster (clusters are ordered by
+    score) and uses its feed summary, or the start of its content, as the
+    one-liner.
+
+    :return: Items in the same shape the LLM returns (icon, title, summary, url).
+    """
+    digest = []
+    for group in group_articles(articles)[:max_items]:
+        lead = group[0]
+        summary = first_sentence(lead.get("summary") or lead.get("content", ""))
+        digest.append(
+            {
+                "icon": "📰",
+                "title": lead.get("title", "Untitled"),
+                "summary": summary or "No summary provided.",
+                "url": lead.get("url", "#"),
+            }
+        )
+
+    logger.info(f"🛟 Built fallback digest with {len(digest)} items from local scores.")
+    return digest
+
+
+def request_rerank(client, system_prompt: str, user_prompt: str) -> list[dict]:
+    """
+    Send one rerank request and parse the JSON array from the response.
+
+    :return: The parsed list, or an empty list if the response could not be parsed.
+    """
+    with LLMCall(CALL_SITE) as call:
+        chat_completion = call.create(
+            client,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
@@ -123,6 +280,7 @@ def re_rank_and_summarize_with_llm(articles: list[dict]) -> list[dict]:
             temperature=1,
             max_completion_tokens=2000,
         )
+
         response_text = chat_completion.choices[0].message.content.strip()
         logger.info(f"Raw LLM response before parsing: {response_text}")
 
@@ -130,16 +288,68 @@ def re_rank_and_summarize_with_llm(articles: list[dict]) -> list[dict]:
 
         try:
             re_ranked_and_summarized_articles = json.loads(response_text)
-            if isinstance(re_ranked_and_summarized_articles, list):
+            call.parse_ok = isinstance(re_ranked_and_summarized_articles, list)
+            if call.parse_ok:
                 return re_ranked_and_summarized_articles
             else:
                 logger.error("LLM returned a non-list JSON structure.")
                 return []
         except json.JSONDecodeError as e:
+            call.parse_ok = False
             logger.error(f"Failed to parse JSON from LLM response. Error: {e}")
             logger.debug(f"Repaired LLM response text: {response_text}")
             return []
 
-    except Exception as e:
-        logger.error(f"Error while re-ranking and summarizing articles with LLM: {e}")
+
+def re_rank_and_summarize_with_llm(
+    articles: list[dict],
+    pre_group: bool = True,
+    deadline: float | None = None,
+    hedge_percentile: float | None = None,
+) -> list[dict]:
+    """
+    Combine LLM Re-Rank and Summarize into a single function.
+    This function groups similar articles, ranks them, and summarizes them into one concise summary.
+    :param articles: List of articles to process.
+                     Each article is a dictionary containing 'title', 'content', and 'url'.
+    :param pre_group: If True, group related articles locally (see processors.clustering)
+                      so the LLM only has to pick and summarize each group.
+    :param deadline: Hard limit in seconds for the LLM step. When set, a timeout, error or
+                     unparseable response yields a locally built digest instead of an empty list.
+    :param hedge_percentile: With a deadline, send a duplicate request once the first has run
+                             longer than this percentile of recent latencies. None disables hedging.
+    :return: List of re-ranked and summarized articles.
+    """
+    if not articles:
+        logger.warning("No articles provided for re-ranking and summarization.")
         return []
+
+    logger.info(f"Re-ranking and summarizing {len(articles)} articles using LLM...")
+
+    system_prompt = (
+        "You are a helpful assistant that outputs ONLY valid JSON. "
+        "Do NOT include any explanation, headers, or text outside of the JSON array."
+    )
+
+    user_prompt = build_grouped_prompt(articles) if pre_group else build_ungrouped_prompt(articles)
+
+    client = get_llm_client(timeout=deadline, max_retries=0) if deadline else get_llm_client()
+
+    if deadline is None:
+        try:
+            return request_rerank(client, system_prompt, user_prompt)
+        except Exception as e:
+            logger.error(f"Error while re-ranking and summarizing articles with LLM: {e}")
+            return []
+
+    def attempt():
+        result = request_rerank(client, system_prompt, user_prompt)
+        if not result:
+            raise ValueError("LLM returned no usable items")
+        return result
+
+    try:
+        return call_with_deadline(attempt, deadline, hedge_delay(deadline, hedge_percentile))
+    except Exception as e:
+        logger.error(f"⏱️ LLM re-ranking did not succeed within {deadline:.0f}s: {e}")
+        return build_fallback_digest(articles)
@@ -0,0 +1,153 @@
+# processors/social_copy.py
+"""
+Social copy for the blog post announcements from a single LLM call.
+
+One structured-output request produces the tweet and the Threads post for
+a blog post (Telegram and WeChat get the digest itself). Results are
+cached per blog URL, so publishing to both channels (and any retry) costs
+at most one round-trip.
+"""
+import json
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from config import CACHE_DIR
+from utils.llm_client import get_llm_client
+from utils.llm_telemetry import LLMCall, record_cache_hit
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Ledger call site for the social copy request
+CALL_SITE = "social_copy"
+
+SOCIAL_COPY_CACHE_FILE = os.path.join(CACHE_DIR, "social_copy.json")
+
+# Maximum characters per post; the Threads publisher appends "\n\n<blog link>" to its variant
+CHANNEL_LIMITS = {
+    "tweet": 280,
+    "threads": 500,
+}
+
+HASHTAG = "#DailyAINews"
+
+
+def load_cache() -> dict:
+    """Load the blog URL -> variants cache."""
+    try:
+        with open(SOCIAL_COPY_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict):
+    """Persist the blog URL -> variants cache."""
+    try:
+        os.makedirs(os.path.dirname(SOCIAL_COPY_CACHE_FILE), exist_ok=True)
+        with open(SOCIAL_COPY_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not save social copy cache: {e}")
+
+
+def default_copy(channel: str, blog_post_url: str) -> str:
+    """Plain announcement used when the LLM omits or mangles a variant."""
+    if channel == "threads":
+        # The Threads publisher appends the link itself
+        return f"Today's Daily AI News Digest is out: the stories worth your time, in one place. {HASHTAG}"
+    return f"Today's Daily AI News Digest is out: {blog_post_url} {HASHTAG}"
+
+
+def fit_to_limit(text: str, limit: int) -> str:
+    """Trim text to `limit` characters, cutting at a word boundary."""
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    return text[: limit - 1].rsplit(" ", 1)[0].rstrip() + "…"
+
+
+def normalize_copy(raw: dict, blog_post_url: str) -> dict:
+    """Validate the LLM output, filling in defaults and enforcing channel limits."""
+    copy = {}
+    for channel, limit in CHANNEL_LIMITS.items():
+        text = raw.get(channel) if isinstance(raw, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            logger.warning(f"⚠️ LLM returned no '{channel}' variant, using default copy.")
+            text = default_copy(channel, blog_post_url)
+        if channel == "threads":
+            # Room for the link the publisher appends; a link the LLM added anyway would appear twice
+            copy[channel] = fit_to_limit(text.replace(blog_post_url, ""), limit - len(blog_post_url) - 2)
+        elif blog_post_url not in text or len(text.strip()) > limit:
+            # The link goes at the end, after trimming, so it is never cut off
+            trimmed = fit_to_limit(text.replace(blog_post_url, ""), limit - len(blog_post_url) - 1)
+            copy[channel] = f"{trimmed} {blog_post_url}"
+        else:
+            copy[channel] = text.strip()
+    return copy
+
+
+def request_social_copy(blog_post_url: str) -> dict:
+    """Ask the LLM for every channel variant in one JSON response."""
+    client = get_llm_client()
+
+    system_prompt = (
+        "You are a social media maestro who writes posts that stop thumbs from scrolling. "
+        "Announce the release of today's Daily AI News Digest blog post on Twitter and Threads. "
+        "Return ONLY a JSON object with these string fields:\n"
+        f"- tweet: under 280 characters, includes the blog link, ends with {HASHTAG}.\n"
+        f"- threads: under 450 characters, does NOT include the link (it is appended separately), ends with {HASHTAG}."
+    )
+    user_prompt = f"Blog post link: {blog_post_url}"
+
+    logger.info("🧠 Generating social copy for all channels using Azure OpenAI...")
+    with LLMCall(CALL_SITE) as call:
+        response = call.create(
+            client,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            model=os.getenv("AZURE_OPENAI_MODEL", "gpt-4o"),
+            temperature=1,
+            max_completion_tokens=400,
+            response_format={"type": "json_object"},
+        )
+        response_text = response.choices[0].message.content.strip()
+        logger.info(f"Azure OpenAI response: {response_text}")
+        raw = json.loads(response_text)
+        call.parse_ok = isinstance(raw, dict)
+        return raw
+
+
+def generate_social_copy(blog_post_url: str, use_cache: bool = True) -> dict:
+    """
+    Get the social copy variants for a blog post.
+
+    Args:
+        blog_post_url (str): The URL of the published blog post.
+        use_cache (bool): Reuse variants previously generated for this URL.
+
+    Returns:
+        dict: Variants keyed by channel: 'tweet' and 'threads'.
+    """
+    cache = load_cache()
+    if use_cache and blog_post_url in cache:
+        logger.info("♻️ Using cached social copy for this blog post.")
+        record_cache_hit(CALL_SITE)
+        return cache[blog_post_url]
+
+    try:
+        raw = request_social_copy(blog_post_url)
+    except Exception as e:
+        logger.error(f"❌ Failed to generate social copy, using default copy: {e}")
+        return normalize_copy({}, blog_post_url)
+
+    copy = normalize_copy(raw, blog_post_url)
+    cache[blog_post_url] = copy
+    save_cache(cache)
+    return copy
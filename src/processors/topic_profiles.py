@@ -0,0 +1,95 @@
+"""
+Topic Profiles
+
+A topic profile (config.TOPIC_PROFILES) describes one digest: its keyword
+weights, the feeds it draws from, the channels it goes to and how many
+candidates reach the LLM. The pipeline fetches and extracts the union of
+all enabled profiles' feeds once, then each profile scores that shared
+pool on its own.
+
+Usage (run from src/):
+    python -m processors.topic_profiles   # list the profiles, their feeds and channels
+"""
+
+from typing import Iterable, Optional
+
+from config import DEFAULT_PROFILE, ENABLED_CHANNELS, SITES_CONFIG, TOPIC_PROFILES
+
+PROFILE_DEFAULTS = {
+    "enabled": True,
+    "title": "Daily News Digest",
+    "keywords": {},
+    "sources": None,
+    "channels": None,
+    "max_to_rank": 20,
+    "category_id": None,
+}
+
+
+def resolve_profile(name: str, profile: dict) -> dict:
+    """A profile with defaults filled in and its keywords lower-cased for matching."""
+    resolved = {**PROFILE_DEFAULTS, **profile, "name": name}
+    resolved.setdefault("heading", resolved["title"])
+    resolved["keywords"] = {keyword.lower(): weight for keyword, weight in resolved["keywords"].items()}
+    return resolved
+
+
+def select_profiles(names: Optional[Iterable[str]] = None, profiles: dict = TOPIC_PROFILES) -> dict[str, dict]:
+    """
+    Resolve the profiles to run.
+
+    Args:
+        names: Profiles to run, enabled or not; None selects every enabled profile.
+        profiles: Profile definitions, default config.TOPIC_PROFILES.
+
+    Raises:
+        ValueError: If a named profile does not exist.
+    """
+    if names is None:
+        return {name: resolve_profile(name, profile)
+                for name, profile in profiles.items() if profile.get("enabled", True)}
+
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        raise ValueError(f"Unknown topic profile(s): {', '.join(unknown)} (known: {', '.join(profiles)})")
+    return {name: resolve_profile(name, profiles[name]) for name in names}
+
+
+def default_keyword_weights() -> dict[str, float]:
+    return resolve_profile(DEFAULT_PROFILE, TOPIC_PROFILES[DEFAULT_PROFILE])["keywords"]
+
+
+def profile_sources(profile: dict, default_sources: list[str] = SITES_CONFIG) -> list[str]:
+    return default_sources if profile["sources"] is None else profile["sources"]
+
+
+def all_sources(profiles: dict[str, dict], default_sources: list[str] = SITES_CONFIG) -> list[str]:
+    """Every feed any of the profiles draws from, each once, in first-seen order."""
+    return list(dict.fromkeys(
+        feed_url for profile in profiles.values() for feed_url in profile_sources(profile, default_sources)
+    ))
+
+
+def profile_articles(articles: list[dict], profile: dict, default_sources: list[str] = SITES_CONFIG) -> list[dict]:
+    """The articles of the shared pool that come from the profile's feeds."""
+    sources = set(profile_sources(profile, default_sources))
+    return [article for article in articles if article["source"] in sources]
+
+
+def profile_channels(profile: dict) -> list[str]:
+    """The profile's channels; ENABLED_CHANNELS stays the global switch."""
+    if profile["channels"] is None:
+        return list(ENABLED_CHANNELS)
+    return [channel for channel in profile["channels"] if channel in ENABLED_CHANNELS]
+
+
+if __name__ == "__main__":
+    for name, profile in TOPIC_PROFILES.items():
+        profile = resolve_profile(name, profile)
+        state = "enabled" if profile["enabled"] else "disabled"
+        print(f"{name} ({state}): {profile['title']}")
+        print(f"  feeds:       {len(profile_sources(profile))}")
+        print(f"  channels:    {', '.join(profile_channels(profile)) or 'none (files only)'}")
+        print(f"  max_to_rank: {profile['max_to_rank']}")
+        top = sorted(profile["keywords"].items(), key=lambda item: -item[1])
+        print(f"  keywords:    {', '.join(f'{keyword}={weight:g}' for keyword, weight in top)}")
@@ -0,0 +1,309 @@
+# scheduler/schedule_tasks.py
+"""
+Long-running scheduler daemon.
+
+Instead of a cold start per cron invocation, one process keeps the pooled
+HTTP session, the LLM client, the Tranco list and the in-memory article
+cache warm, and runs jobs on cron-style schedules (config.SCHEDULE):
+
+- digest: the full daily pipeline (main.run_pipeline)
+- poll:   intraday polls of the feeds that are due (fetchers.feed_scheduler
+          learns a poll interval per feed); new articles go into the
+          article cache, so the digest mostly reuses already-extracted ones
+- probe:  feed health probes (fetchers.feed_health); sources that are
+          dead, slow or stale are quarantined until they recover
+
+The outbox retry worker runs alongside, resending failed deliveries.
+
+A job whose previous run is still going is skipped, not stacked, and a
+lock file keeps a second daemon from starting. SIGTERM/SIGINT stop new
+runs and wait up to SHUTDOWN_GRACE_SECONDS for running jobs to finish.
+
+Usage (run from src/):
+    python -m scheduler.schedule_tasks              # run the daemon
+    python -m scheduler.schedule_tasks --list       # show the next run of each job
+    python -m scheduler.schedule_tasks --once poll  # run one job now and exit
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, single-instance protection is skipped
+    fcntl = None
+
+from config import CACHE_DIR, SCHEDULE, SHUTDOWN_GRACE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = os.path.join(CACHE_DIR, "scheduler.lock")
+
+# Cron fields: (name, minimum, maximum); day of week 7 is Sunday, like 0
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+
+class SchedulerAlreadyRunning(RuntimeError):
+    """Another daemon holds the scheduler lock."""
+
+
+def parse_cron_field(field: str, minimum: int, maximum: int) -> set[int]:
+    """Expand one cron field ('*', '5', '1-5', '*/15', '1,15,30', '9-17/2') into its values."""
+    values = set()
+    for part in field.split(","):
+        expression, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expression == "*":
+            start, end = minimum, maximum
+        elif "-" in expression:
+            start, end = map(int, expression.split("-"))
+        else:
+            start = end = int(expression)
+        if step < 1 or start < minimum or end > maximum or start > end:
+            raise ValueError(f"Invalid cron field '{field}' (allowed {minimum}-{maximum})")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Day of week is 0-6 with 0 = Sunday (7 is also accepted for Sunday). As
+    in cron, if both day fields are restricted a day matching either runs.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_cron_field(field, minimum, maximum) for field, (_, minimum, maximum) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def day_matches(self, moment: datetime) -> bool:
+        if moment.month not in self.months:
+            return False
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if not self.day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+
+class Job:
+    """A named coroutine function run on a cron schedule, at most one run at a time."""
+
+    def __init__(self, name: str, schedule: str, func):
+        self.name = name
+        self.schedule = CronSchedule(schedule)
+        self.func = func
+        self.task = None
+        self.next_run = self.schedule.next_after(datetime.now())
+        self.last_duration = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def run(self):
+        start = time.monotonic()
+        logger.info(f"▶️ Job '{self.name}' started.")
+        try:
+            await self.func()
+            self.last_duration = time.monotonic() - start
+            logger.info(f"✅ Job '{self.name}' finished in {self.last_duration:.1f}s.")
+        except Exception as e:
+            logger.exception(f"❌ Job '{self.name}' failed: {e}")
+
+    def start(self):
+        self.task = asyncio.create_task(self.run(), name=f"job-{self.name}")
+
+
+async def run_digest():
+    from main import run_pipeline
+
+    await run_pipeline()
+
+
+async def poll_feeds():
+    """Poll the feeds that are due and extract their new articles into the in-memory article cache."""
+    from fetchers.feed_scheduler import poll_due_feeds
+
+    # Polls the feeds of every enabled topic profile
+    await asyncio.to_thread(poll_due_feeds)
+
+
+async def probe_feeds():
+    """Probe every source, quarantining unhealthy ones and releasing those that recovered."""
+    from fetchers.feed_health import probe_sources
+
+    await asyncio.to_thread(probe_sources)
+
+
+JOBS = {
+    "digest": run_digest,
+    "poll": poll_feeds,
+    "probe": probe_feeds,
+}
+
+
+def warm_up():
+    """Create the long-lived clients up front so the first job doesn't pay for them."""
+    from fetchers.rss_fetcher import initialize_tranco_list
+    from utils.http_session import get_session
+    from utils.llm_client import get_llm_client
+
+    get_session()
+    get_llm_client()
+    try:
+        initialize_tranco_list()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load the Tranco list: {e}")
+    logger.info("🔥 Warmed HTTP session, LLM client and Tranco list.")
+
+
+@contextmanager
+def single_instance_lock(lock_file: str = LOCK_FILE):
+    """Hold an exclusive, non-blocking lock for the daemon's lifetime; raises SchedulerAlreadyRunning if held."""
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(lock_file), exist_ok=True)
+    with open(lock_file, "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise SchedulerAlreadyRunning(f"Another scheduler holds {lock_file}")
+        f.write(str(os.getpid()))
+        f.flush()
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class Scheduler:
+    """Runs jobs when due, skipping a run while the previous one is still going."""
+
+    def __init__(self, jobs: list[Job], grace_seconds: float = SHUTDOWN_GRACE_SECONDS, retry_worker: bool = True):
+        self.jobs = jobs
+        self.grace_seconds = grace_seconds
+        self.retry_worker = retry_worker
+        self.stop_event = asyncio.Event()
+
+    def stop(self):
+        if not self.stop_event.is_set():
+            logger.info("🛑 Shutdown requested; no new jobs will start.")
+            self.stop_event.set()
+
+    def start_due_jobs(self, now: datetime):
+        for job in self.jobs:
+            if job.next_run > now:
+                continue
+            if job.running:
+                logger.warning(f"⏭️ Job '{job.name}' is still running; skipping the {job.next_run:%H:%M} run.")
+            else:
+                job.start()
+            job.next_run = job.schedule.next_after(now)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                pass
+
+        retry_task = None
+        if self.retry_worker:
+            from outputs.delivery import run_retry_worker
+            retry_task = asyncio.create_task(run_retry_worker(stop_event=self.stop_event), name="outbox-retry")
+
+        for job in self.jobs:
+            logger.info(f"🗓️ Job '{job.name}' ({job.schedule.expression}) next runs at {job.next_run:%Y-%m-%d %H:%M}.")
+
+        while not self.stop_event.is_set():
+            self.start_due_jobs(datetime.now())
+            next_run = min(job.next_run for job in self.jobs)
+            # Wake at least once a minute so clock changes and sleep/resume are picked up
+            sleep_for = min(max((next_run - datetime.now()).total_seconds(), 0.5), 60)
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
+
+        await self.shutdown(retry_task)
+
+    async def shutdown(self, retry_task=None):
+        running = [job.task for job in self.jobs if job.running]
+        if retry_task is not None:
+            running.append(retry_task)
+        if running:
+            logger.info(f"⏳ Waiting up to {self.grace_seconds:.0f}s for {len(running)} running task(s)...")
+            done, pending = await asyncio.wait(running, timeout=self.grace_seconds)
+            for task in pending:
+                logger.warning(f"⚠️ Cancelling {task.get_name()} after the grace period.")
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("👋 Scheduler stopped.")
+
+
+def build_jobs(schedule: dict = SCHEDULE) -> list[Job]:
+    return [Job(name, expression, JOBS[name]) for name, expression in schedule.items()]
+
+
+async def run_daemon():
+    warm_up()
+    await Scheduler(build_jobs()).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    parser = argparse.ArgumentParser(description="Run the digest pipeline and feed polls on a schedule.")
+    parser.add_argument("--list", action="store_true", help="Show the next run time of each job and exit")
+    parser.add_argument("--once", choices=list(JOBS), help="Run one job immediately and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for job in build_jobs():
+            print(f"{job.name:<10}{job.schedule.expression:<20}next: {job.next_run:%Y-%m-%d %H:%M}")
+    elif args.once:
+        asyncio.run(JOBS[args.once]())
+    else:
+        try:
+            with single_instance_lock():
+                asyncio.run(run_daemon())
+        except SchedulerAlreadyRunning as e:
+            logger.error(f"❌ {e}")
+            raise SystemExit(1)
@@ -0,0 +1,108 @@
+"""
+Pipeline Checkpoints
+
+Each run_pipeline stage writes its output to a JSON checkpoint keyed by
+the run date, so a failed run can resume from the last completed stage
+(`python main.py --resume`) instead of re-fetching and re-calling the LLM.
+
+The fetched article pool is shared by all topic profiles; the later
+stages are per profile.
+
+Layout: <CACHE_DIR>/checkpoints/<YYYY-MM-DD>/fetched.json
+        <CACHE_DIR>/checkpoints/<YYYY-MM-DD>/<profile>/<stage>.json
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+
+# Pipeline stages in execution order
+STAGES = ["fetched", "scored", "llm", "formatted", "delivery"]
+# Stages whose output is shared by every topic profile
+SHARED_STAGES = ["fetched"]
+
+# Checkpoints older than this are deleted by prune_checkpoints
+KEEP_DAYS = 7
+
+
+def run_dir(run_date: Optional[str] = None) -> str:
+    """Directory holding the checkpoints of one run date (default: today)."""
+    return os.path.join(CHECKPOINT_DIR, run_date or date.today().isoformat())
+
+
+def checkpoint_path(stage: str, run_date: Optional[str] = None, profile: Optional[str] = None) -> str:
+    """Path of a stage's checkpoint; per-profile stages live in the profile's subdirectory."""
+    if profile is None or stage in SHARED_STAGES:
+        return os.path.join(run_dir(run_date), f"{stage}.json")
+    return os.path.join(run_dir(run_date), profile, f"{stage}.json")
+
+
+def save_checkpoint(stage: str, data: Any, run_date: Optional[str] = None, profile: Optional[str] = None) -> str:
+    """
+    Write a stage's output atomically.
+
+    Args:
+        stage: One of STAGES
+        data: JSON-serializable stage output
+        run_date: Run date (YYYY-MM-DD), default today
+        profile: Topic profile the output belongs to (ignored for shared stages)
+
+    Returns:
+        Path of the checkpoint file
+    """
+    if stage not in STAGES:
+        raise ValueError(f"Unknown pipeline stage: {stage}")
+
+    path = checkpoint_path(stage, run_date, profile)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+    logger.info(f"💾 Checkpoint saved: {stage}" + (f" ({profile})" if profile and stage not in SHARED_STAGES else ""))
+    return path
+
+
+def load_checkpoint(stage: str, run_date: Optional[str] = None, profile: Optional[str] = None) -> Optional[Any]:
+    """Return a stage's saved output, or None if the stage has no (readable) checkpoint."""
+    path = checkpoint_path(stage, run_date, profile)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def last_completed_stage(run_date: Optional[str] = None, profile: Optional[str] = None) -> Optional[str]:
+    """The latest stage, in pipeline order, whose checkpoint and all earlier ones exist (for a profile, if given)."""
+    completed = None
+    for stage in STAGES:
+        if not os.path.exists(checkpoint_path(stage, run_date, profile)):
+            break
+        completed = stage
+    return completed
+
+
+def prune_checkpoints(keep_days: int = KEEP_DAYS):
+    """Delete checkpoint directories older than `keep_days`."""
+    if not os.path.isdir(CHECKPOINT_DIR):
+        return
+
+    oldest_kept = (date.today() - timedelta(days=keep_days)).isoformat()
+    for name in os.listdir(CHECKPOINT_DIR):
+        if name < oldest_kept:
+            shutil.rmtree(os.path.join(CHECKPOINT_DIR, name), ignore_errors=True)
@@ -0,0 +1,93 @@
+"""
+Shared HTTP Session
+
+One pooled requests.Session for every module that talks HTTP, so calls to
+the same host reuse keep-alive TCP+TLS connections instead of opening a new
+one each time.
+
+The session:
+- applies default connect/read timeouts to every request that doesn't set one
+- retries idempotent requests (GET/HEAD/OPTIONS) on connection errors and
+  429/5xx responses with exponential backoff, honouring Retry-After
+- retries any request whose connection failed before it was sent
+- advertises gzip/deflate so servers can compress responses
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+
+# Connections kept alive per host; enough for the concurrent delivery stage
+POOL_MAXSIZE = 20
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+USER_AGENT = "Mozilla/5.0 (compatible; AI-Daily-News-Crawler)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when the caller gives none."""
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(timeout=DEFAULT_TIMEOUT, pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """
+    Build a new pooled session with default timeouts and retries.
+
+    Args:
+        timeout: Default (connect, read) timeout in seconds.
+        pool_maxsize: Maximum number of kept-alive connections per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=RETRY_TOTAL,
+        # Connection errors happen before the request is sent, so they are safe to retry for any method
+        connect=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        max_retries=retry,
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
@@ -0,0 +1,49 @@
+"""
+Shared Azure OpenAI Clients
+
+Each AzureOpenAI client owns an HTTP connection pool, so one client is
+built on first use and reused. Callers with their own timeout or retry
+count (a per-run LLM deadline, say) get a view of it from with_options(),
+which shares its connection pool instead of opening another. A
+long-running process (the scheduler daemon) keeps the connections to the
+endpoint warm.
+"""
+
+import os
+import threading
+from typing import Optional
+
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+
+load_dotenv()
+
+DEFAULT_API_VERSION = "2025-01-01-preview"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client(timeout: Optional[float] = None, max_retries: Optional[int] = None) -> AzureOpenAI:
+    """
+    Return the shared client, creating it on first use, with these settings applied.
+
+    Args:
+        timeout: Request timeout in seconds; None keeps the SDK default.
+        max_retries: SDK retry count; None keeps the SDK default.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION", DEFAULT_API_VERSION),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            )
+    options = {}
+    if timeout is not None:
+        options["timeout"] = timeout
+    if max_retries is not None:
+        options["max_retries"] = max_retries
+    # Not cached: a copy per call shares the connection pool, and varying deadlines would pile up otherwise
+    return _client.with_options(**options) if options else _client
@@ -0,0 +1,282 @@
+"""
+LLM Usage and Latency Telemetry
+
+Records every chat-completion call to an append-only JSONL ledger:
+call site, model, prompt/completion tokens, latency, retries, cache hits
+and whether the response could be parsed.
+
+Usage:
+    with LLMCall("rerank") as call:
+        completion = call.create(client, model=..., messages=...)
+        call.parse_ok = parse(completion)
+
+Report (run from src/):
+    python -m utils.llm_telemetry --days 7
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+from config import CACHE_DIR
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+LEDGER_FILE = os.path.join(CACHE_DIR, "llm_ledger.jsonl")
+
+# Hedged requests may record from several threads at once
+_ledger_lock = threading.Lock()
+
+# Bytes read per step when reading the ledger backwards
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def append_entry(entry: dict, ledger_file: str = LEDGER_FILE):
+    """Append one JSON line to the ledger. Telemetry failures never break the caller."""
+    try:
+        line = json.dumps(entry, ensure_ascii=False)
+        with _ledger_lock:
+            os.makedirs(os.path.dirname(ledger_file), exist_ok=True)
+            with open(ledger_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Could not write LLM ledger entry: {e}")
+
+
+def record_cache_hit(call_site: str, model: Optional[str] = None):
+    """Record a call that was served from a local cache instead of the LLM."""
+    append_entry(
+        {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "call_site": call_site,
+            "model": model,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency": 0.0,
+            "retries": 0,
+            "cache_hit": True,
+            "parse_ok": True,
+            "error": None,
+        }
+    )
+
+
+class LLMCall:
+    """
+    Context manager that times one chat-completion call and writes it to the ledger on exit.
+
+    Set `parse_ok` inside the block once the response has been parsed; an
+    exception escaping the block is recorded as the call's error.
+    """
+
+    def __init__(self, call_site: str, ledger_file: str = LEDGER_FILE):
+        self.call_site = call_site
+        self.ledger_file = ledger_file
+        self.model = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = None
+        self.retries = 0
+        self.parse_ok = None
+        self.error = None
+        self._start = None
+        self._span = span(call_site, "llm")
+
+    def __enter__(self):
+        self._span.__enter__()
+        self._start = time.monotonic()
+        return self
+
+    def create(self, client, **kwargs):
+        """Call `client.chat.completions.create(**kwargs)`, capturing usage, retries and latency."""
+        self.model = kwargs.get("model")
+        start = time.monotonic()
+        try:
+            raw_response = client.chat.completions.with_raw_response.create(**kwargs)
+            completion = raw_response.parse()
+        finally:
+            self.latency = time.monotonic() - start
+
+        self.retries = getattr(raw_response, "retries_taken", 0)
+        self.model = getattr(completion, "model", None) or self.model
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens or 0
+            self.completion_tokens = usage.completion_tokens or 0
+        return completion
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+            if self.parse_ok is None and self.latency is not None:
+                self.parse_ok = False
+        latency = self.latency if self.latency is not None else time.monotonic() - self._start
+
+        append_entry(
+            {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "call_site": self.call_site,
+                "model": self.model,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "latency": round(latency, 3),
+                "retries": self.retries,
+                "cache_hit": False,
+                "parse_ok": self.parse_ok,
+                "error": self.error,
+            },
+            self.ledger_file,
+        )
+
+        self._span.set(
+            model=self.model,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            retries=self.retries,
+            status="parse_failed" if self.parse_ok is False else "ok",
+        )
+        self._span.__exit__(exc_type, exc, tb)
+        return False
+
+
+def load_ledger(ledger_file: str = LEDGER_FILE, since: Optional[datetime] = None) -> list[dict]:
+    """Read ledger entries, optionally only those at or after `since`. Corrupt lines are skipped."""
+    entries = []
+    try:
+        with open(ledger_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or datetime.fromisoformat(entry["timestamp"]) >= since:
+                    entries.append(entry)
+    except OSError:
+        pass
+    return entries
+
+
+def reversed_lines(ledger_file: str = LEDGER_FILE, block_size: int = TAIL_BLOCK_SIZE):
+    """Yield the ledger's lines newest first, reading it backwards a block at a time."""
+    try:
+        with open(ledger_file, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            partial = b""
+            while position > 0:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + partial).split(b"\n")
+                # The first piece may continue in the previous block
+                partial = lines.pop(0)
+                for line in reversed(lines):
+                    if line:
+                        yield line.decode("utf-8", errors="replace")
+            if partial:
+                yield partial.decode("utf-8", errors="replace")
+    except OSError:
+        return
+
+
+def recent_latencies(call_site: str, limit: int = 50, ledger_file: str = LEDGER_FILE) -> list[float]:
+    """
+    Latencies of the most recent successful (non-cached) calls from `call_site`, oldest first.
+
+    Only the end of the ledger is read, back to the `limit`-th matching call.
+    """
+    latencies = []
+    for line in reversed_lines(ledger_file):
+        if len(latencies) >= limit:
+            break
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("call_site") == call_site and not entry.get("cache_hit") and not entry.get("error"):
+            latencies.append(entry["latency"])
+    return latencies[::-1]
+
+
+def summarize_ledger(entries: list[dict]) -> tuple[dict, dict]:
+    """
+    Aggregate ledger entries.
+
+    Returns:
+        Tuple of (per_call_site, daily_tokens)
+        - per_call_site: {call_site: {calls, cache_hits, errors, parse_failures, retries, p50, p95}}
+        - daily_tokens: {(date, call_site): {prompt_tokens, completion_tokens}}
+    """
+    latencies = defaultdict(list)
+    per_call_site = defaultdict(lambda: {"calls": 0, "cache_hits": 0, "errors": 0, "parse_failures": 0, "retries": 0})
+    daily_tokens = defaultdict(lambda: {"prompt_tokens": 0, "completion_tokens": 0})
+
+    for entry in entries:
+        site = entry.get("call_site", "unknown")
+        stats = per_call_site[site]
+        stats["calls"] += 1
+        stats["retries"] += entry.get("retries") or 0
+        if entry.get("cache_hit"):
+            stats["cache_hits"] += 1
+        else:
+            latencies[site].append(entry.get("latency", 0.0))
+        if entry.get("error"):
+            stats["errors"] += 1
+        if entry.get("parse_ok") is False:
+            stats["parse_failures"] += 1
+
+        day = entry.get("timestamp", "")[:10]
+        daily_tokens[(day, site)]["prompt_tokens"] += entry.get("prompt_tokens") or 0
+        daily_tokens[(day, site)]["completion_tokens"] += entry.get("completion_tokens") or 0
+
+    for site, stats in per_call_site.items():
+        values = latencies.get(site)
+        stats["p50"] = float(np.percentile(values, 50)) if values else None
+        stats["p95"] = float(np.percentile(values, 95)) if values else None
+
+    return dict(per_call_site), dict(daily_tokens)
+
+
+def print_report(days: int = 7, ledger_file: str = LEDGER_FILE):
+    """Print latency percentiles per call site and daily token totals."""
+    since = datetime.now() - timedelta(days=days)
+    per_call_site, daily_tokens = summarize_ledger(load_ledger(ledger_file, since=since))
+
+    if not per_call_site:
+        print(f"No LLM calls recorded in the last {days} days ({ledger_file}).")
+        return
+
+    def fmt(seconds):
+        return f"{seconds:.2f}s" if seconds is not None else "-"
+
+    print(f"LLM calls in the last {days} days")
+    print(f"{'call site':<20}{'calls':>7}{'cached':>8}{'errors':>8}{'bad parse':>11}{'retries':>9}{'p50':>9}{'p95':>9}")
+    for site, stats in sorted(per_call_site.items()):
+        print(
+            f"{site:<20}{stats['calls']:>7}{stats['cache_hits']:>8}{stats['errors']:>8}"
+            f"{stats['parse_failures']:>11}{stats['retries']:>9}{fmt(stats['p50']):>9}{fmt(stats['p95']):>9}"
+        )
+
+    print()
+    print("Daily token totals")
+    print(f"{'date':<12}{'call site':<20}{'prompt':>10}{'completion':>12}{'total':>10}")
+    for (day, site), tokens in sorted(daily_tokens.items()):
+        total = tokens["prompt_tokens"] + tokens["completion_tokens"]
+        print(f"{day:<12}{site:<20}{tokens['prompt_tokens']:>10}{tokens['completion_tokens']:>12}{total:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report LLM usage and latency from the telemetry ledger.")
+    parser.add_argument("--days", type=int, default=7, help="Only include calls from the last N days (default: 7)")
+    parser.add_argument("--ledger", default=LEDGER_FILE, help="Path to the ledger file")
+    args = parser.parse_args()
+
+    print_report(days=args.days, ledger_file=args.ledger)
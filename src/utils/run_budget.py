@@ -0,0 +1,120 @@
+"""
+Run Deadline and Stage Budgets
+
+The digest has to be out by a fixed time, so a run gets a deadline
+(config.RUN_BUDGET_SECONDS after it starts, or config.PUBLISH_BY) that is
+split between its stages by config.RUN_STAGE_SHARES. Each stage has to end
+by its cumulative share of the run, so time a fast stage leaves unused
+goes to the stages after it. A stage whose time is up degrades instead of
+overrunning:
+
+- fetch:   the feeds not downloaded yet are skipped; the articles gathered so far go on
+- extract: the remaining articles keep their feed summaries
+- rank:    the LLM gets the time that is left, and the digest is built locally without it
+- publish: channel timeouts are capped; unfinished deliveries stay in the outbox for retry
+
+The achieved and budgeted time of every stage is logged.
+
+Usage:
+    budget = RunBudget.from_config()
+    with budget.stage("fetch") as deadline:
+        ...  # stop starting new work once time_left(deadline) is 0
+    budget.report()
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional
+
+from config import PUBLISH_BY, RUN_BUDGET_SECONDS, RUN_STAGE_SHARES
+
+logger = logging.getLogger(__name__)
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until a time.monotonic() deadline (never negative), or None without a deadline."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+class RunBudget:
+    """
+    Stage deadlines of one run; without `total_seconds` the stages are only timed.
+
+    Args:
+        total_seconds: Time for the whole run, from now.
+        shares: Stage name -> share of the run, in execution order.
+    """
+
+    def __init__(self, total_seconds: Optional[float] = None, shares: dict = RUN_STAGE_SHARES):
+        self.started = time.monotonic()
+        self.total_seconds = total_seconds
+        self.deadlines = {}
+        elapsed_share = 0.0
+        for stage, share in shares.items():
+            elapsed_share += share
+            self.deadlines[stage] = (
+                None if total_seconds is None else self.started + total_seconds * elapsed_share / sum(shares.values())
+            )
+        self.records = []
+
+    @classmethod
+    def until(cls, clock_time: str, shares: dict = RUN_STAGE_SHARES, now: Optional[datetime] = None) -> "RunBudget":
+        """Budget until the next `clock_time` ("HH:MM", local time): today, or tomorrow if it has passed."""
+        now = now or datetime.now()
+        hour, minute = (int(part) for part in clock_time.split(":"))
+        deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if deadline <= now:
+            deadline += timedelta(days=1)
+        return cls((deadline - now).total_seconds(), shares)
+
+    @classmethod
+    def from_config(cls) -> "RunBudget":
+        return cls.until(PUBLISH_BY) if PUBLISH_BY else cls(RUN_BUDGET_SECONDS)
+
+    def deadline(self, stage: str) -> Optional[float]:
+        """time.monotonic() by which the stage has to end."""
+        return self.deadlines[stage]
+
+    @contextmanager
+    def stage(self, stage: str, label: Optional[str] = None, share: float = 1.0):
+        """
+        Time a stage and yield its deadline.
+
+        Args:
+            stage: One of the budgeted stages.
+            label: Name in the log, e.g. for one profile's part of a stage.
+            share: Fraction of the stage's remaining time this part may use
+                (1/n for the first of n profiles that take turns).
+        """
+        start = time.monotonic()
+        allowed = time_left(self.deadlines[stage])
+        if allowed is not None:
+            allowed *= share
+        try:
+            yield None if allowed is None else start + allowed
+        finally:
+            elapsed = time.monotonic() - start
+            self.records.append({"stage": label or stage, "elapsed": elapsed, "budget": allowed})
+            if allowed is None:
+                logger.info(f"⏱️ Stage '{label or stage}' took {elapsed:.1f}s.")
+            elif elapsed > allowed:
+                logger.warning(f"⏰ Stage '{label or stage}' took {elapsed:.1f}s of {allowed:.1f}s budgeted.")
+            else:
+                logger.info(f"⏱️ Stage '{label or stage}' took {elapsed:.1f}s of {allowed:.1f}s budgeted.")
+
+    def report(self):
+        """Log the achieved and budgeted time of every stage and of the run."""
+        if not self.records:
+            return
+        elapsed = time.monotonic() - self.started
+        lines = []
+        for record in self.records:
+            budget = "" if record["budget"] is None else f" of {record['budget']:>7.1f}s"
+            lines.append(f"   {record['stage']:<20}{record['elapsed']:>8.1f}s{budget}")
+        total = "" if self.total_seconds is None else f" of {self.total_seconds:.0f}s"
+        lines.append(f"   {'run':<20}{elapsed:>8.1f}s{total}")
+        logger.info("⏱️ Run time by stage (achieved of budgeted):\n" + "\n".join(lines))
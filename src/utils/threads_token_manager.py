@@ -8,15 +8,31 @@ Token lifecycle:
 - Long-lived tokens are valid for 60 days
 - Tokens can be refreshed before expiration to extend validity
 - Expired tokens cannot be refreshed (require re-authentication)
+
+The expiry returned by debug_token is cached locally, so the remote check
+only runs when the cached expiry is close or a publish hits an auth error
+(see invalidate_token_cache).
 """
 
+import hashlib
+import json
 import os
 import logging
 import requests
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import Optional, Tuple
 from dotenv import load_dotenv, set_key
 
+from config import CACHE_DIR
+from utils.http_session import get_session
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -28,6 +44,66 @@ THREADS_REFRESH_TOKEN_URL = "https://graph.threads.net/refresh_access_token"
 # Refresh threshold: refresh if token expires within this many days
 TOKEN_REFRESH_THRESHOLD_DAYS = 7
 
+# Cached expiry and validation time of the current token
+TOKEN_CACHE_FILE = os.path.join(CACHE_DIR, "threads_token.json")
+
+
+def token_fingerprint(access_token: str) -> str:
+    """Short hash identifying a token without storing the token itself."""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+
+
+def load_token_cache(access_token: str) -> Optional[dict]:
+    """Return the cached validation record for this token, or None if there is none."""
+    try:
+        with open(TOKEN_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get("fingerprint") != token_fingerprint(access_token) or not cache.get("expires_at"):
+        return None
+    return cache
+
+
+def save_token_cache(access_token: str, expires_at: int):
+    """Record the token's expiry and when it was last validated remotely."""
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), exist_ok=True)
+        with open(TOKEN_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(
+                {"fingerprint": token_fingerprint(access_token), "expires_at": int(expires_at), "validated_at": int(time.time())},
+                f,
+            )
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write token cache: {e}")
+
+
+def invalidate_token_cache():
+    """Forget the cached validation, forcing a remote check next time (e.g. after an auth error)."""
+    try:
+        os.remove(TOKEN_CACHE_FILE)
+        logger.info("🗑️ Threads token cache invalidated.")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"⚠️ Could not remove token cache: {e}")
+
+
+@contextmanager
+def env_file_lock(env_path: str):
+    """Hold an exclusive lock on `<env_path>.lock` so concurrent runs don't clobber each other's .env writes."""
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{env_path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 
 def get_token_info(access_token: str) -> Optional[dict]:
     """
@@ -41,7 +117,7 @@ def get_token_info(access_token: str) -> Optional[dict]:
         Returns None if the request fails.
     """
     try:
-        response = requests.get(
+        response = get_session().get(
             THREADS_DEBUG_TOKEN_URL,
             params={
                 "access_token": access_token,
@@ -87,6 +163,7 @@ def check_token_expiration(access_token: str) -> Tuple[bool, Optional[int], Opti
         return False, None, "Token is invalid or expired"
 
     if expires_at:
+        save_token_cache(access_token, expires_at)
         expiry_date = datetime.fromtimestamp(expires_at, tz=timezone.utc)
         now = datetime.now(timezone.utc)
         days_remaining = (expiry_date - now).days
@@ -114,7 +191,7 @@ def refresh_token(access_token: str) -> Optional[str]:
     try:
         logger.info("🔄 Refreshing Threads access token...")
 
-        response = requests.get(
+        response = get_session().get(
             THREADS_REFRESH_TOKEN_URL,
             params={
                 "grant_type": "th_refresh_token",
@@ -128,6 +205,8 @@ def refresh_token(access_token: str) -> Optional[str]:
             new_token = data.get("access_token")
             expires_in = data.get("expires_in", 0)
             expires_days = expires_in // 86400
+            if new_token and expires_in:
+                save_token_cache(new_token, time.time() + expires_in)
 
             logger.info(f"✅ Token refreshed successfully. Valid for {expires_days} days.")
             return new_token
@@ -169,7 +248,8 @@ def update_env_token(new_token: str, env_path: str = ".env") -> bool:
             logger.error("❌ Could not find .env file")
             return False
 
-        set_key(actual_path, "THREADS_ACCESS_TOKEN", new_token)
+        with env_file_lock(actual_path):
+            set_key(actual_path, "THREADS_ACCESS_TOKEN", new_token)
         logger.info(f"✅ Updated THREADS_ACCESS_TOKEN in {actual_path}")
 
         # Also update the environment variable in the current process
@@ -182,15 +262,17 @@ def update_env_token(new_token: str, env_path: str = ".env") -> bool:
         return False
 
 
-def validate_and_refresh_token(auto_update_env: bool = True) -> Tuple[bool, str, Optional[str]]:
+def validate_and_refresh_token(auto_update_env: bool = True, force: bool = False) -> Tuple[bool, str, Optional[str]]:
     """
     Main entry point: Validate the current Threads token and refresh if needed.
 
     This function should be called at pipeline startup to ensure the token
-    is valid before attempting to publish.
+    is valid before attempting to publish. While the cached expiry is more
+    than TOKEN_REFRESH_THRESHOLD_DAYS away, no network call is made.
 
     Args:
         auto_update_env: If True, automatically update .env with refreshed token
+        force: If True, ignore the cached expiry and validate remotely
 
     Returns:
         Tuple of (success, message, current_valid_token)
@@ -203,6 +285,13 @@ def validate_and_refresh_token(auto_update_env: bool = True) -> Tuple[bool, str,
     if not access_token:
         return False, "THREADS_ACCESS_TOKEN not configured in environment", None
 
+    # Trust the cached expiry while it is comfortably far away
+    cache = None if force else load_token_cache(access_token)
+    if cache:
+        cached_days = int((cache["expires_at"] - time.time()) // 86400)
+        if cached_days > TOKEN_REFRESH_THRESHOLD_DAYS:
+            return True, f"✅ Threads token valid ({cached_days} days remaining, cached)", access_token
+
     # Check current token status
     is_valid, days_remaining, status = check_token_expiration(access_token)
 
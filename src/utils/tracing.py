@@ -0,0 +1,229 @@
+"""
+Pipeline Tracing
+
+Lightweight spans for pipeline stages, feeds, article downloads, LLM calls
+and channel deliveries, exported as a Chrome trace-event file (open it in
+chrome://tracing or https://ui.perfetto.dev) plus a summary table.
+
+Tracing is off unless enabled (`python main.py --trace` or PIPELINE_TRACE=1).
+When it is off, span() returns a shared no-op span, so instrumented code
+costs one function call and a flag check.
+
+Usage:
+    with span("feed", "fetch", url=feed_url) as s:
+        response = session.get(feed_url)
+        s.set(bytes=len(response.content))
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+TRACE_DIR = os.path.join(CACHE_DIR, "traces")
+
+_enabled = os.getenv("PIPELINE_TRACE", "").lower() in ("1", "true", "yes")
+_spans = []
+_lanes = {}
+_spans_lock = threading.Lock()
+_origin_ns = time.perf_counter_ns()
+
+
+def enable():
+    """Start recording spans, dropping any recorded earlier."""
+    global _enabled, _origin_ns
+    with _spans_lock:
+        _spans.clear()
+        _lanes.clear()
+        _origin_ns = time.perf_counter_ns()
+    _enabled = True
+
+
+def disable():
+    """Stop recording spans; recorded spans are kept for export."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _current_lane() -> tuple[int, str]:
+    """
+    Trace row for the caller: the running asyncio task, or else the thread.
+
+    Concurrent tasks share the event-loop thread, so giving each task its
+    own row keeps overlapping spans from being drawn as nested.
+    """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task), f"task {task.get_name()}"
+    thread = threading.current_thread()
+    return thread.ident, thread.name
+
+
+class Span:
+    """One timed operation with attributes; records itself when the block exits."""
+
+    __slots__ = ("name", "category", "attrs", "start_ns", "end_ns", "status", "lane")
+
+    def __init__(self, name: str, category: str, attrs: dict):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start_ns = None
+        self.end_ns = None
+        self.status = "ok"
+        self.lane = None
+
+    def set(self, **attrs):
+        """Attach attributes such as bytes, tokens or status."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.lane = _current_lane()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc is not None:
+            self.status = "error"
+            self.attrs.setdefault("error", f"{exc_type.__name__}: {exc}")
+        elif "status" in self.attrs:
+            self.status = str(self.attrs["status"])
+        with _spans_lock:
+            _spans.append(self)
+            _lanes.setdefault(self.lane[0], self.lane[1])
+        return False
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, category: str = "pipeline", **attrs):
+    """
+    Context manager timing one operation.
+
+    Args:
+        name: Span name, e.g. the stage or channel name.
+        category: Group shown in the trace and the summary ('stage', 'fetch', 'llm', 'channel', ...).
+        **attrs: Initial attributes. A 'status' attribute other than 'ok' marks the span as failed.
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, category, attrs)
+
+
+def recorded_spans() -> list[Span]:
+    with _spans_lock:
+        return list(_spans)
+
+
+def chrome_trace_events(spans: Optional[list[Span]] = None) -> list[dict]:
+    """Convert spans to Chrome trace 'complete' events, with a name row per thread or task."""
+    spans = recorded_spans() if spans is None else spans
+    pid = os.getpid()
+    events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in dict(_lanes).items()
+    ]
+    for s in sorted(spans, key=lambda s: s.start_ns):
+        events.append(
+            {
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": (s.start_ns - _origin_ns) / 1000,
+                "dur": (s.end_ns - s.start_ns) / 1000,
+                "pid": pid,
+                "tid": s.lane[0],
+                "args": {**s.attrs, "status": s.status},
+            }
+        )
+    return events
+
+
+def export_chrome_trace(path: Optional[str] = None) -> str:
+    """
+    Write the recorded spans as a Chrome trace-event JSON file.
+
+    Returns:
+        Path of the written file (default: .cache/traces/trace-<timestamp>.json)
+    """
+    if path is None:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": chrome_trace_events(), "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+    return path
+
+
+def summarize_spans(spans: Optional[list[Span]] = None) -> dict:
+    """
+    Aggregate spans by (category, name).
+
+    Returns:
+        {(category, name): {count, errors, total, max, bytes, tokens}}
+    """
+    spans = recorded_spans() if spans is None else spans
+    summary = defaultdict(lambda: {"count": 0, "errors": 0, "total": 0.0, "max": 0.0, "bytes": 0, "tokens": 0})
+    for s in spans:
+        stats = summary[(s.category, s.name)]
+        stats["count"] += 1
+        stats["total"] += s.duration
+        stats["max"] = max(stats["max"], s.duration)
+        stats["bytes"] += s.attrs.get("bytes") or 0
+        stats["tokens"] += (s.attrs.get("prompt_tokens") or 0) + (s.attrs.get("completion_tokens") or 0)
+        if s.status not in ("ok", "success"):
+            stats["errors"] += 1
+    return dict(summary)
+
+
+def print_summary(spans: Optional[list[Span]] = None):
+    """Print a per-span-name table of counts, total/mean/max duration, bytes and tokens."""
+    summary = summarize_spans(spans)
+    if not summary:
+        print("No spans recorded.")
+        return
+
+    print(f"{'category':<10}{'span':<26}{'count':>7}{'errors':>8}{'total':>10}{'mean':>9}{'max':>9}{'bytes':>12}{'tokens':>9}")
+    for (category, name), stats in sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True):
+        print(
+            f"{category:<10}{name[:25]:<26}{stats['count']:>7}{stats['errors']:>8}"
+            f"{stats['total']:>9.2f}s{stats['total'] / stats['count']:>8.2f}s{stats['max']:>8.2f}s"
+            f"{stats['bytes']:>12}{stats['tokens']:>9}"
+        )